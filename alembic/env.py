@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 from app.core.config import get_settings
 from app.core.database import Base
+from app.core.token_partitions import PARTITION_PREFIX
 from app.models import User, Paste, Token  # noqa: F401
 
 # this is the Alembic Config object, which provides
@@ -27,6 +28,16 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Trigram indexes only exist where pg_trgm could be installed
+    if type_ == "index" and name.endswith("_trgm"):
+        return False
+    # Daily tokens partitions are managed at runtime, not by migrations
+    table = object if type_ == "table" else getattr(object, "table", None)
+    return table is None or not table.name.startswith(PARTITION_PREFIX)
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -49,6 +60,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -58,7 +70,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
     with context.begin_transaction():
         context.run_migrations()
 
@@ -0,0 +1,111 @@
+"""partitioned tokens by expires_at
+
+Revision ID: c29c48a8a821
+Revises: f909fa7c704b
+Create Date: 2026-10-18 21:23:01.385995
+
+"""
+from datetime import date, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c29c48a8a821'
+down_revision: Union[str, Sequence[str], None] = 'f909fa7c704b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = (
+    "jti, token_type, paired_jti, expires_at, created_at, is_blacklisted,"
+    " blacklisted_at, blacklist_reason, user_id, _metadata"
+)
+
+
+# Days of partitions created up front, REFRESH_TOKEN_EXPIRE_DAYS plus
+# TOKEN_PARTITIONS_AHEAD_DAYS at this revision. The maintenance task in the
+# app keeps creating them from there.
+DAYS_AHEAD = 14
+
+
+def partition_ddl(day: date) -> str:
+    """Frozen copy of app.core.token_partitions.partition_ddl."""
+    return (
+        f"CREATE TABLE IF NOT EXISTS tokens_p{day:%Y%m%d} PARTITION OF tokens "
+        f"FOR VALUES FROM ('{day.isoformat()} 00:00+00') "
+        f"TO ('{(day + timedelta(days=1)).isoformat()} 00:00+00')"
+    )
+
+
+def token_columns():
+    return [
+        sa.Column('jti', sa.UUID(), nullable=False),
+        sa.Column('token_type', sa.String(length=30), nullable=False),
+        sa.Column('paired_jti', sa.UUID(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('is_blacklisted', sa.Boolean(), server_default='FALSE', nullable=False),
+        sa.Column('blacklisted_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('blacklist_reason', sa.String(length=300), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('_metadata', postgresql.JSONB(astext_type=sa.Text()), server_default='{}', nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Expired tokens are never read again, only live ones are carried over
+    op.execute(
+        f"CREATE TEMP TABLE tokens_live ON COMMIT DROP AS"
+        f" SELECT {COLUMNS} FROM tokens WHERE expires_at > now()"
+    )
+    op.drop_index(op.f('ix_tokens_user_id'), table_name='tokens')
+    op.drop_index(op.f('ix_tokens_paired_jti'), table_name='tokens')
+    op.drop_index(op.f('ix_tokens_jti'), table_name='tokens')
+    op.drop_table('tokens')
+
+    op.create_table('tokens',
+    *token_columns(),
+    sa.PrimaryKeyConstraint('jti', 'expires_at'),
+    postgresql_partition_by='RANGE (expires_at)'
+    )
+    op.create_index(op.f('ix_tokens_paired_jti'), 'tokens', ['paired_jti'], unique=False)
+    op.create_index(op.f('ix_tokens_user_id'), 'tokens', ['user_id'], unique=False)
+
+    connection = op.get_bind()
+    days = set(connection.scalars(sa.text(
+        "SELECT generate_series("
+        " (now() AT TIME ZONE 'UTC')::date,"
+        " (now() AT TIME ZONE 'UTC')::date + CAST(:days AS integer),"
+        " interval '1 day')::date"
+        " UNION SELECT DISTINCT (expires_at AT TIME ZONE 'UTC')::date FROM tokens_live"
+    ), {"days": DAYS_AHEAD}))
+    for day in sorted(days):
+        op.execute(partition_ddl(day))
+
+    op.execute(f"INSERT INTO tokens ({COLUMNS}) SELECT {COLUMNS} FROM tokens_live")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        f"CREATE TEMP TABLE tokens_live ON COMMIT DROP AS SELECT {COLUMNS} FROM tokens"
+    )
+    op.drop_index(op.f('ix_tokens_user_id'), table_name='tokens')
+    op.drop_index(op.f('ix_tokens_paired_jti'), table_name='tokens')
+    # Drops every partition along with the parent
+    op.drop_table('tokens')
+
+    op.create_table('tokens',
+    *token_columns(),
+    sa.PrimaryKeyConstraint('jti', 'paired_jti')
+    )
+    op.create_index(op.f('ix_tokens_jti'), 'tokens', ['jti'], unique=False)
+    op.create_index(op.f('ix_tokens_paired_jti'), 'tokens', ['paired_jti'], unique=False)
+    op.create_index(op.f('ix_tokens_user_id'), 'tokens', ['user_id'], unique=False)
+    op.execute(f"INSERT INTO tokens ({COLUMNS}) SELECT {COLUMNS} FROM tokens_live")
@@ -0,0 +1,115 @@
+"""added paste search columns
+
+Revision ID: cd4a53096dd0
+Revises: 522b9f9ea2cd
+Create Date: 2026-10-18 21:27:27.956759
+
+"""
+import gzip
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import zstandard
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cd4a53096dd0'
+down_revision: Union[str, Sequence[str], None] = '522b9f9ea2cd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 500
+
+# SEARCH_INDEX_MAX_CHARS at this revision
+SEARCH_INDEX_MAX_CHARS = 32 * 1024
+
+# Trigram indexes speed up substring and regex search but need the pg_trgm
+# extension; where it can't be installed those searches still work, unindexed.
+TRIGRAM_INDEXES = (
+    ('ix_paste_contents_search_text_trgm', 'paste_contents', 'search_text'),
+    ('ix_pastes_title_trgm', 'pastes', 'title'),
+)
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    """Frozen copy of app.core.compression.decompress."""
+    if encoding == "identity":
+        return data
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def search_head(content: str) -> str:
+    """Frozen copy of app.models.paste_content.search_head."""
+    # Postgres text can't hold NUL characters
+    return content[:SEARCH_INDEX_MAX_CHARS].replace("\x00", "")
+
+
+def backfill_search_text():
+    """Fill search_text for bodies stored in the database, paging on hash.
+
+    Bodies already in the blob store are left unindexed.
+    """
+    connection = op.get_bind()
+    last_hash = ""
+    while True:
+        rows = connection.execute(
+            sa.text(
+                "SELECT hash, data, encoding FROM paste_contents"
+                " WHERE data IS NOT NULL AND hash > :last_hash"
+                " ORDER BY hash LIMIT :limit"
+            ),
+            {"last_hash": last_hash, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            return
+        connection.execute(
+            sa.text("UPDATE paste_contents SET search_text = :text WHERE hash = :hash"),
+            [
+                {
+                    "hash": row.hash,
+                    "text": search_head(
+                        decompress(row.data, row.encoding).decode("utf-8")
+                    ),
+                }
+                for row in rows
+            ],
+        )
+        last_hash = rows[-1].hash
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('paste_contents', sa.Column('search_text', sa.Text(), nullable=True))
+    op.add_column('paste_contents', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('simple'::regconfig, coalesce(search_text, ''))", persisted=True), nullable=True))
+    op.add_column('pastes', sa.Column('title_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A')", persisted=True), nullable=True))
+
+    backfill_search_text()
+
+    op.create_index('ix_paste_contents_search_vector', 'paste_contents', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_pastes_title_vector', 'pastes', ['title_vector'], unique=False, postgresql_using='gin')
+
+    connection = op.get_bind()
+    if connection.scalar(sa.text(
+        "SELECT count(*) FROM pg_available_extensions WHERE name = 'pg_trgm'"
+    )):
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(name, table, [column], unique=False, postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _table, _ in TRIGRAM_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.drop_index('ix_pastes_title_vector', table_name='pastes', postgresql_using='gin')
+    op.drop_index('ix_paste_contents_search_vector', table_name='paste_contents', postgresql_using='gin')
+    op.drop_column('pastes', 'title_vector')
+    op.drop_column('paste_contents', 'search_vector')
+    op.drop_column('paste_contents', 'search_text')
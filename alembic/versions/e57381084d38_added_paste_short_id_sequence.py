@@ -0,0 +1,28 @@
+"""added paste short id sequence
+
+Revision ID: e57381084d38
+Revises: 44b7e8ac1df0
+Create Date: 2026-10-18 21:04:11.016860
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e57381084d38'
+down_revision: Union[str, Sequence[str], None] = '44b7e8ac1df0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.schema.CreateSequence(sa.Sequence("paste_short_id_seq")))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(sa.schema.DropSequence(sa.Sequence("paste_short_id_seq")))
@@ -0,0 +1,63 @@
+"""moved paste content into deduplicated paste_contents
+
+Revision ID: e5b49389a84e
+Revises: e57381084d38
+Create Date: 2026-10-18 21:06:45.202215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b49389a84e'
+down_revision: Union[str, Sequence[str], None] = 'e57381084d38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CONTENT_HASH = "encode(sha256(convert_to(content, 'UTF8')), 'hex')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('paste_contents',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    op.add_column('pastes', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+    op.execute(f"""
+        INSERT INTO paste_contents (hash, content, size, ref_count)
+        SELECT {CONTENT_HASH}, min(content), octet_length(min(content)), count(*)
+        FROM pastes
+        GROUP BY 1
+    """)
+    op.execute(f"UPDATE pastes SET content_hash = {CONTENT_HASH}")
+
+    op.alter_column('pastes', 'content_hash', nullable=False)
+    op.create_index(op.f('ix_pastes_content_hash'), 'pastes', ['content_hash'], unique=False)
+    op.create_foreign_key('pastes_content_hash_fkey', 'pastes', 'paste_contents', ['content_hash'], ['hash'])
+    op.drop_column('pastes', 'content')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('pastes', sa.Column('content', sa.Text(), nullable=True))
+    op.execute("""
+        UPDATE pastes SET content = paste_contents.content
+        FROM paste_contents
+        WHERE paste_contents.hash = pastes.content_hash
+    """)
+    op.alter_column('pastes', 'content', nullable=False)
+
+    op.drop_constraint('pastes_content_hash_fkey', 'pastes', type_='foreignkey')
+    op.drop_index(op.f('ix_pastes_content_hash'), table_name='pastes')
+    op.drop_column('pastes', 'content_hash')
+    op.drop_table('paste_contents')
@@ -0,0 +1,41 @@
+"""added paste content blob key
+
+Revision ID: f909fa7c704b
+Revises: ffeecd0feaa1
+Create Date: 2026-10-18 21:10:54.160042
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f909fa7c704b'
+down_revision: Union[str, Sequence[str], None] = 'ffeecd0feaa1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('paste_contents', sa.Column('blob_key', sa.String(length=255), nullable=True))
+    op.alter_column('paste_contents', 'data', existing_type=sa.LargeBinary(), nullable=True)
+    op.create_check_constraint('ck_paste_contents_body', 'paste_contents', 'data IS NOT NULL OR blob_key IS NOT NULL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    blobs = op.get_bind().scalar(
+        sa.text("SELECT count(*) FROM paste_contents WHERE blob_key IS NOT NULL")
+    )
+    if blobs:
+        raise RuntimeError(
+            f"{blobs} paste bodies are in the blob store; move them back into"
+            " paste_contents.data before downgrading"
+        )
+
+    op.drop_constraint('ck_paste_contents_body', 'paste_contents', type_='check')
+    op.alter_column('paste_contents', 'data', existing_type=sa.LargeBinary(), nullable=False)
+    op.drop_column('paste_contents', 'blob_key')
@@ -0,0 +1,110 @@
+"""compressed paste contents
+
+Revision ID: ffeecd0feaa1
+Revises: e5b49389a84e
+Create Date: 2026-10-18 21:08:39.218430
+
+"""
+import gzip
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import zstandard
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ffeecd0feaa1'
+down_revision: Union[str, Sequence[str], None] = 'e5b49389a84e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 500
+
+# Frozen copies of app.core.compression and its settings at this revision,
+# so later changes to the app can't change what this migration writes
+COMPRESSION_MIN_BYTES = 1024
+
+
+def compress(data: bytes) -> tuple[bytes, str]:
+    """Compress data with zstd unless it is small or doesn't shrink by 10%."""
+    if len(data) < COMPRESSION_MIN_BYTES:
+        return data, "identity"
+    compressed = zstandard.ZstdCompressor(level=3).compress(data)
+    if len(compressed) > len(data) * 0.9:
+        return data, "identity"
+    return compressed, "zstd"
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    if encoding == "identity":
+        return data
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def iter_batches(column: str):
+    """Yield paste_contents rows in batches, paging on hash."""
+    connection = op.get_bind()
+    last_hash = ""
+    while True:
+        rows = connection.execute(
+            sa.text(
+                f"SELECT hash, {column}, encoding FROM paste_contents"
+                " WHERE hash > :last_hash ORDER BY hash LIMIT :limit"
+            ),
+            {"last_hash": last_hash, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_hash = rows[-1].hash
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('paste_contents', sa.Column('data', sa.LargeBinary(), nullable=True))
+    op.add_column('paste_contents', sa.Column('encoding', sa.String(length=16), server_default='identity', nullable=False))
+
+    connection = op.get_bind()
+    for rows in iter_batches("content"):
+        params = []
+        for row in rows:
+            data, encoding = compress(row.content.encode("utf-8"))
+            params.append({"hash": row.hash, "data": data, "encoding": encoding})
+        connection.execute(
+            sa.text(
+                "UPDATE paste_contents SET data = :data, encoding = :encoding"
+                " WHERE hash = :hash"
+            ),
+            params,
+        )
+
+    op.alter_column('paste_contents', 'data', nullable=False)
+    op.drop_column('paste_contents', 'content')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('paste_contents', sa.Column('content', sa.Text(), nullable=True))
+
+    connection = op.get_bind()
+    for rows in iter_batches("data"):
+        connection.execute(
+            sa.text("UPDATE paste_contents SET content = :content WHERE hash = :hash"),
+            [
+                {
+                    "hash": row.hash,
+                    "content": decompress(row.data, row.encoding).decode("utf-8"),
+                }
+                for row in rows
+            ],
+        )
+
+    op.alter_column('paste_contents', 'content', nullable=False)
+    op.drop_column('paste_contents', 'encoding')
+    op.drop_column('paste_contents', 'data')
@@ -1,10 +1,12 @@
+from datetime import UTC, datetime
+
 from fastapi import APIRouter, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.security import create_token_pair, blacklist_token_pair
-from app.middleware import AuthMiddleware
+from app.middleware import AuthMiddleware, LoginRateLimiter
 from app.models import User
 from app.schemas import Token, TokenRefresh, UserCreate, UserResponse
 from app.services import AuthService
@@ -16,19 +18,24 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
     "/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED
 )
 async def signup(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
-    user = AuthService.create_user(db, user_data)
+    user = await AuthService.create_user(db, user_data)
     return user
 
 
 @router.post("/login", response_model=Token)
 async def login(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)
+    form_data: OAuth2PasswordRequestForm = Depends(
+        LoginRateLimiter.check_login_attempt
+    ),
+    db: AsyncSession = Depends(get_db),
 ):
-    user = AuthService.authenticate_user(db, form_data)
+    user = await AuthService.authenticate_user(db, form_data)
 
     # access_token = create_access_token(data={"sub": user.id})
     # refresh_token = create_refresh_token(data={"sub": user.id})
-    access_token, refresh_token = create_token_pair(db=db, data={"sub": user.id})
+    access_token, refresh_token = await create_token_pair(
+        db=db, data={"sub": str(user.id)}
+    )
 
     return {
         "access_token": access_token,
@@ -61,8 +68,13 @@ async def get_current_user_info(
 
 @router.post("/logout")
 async def logout(
-    current_user: User = Depends(AuthMiddleware.get_current_active_user),
+    claims: dict = Depends(AuthMiddleware.token_verifier()),
     db: AsyncSession = Depends(get_db),
 ):
-    blacklist_token_pair(db=db, jit=current_user.tokens[0].jti)
+    # Revoke the token that was presented, and the refresh token issued with it
+    await blacklist_token_pair(
+        db=db,
+        jti=claims["jti"],
+        expires_at=datetime.fromtimestamp(claims["exp"], UTC),
+    )
     return {"message": "Successfully logged out"}
@@ -130,7 +130,9 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
     # Create tokens
     # access_token = create_access_token(data={"sub": user.id})
     # refresh_token = create_refresh_token(data={"sub": user.id})
-    access_token, refresh_token = create_token_pair(db=db, data={"sub": user.id})
+    access_token, refresh_token = await create_token_pair(
+        db=db, data={"sub": str(user.id)}
+    )
 
     # Redirect to frontend with tokens
     return RedirectResponse(
@@ -0,0 +1,7 @@
+from fastapi import APIRouter
+
+from app.api.v1.endpoints import pastes, uploads
+
+api_router = APIRouter(prefix="/api/v1")
+api_router.include_router(uploads.router)
+api_router.include_router(pastes.router)
@@ -0,0 +1,279 @@
+import logging
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.blob_store import BlobNotFoundError, blob_store
+from app.core.compression import IDENTITY, accepts_encoding, decompress
+from app.core.conditional import cache_control, http_date, is_not_modified, make_etag
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.http_range import RangeNotSatisfiableError, parse_range
+from app.middleware import AuthMiddleware
+from app.schemas import (
+    PasteCreate,
+    PastePage,
+    PasteResponse,
+    PasteSummary,
+    PasteUpdate,
+)
+from app.services import PasteService, SearchService
+from app.services.search_service import SearchMode
+
+router = APIRouter(prefix="/pastes", tags=["Pastes"])
+
+RAW_MEDIA_TYPE = "text/plain; charset=utf-8"
+
+logger = logging.getLogger(__name__)
+
+PASTE_BODY_MISSING_EXCEPTION = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Paste body is unavailable",
+)
+
+
+def get_user_id(claims: dict | None) -> int | None:
+    if claims is None:
+        return None
+    return int(claims["payload"]["sub"])
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def json_etag(content_hash: str, updated_at: datetime) -> str:
+    # Weak, since view_count in the JSON changes without the paste changing
+    version = int(updated_at.timestamp() * 1_000_000)
+    return make_etag(f"{content_hash}.{version:x}", weak=True)
+
+
+def raw_etag(content_hash: str, encoding: str) -> str:
+    # Each Content-Encoding is a different representation of the same body
+    return make_etag(
+        content_hash if encoding == IDENTITY else f"{content_hash}.{encoding}"
+    )
+
+
+def caching_headers(
+    etag: str, updated_at: datetime, is_public: bool, expires_at: datetime | None
+) -> dict:
+    return {
+        "ETag": etag,
+        "Last-Modified": http_date(updated_at),
+        "Cache-Control": cache_control(
+            is_public, expires_at, settings.PASTE_HTTP_MAX_AGE_SECONDS
+        ),
+    }
+
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+@router.post("", response_model=PasteResponse, status_code=status.HTTP_201_CREATED)
+async def create_paste(
+    paste_data: PasteCreate,
+    claims: dict | None = Depends(AuthMiddleware.optional_token_verifier()),
+    db: AsyncSession = Depends(get_db),
+):
+    return await PasteService.create_paste(db, paste_data, get_user_id(claims))
+
+
+@router.get("", response_model=PastePage)
+async def list_public_pastes(
+    cursor: str | None = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    return await PasteService.list_pastes(db, cursor, limit)
+
+
+@router.get("/mine", response_model=PastePage)
+async def list_my_pastes(
+    cursor: str | None = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    claims: dict = Depends(AuthMiddleware.token_verifier()),
+    db: AsyncSession = Depends(get_db),
+):
+    return await PasteService.list_pastes(db, cursor, limit, get_user_id(claims))
+
+
+@router.get("/recent", response_model=list[PasteSummary])
+async def recent_pastes(
+    limit: int = Query(default=20, ge=1, le=settings.RECENT_FEED_SIZE),
+):
+    return PasteService.recent_pastes(limit)
+
+
+@router.get("/search", response_model=PastePage)
+async def search_pastes(
+    q: str = Query(min_length=1, max_length=256),
+    mode: SearchMode = "words",
+    cursor: str | None = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    claims: dict | None = Depends(
+        AuthMiddleware.optional_token_verifier(strict=False)
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    return await SearchService.search(
+        db, q, mode, cursor, limit, get_user_id(claims)
+    )
+
+
+@router.get("/{short_url}", response_model=PasteResponse)
+async def get_paste(
+    short_url: str,
+    request: Request,
+    response: Response,
+    claims: dict | None = Depends(
+        AuthMiddleware.optional_token_verifier(strict=False)
+    ),
+):
+    user_id = get_user_id(claims)
+
+    if is_conditional(request):
+        paste = await PasteService.get_paste_validators(short_url, user_id)
+        headers = caching_headers(
+            json_etag(paste["content_hash"], paste["updated_at"]),
+            paste["updated_at"],
+            paste["is_public"],
+            paste["expires_at"],
+        )
+        if is_not_modified(request.headers, headers["ETag"], paste["updated_at"]):
+            PasteService.record_view(paste["id"])
+            return not_modified(headers)
+
+    entry = await PasteService.get_paste(short_url, user_id)
+    updated_at = datetime.fromisoformat(entry["updated_at"])
+    expires_at = entry["expires_at"] and datetime.fromisoformat(entry["expires_at"])
+    response.headers.update(
+        caching_headers(
+            json_etag(entry["content_hash"], updated_at),
+            updated_at,
+            entry["is_public"],
+            expires_at,
+        )
+    )
+    return entry
+
+
+@router.get("/{short_url}/raw", response_class=Response)
+async def get_raw_paste(
+    short_url: str,
+    request: Request,
+    claims: dict | None = Depends(
+        AuthMiddleware.optional_token_verifier(strict=False)
+    ),
+):
+    user_id = get_user_id(claims)
+    accept_encoding = request.headers.get("accept-encoding")
+    headers = {"Vary": "Accept-Encoding", "Accept-Ranges": "bytes"}
+
+    if is_conditional(request):
+        paste = await PasteService.get_paste_validators(short_url, user_id)
+        encoding = paste["content_encoding"]
+        if not accepts_encoding(accept_encoding, encoding):
+            encoding = IDENTITY
+        headers.update(
+            caching_headers(
+                raw_etag(paste["content_hash"], encoding),
+                paste["updated_at"],
+                paste["is_public"],
+                paste["expires_at"],
+            )
+        )
+        if is_not_modified(request.headers, headers["ETag"], paste["updated_at"]):
+            PasteService.record_view(paste["id"])
+            return not_modified(headers)
+
+    body = await PasteService.get_raw_paste(short_url, user_id)
+    # Compressed bodies go out as stored when the client can decode them
+    encoding = body.encoding
+    if not accepts_encoding(accept_encoding, encoding):
+        encoding = IDENTITY
+    headers.update(
+        caching_headers(
+            raw_etag(body.content_hash, encoding),
+            body.updated_at,
+            body.is_public,
+            body.expires_at,
+        )
+    )
+
+    data = body.data
+    if encoding != IDENTITY:
+        headers["Content-Encoding"] = encoding
+        return Response(data, media_type=RAW_MEDIA_TYPE, headers=headers)
+    if body.encoding != IDENTITY:
+        data = decompress(data, body.encoding)
+
+    range_header = request.headers.get("range")
+    # A range only applies to the version the client already has part of
+    if_range = request.headers.get("if-range")
+    if if_range is not None and if_range not in (
+        headers["ETag"],
+        headers["Last-Modified"],
+    ):
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, body.size)
+    except RangeNotSatisfiableError:
+        return Response(
+            status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{body.size}"},
+        )
+
+    status_code = status.HTTP_200_OK
+    start, end = 0, body.size - 1
+    if byte_range is not None:
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{body.size}"
+
+    if body.blob_key is None:
+        return Response(
+            data[start : end + 1],
+            status_code=status_code,
+            media_type=RAW_MEDIA_TYPE,
+            headers=headers,
+        )
+
+    try:
+        chunks = await blob_store.open_stream(body.blob_key, start, end)
+    except BlobNotFoundError:
+        logger.error("Blob %s of paste %s is missing", body.blob_key, short_url)
+        raise PASTE_BODY_MISSING_EXCEPTION from None
+
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        chunks,
+        status_code=status_code,
+        media_type=RAW_MEDIA_TYPE,
+        headers=headers,
+    )
+
+
+@router.patch("/{short_url}", response_model=PasteResponse)
+async def update_paste(
+    short_url: str,
+    paste_data: PasteUpdate,
+    claims: dict = Depends(AuthMiddleware.token_verifier()),
+    db: AsyncSession = Depends(get_db),
+):
+    return await PasteService.update_paste(
+        db, short_url, paste_data, get_user_id(claims)
+    )
+
+
+@router.delete("/{short_url}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_paste(
+    short_url: str,
+    claims: dict = Depends(AuthMiddleware.token_verifier()),
+    db: AsyncSession = Depends(get_db),
+):
+    await PasteService.delete_paste(db, short_url, get_user_id(claims))
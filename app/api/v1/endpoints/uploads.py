@@ -0,0 +1,35 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.endpoints.pastes import get_user_id
+from app.core.database import get_db
+from app.middleware import AuthMiddleware
+from app.schemas import PasteMetadata, PasteSummary
+from app.services import PasteService
+
+router = APIRouter(prefix="/pastes", tags=["Pastes"])
+
+
+@router.post(
+    "/upload", response_model=PasteSummary, status_code=status.HTTP_201_CREATED
+)
+async def upload_paste(
+    request: Request,
+    metadata: Annotated[PasteMetadata, Query()],
+    claims: dict | None = Depends(AuthMiddleware.optional_token_verifier()),
+    db: AsyncSession = Depends(get_db),
+):
+    """Create a paste from the raw request body, read as a stream.
+
+    Metadata goes in the query string; the response leaves out the content.
+    """
+    content_length = request.headers.get("content-length")
+    return await PasteService.upload_paste(
+        db,
+        request.stream(),
+        metadata,
+        get_user_id(claims),
+        int(content_length) if content_length and content_length.isdigit() else None,
+    )
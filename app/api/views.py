@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import HTMLResponse
+
+from app.api.v1.endpoints.pastes import get_user_id
+from app.core.config import settings
+from app.core.highlight import THEMES, highlighter, theme_css
+from app.core.templates import templates
+from app.middleware import AuthMiddleware
+from app.services import PasteService
+
+router = APIRouter(tags=["Views"])
+
+
+@router.get("/p/{short_url}", response_class=HTMLResponse)
+async def view_paste(
+    short_url: str,
+    request: Request,
+    theme: str = settings.HIGHLIGHT_DEFAULT_THEME,
+    claims: dict | None = Depends(
+        AuthMiddleware.optional_token_verifier(strict=False)
+    ),
+):
+    paste = await PasteService.get_paste(short_url, get_user_id(claims))
+    rendered = await highlighter.render(
+        paste["content_hash"], paste["content"], paste["language"]
+    )
+    if theme not in THEMES:
+        theme = settings.HIGHLIGHT_DEFAULT_THEME
+
+    return templates.TemplateResponse(
+        request,
+        "paste.html",
+        {
+            "paste": paste,
+            "rendered": rendered,
+            "theme_css": theme_css(theme),
+            "raw_url": f"/api/v1/pastes/{short_url}/raw",
+        },
+    )
@@ -0,0 +1,226 @@
+import asyncio
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import BinaryIO
+
+from app.core.config import settings
+
+
+class BlobNotFoundError(Exception):
+    pass
+
+
+class BlobStore(ABC):
+    """Storage for paste bodies too large to keep in the database.
+
+    Blobs are immutable and keyed by content hash, so writing a key that
+    already exists is a no-op.
+    """
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes): ...
+
+    @abstractmethod
+    async def put_file(self, key: str, file: BinaryIO):
+        """Like put, but copies from a file object in chunks."""
+
+    @abstractmethod
+    async def read(self, key: str) -> bytes: ...
+
+    @abstractmethod
+    def stream(
+        self, key: str, start: int = 0, end: int | None = None
+    ) -> AsyncIterator[bytes]:
+        """Yield bytes start..end (inclusive) of a blob in chunks."""
+
+    @abstractmethod
+    async def delete(self, key: str): ...
+
+    async def read_range(self, key: str, start: int, end: int) -> bytes:
+        """Bytes start..end (inclusive) of a blob, or fewer past its end."""
+        return b"".join([chunk async for chunk in self.stream(key, start, end)])
+
+    async def open_stream(
+        self, key: str, start: int = 0, end: int | None = None
+    ) -> AsyncIterator[bytes]:
+        """Like stream, but raises BlobNotFoundError here, before any bytes
+        are sent, rather than partway through a response."""
+        chunks = self.stream(key, start, end)
+        first = await anext(chunks, b"")
+
+        async def resume():
+            if first:
+                yield first
+            async for chunk in chunks:
+                yield chunk
+
+        return resume()
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: str, chunk_size: int):
+        self.root = Path(root)
+        self.chunk_size = chunk_size
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key[2:4] / key
+
+    def _write(self, key: str, write):
+        path = self._path(key)
+        if path.exists():
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    async def put(self, key: str, data: bytes):
+        await asyncio.to_thread(self._write, key, lambda f: f.write(data))
+
+    async def put_file(self, key: str, file: BinaryIO):
+        def copy(f):
+            file.seek(0)
+            shutil.copyfileobj(file, f, self.chunk_size)
+
+        await asyncio.to_thread(self._write, key, copy)
+
+    async def read(self, key: str) -> bytes:
+        try:
+            return await asyncio.to_thread(self._path(key).read_bytes)
+        except FileNotFoundError:
+            raise BlobNotFoundError(key) from None
+
+    async def stream(
+        self, key: str, start: int = 0, end: int | None = None
+    ) -> AsyncIterator[bytes]:
+        try:
+            f = await asyncio.to_thread(open, self._path(key), "rb")
+        except FileNotFoundError:
+            raise BlobNotFoundError(key) from None
+
+        try:
+            if end is None:
+                end = os.fstat(f.fileno()).st_size - 1
+            await asyncio.to_thread(f.seek, start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(
+                    f.read, min(self.chunk_size, remaining)
+                )
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            await asyncio.to_thread(f.close)
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._path(key).unlink, missing_ok=True)
+
+
+class S3BlobStore(BlobStore):
+    """Blobs in an S3-compatible bucket (AWS S3, MinIO, ...).
+
+    Needs boto3, installed with the "s3" extra. Its blocking calls run in
+    worker threads.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        chunk_size: int,
+        endpoint_url: str | None = None,
+        region: str | None = None,
+        access_key_id: str | None = None,
+        secret_access_key: str | None = None,
+    ):
+        try:
+            import boto3
+        except ImportError as e:
+            raise RuntimeError(
+                "The S3 blob store needs boto3: install with the 's3' extra"
+            ) from e
+
+        self.bucket = bucket
+        self.chunk_size = chunk_size
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+        )
+        self._errors = self.client.exceptions
+
+    async def put(self, key: str, data: bytes):
+        await asyncio.to_thread(
+            self.client.put_object, Bucket=self.bucket, Key=key, Body=data
+        )
+
+    async def put_file(self, key: str, file: BinaryIO):
+        file.seek(0)
+        # Uploads in parts for large files, without reading them into memory
+        await asyncio.to_thread(self.client.upload_fileobj, file, self.bucket, key)
+
+    async def _get_body(self, key: str, byte_range: str | None = None):
+        kwargs = {"Bucket": self.bucket, "Key": key}
+        if byte_range:
+            kwargs["Range"] = byte_range
+        try:
+            response = await asyncio.to_thread(self.client.get_object, **kwargs)
+        except self._errors.NoSuchKey:
+            raise BlobNotFoundError(key) from None
+        return response["Body"]
+
+    async def read(self, key: str) -> bytes:
+        body = await self._get_body(key)
+        try:
+            return await asyncio.to_thread(body.read)
+        finally:
+            body.close()
+
+    async def stream(
+        self, key: str, start: int = 0, end: int | None = None
+    ) -> AsyncIterator[bytes]:
+        byte_range = None
+        if start or end is not None:
+            byte_range = f"bytes={start}-{'' if end is None else end}"
+
+        body = await self._get_body(key, byte_range)
+        try:
+            while chunk := await asyncio.to_thread(body.read, self.chunk_size):
+                yield chunk
+        finally:
+            body.close()
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(
+            self.client.delete_object, Bucket=self.bucket, Key=key
+        )
+
+
+def create_blob_store() -> BlobStore:
+    if settings.BLOB_STORE_BACKEND == "s3":
+        return S3BlobStore(
+            settings.S3_BUCKET,
+            settings.BLOB_STORE_CHUNK_BYTES,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+        )
+    return LocalBlobStore(settings.BLOB_STORE_PATH, settings.BLOB_STORE_CHUNK_BYTES)
+
+
+blob_store = create_blob_store()
@@ -0,0 +1,70 @@
+import gzip
+
+import zstandard
+
+IDENTITY = "identity"
+GZIP = "gzip"
+ZSTD = "zstd"
+
+# zstd frames are written without a dictionary so that browsers and other
+# HTTP clients can decode stored bytes sent with Content-Encoding as-is.
+_zstd_compressor = zstandard.ZstdCompressor(level=3)
+_zstd_decompressor = zstandard.ZstdDecompressor()
+
+
+def compress(data: bytes, encoding: str, min_size: int = 0) -> tuple[bytes, str]:
+    """Compress data with the given encoding when it is worth it.
+
+    Returns the stored bytes and the encoding they are in, which is identity
+    for data under min_size or data that doesn't shrink by at least 10%.
+    """
+    if encoding == IDENTITY or len(data) < min_size:
+        return data, IDENTITY
+
+    if encoding == ZSTD:
+        compressed = _zstd_compressor.compress(data)
+    elif encoding == GZIP:
+        compressed = gzip.compress(data, compresslevel=6, mtime=0)
+    else:
+        raise ValueError(f"Unsupported encoding: {encoding}")
+
+    if len(compressed) > len(data) * 0.9:
+        return data, IDENTITY
+    return compressed, encoding
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    if encoding == IDENTITY:
+        return data
+    if encoding == ZSTD:
+        return _zstd_decompressor.decompress(data)
+    if encoding == GZIP:
+        return gzip.decompress(data)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def accepts_encoding(accept_encoding: str | None, encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows a response in encoding."""
+    if encoding == IDENTITY:
+        return True
+    if not accept_encoding:
+        return False
+
+    wildcard = False
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        name = name.strip().lower()
+        if name == encoding:
+            return quality > 0
+        if name == "*":
+            wildcard = quality > 0
+    return wildcard
@@ -0,0 +1,66 @@
+from collections.abc import Mapping
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+
+def make_etag(value: str, weak: bool = False) -> str:
+    return f'{"W/" if weak else ""}"{value}"'
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.astimezone(UTC), usegmt=True)
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag.strip().removeprefix("W/")
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an ETag against an If-None-Match header."""
+    if if_none_match.strip() == "*":
+        return True
+    tag = _opaque_tag(etag)
+    return any(_opaque_tag(candidate) == tag for candidate in if_none_match.split(","))
+
+
+def is_not_modified(
+    headers: Mapping[str, str], etag: str, last_modified: datetime
+) -> bool:
+    """Whether a GET can be answered with 304 Not Modified.
+
+    If-None-Match takes precedence; If-Modified-Since is only used when the
+    request has no If-None-Match (RFC 9110, section 13.2.2).
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+
+def cache_control(
+    is_public: bool, expires_at: datetime | None, max_age: int
+) -> str:
+    """Let shared caches keep public pastes briefly, never past their expiry.
+
+    Private pastes depend on the Authorization header, so they may only be
+    stored by the browser and must be revalidated on every use.
+    """
+    if not is_public:
+        return "private, no-cache"
+
+    if expires_at is not None:
+        remaining = int((expires_at - datetime.now(UTC)).total_seconds())
+        max_age = max(0, min(max_age, remaining))
+    return f"public, max-age={max_age}"
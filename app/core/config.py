@@ -1,6 +1,7 @@
 from pydantic import Field, EmailStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 import secrets
+from typing import Literal
 from functools import lru_cache
 
 
@@ -36,6 +37,7 @@ class Settings(BaseSettings):
     REDIS_URL: str = Field(
         default="redis://localhost:6379", description="Redis connection string"
     )
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 0.5
 
     # JWT
     SECRET_KEY: str = Field(
@@ -44,13 +46,132 @@ class Settings(BaseSettings):
         description="Secret key for JWT (must be 32+ chars)",
     )
     ALGORITHM: str = "HS256"
+    # Asymmetric algorithms (EdDSA, ES256, ...) sign with <kid>.pem keys from
+    # this directory; the active kid signs, every key verifies and is in JWKS.
+    JWT_KEYS_DIR: str | None = None
+    JWT_ACTIVE_KID: str | None = None
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # tokens is partitioned by day of expiry; partitions are kept ready this
+    # many days past the longest token lifetime and dropped once the day is over
+    TOKEN_PARTITIONS_AHEAD_DAYS: int = 7
+    TOKEN_PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 3600
+
+    # Token revocation
+    # "database" checks the tokens table, "redis" checks the shared revoked set
+    # and falls back to the database when Redis is unreachable or not seeded.
+    REVOCATION_BACKEND: Literal["database", "redis"] = "database"
+    # How often Redis is checked for a missing seed (e.g. after a restart) and
+    # revocations that failed to reach it are retried
+    REVOCATION_STORE_SYNC_SECONDS: int = 30
+    REVOCATION_CACHE_SIZE: int = 100_000
+    REVOCATION_CACHE_TTL_SECONDS: int = 30
+    # Bloom filter over revoked jtis; a negative answer skips the revocation
+    # lookup entirely. Revocations on other workers are seen after a refresh.
+    REVOCATION_FILTER_ENABLED: bool = False
+    REVOCATION_FILTER_CAPACITY: int = 1_000_000
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001
+    REVOCATION_FILTER_REFRESH_SECONDS: int = 60
+    # Snapshot of revoked, unexpired access tokens used by fast-path (stateless)
+    # verification. Past the max staleness fast-path routes verify strictly, so
+    # disabling it makes every route strict.
+    REVOCATION_SNAPSHOT_ENABLED: bool = True
+    REVOCATION_SNAPSHOT_REFRESH_SECONDS: int = 10
+    REVOCATION_SNAPSHOT_MAX_STALENESS_SECONDS: int = 60
+
+    # Password hashing
+    PASSWORD_HASH_SCHEME: Literal["bcrypt", "argon2"] = "bcrypt"
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    # When > 0 the cost is benchmarked at startup to verify in about this long
+    PASSWORD_HASH_TARGET_MS: int = 0
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
 
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = True
     DEFAULT_RATE_LIMIT: str = "10/minute"
     AUTHENTICATED_RATE_LIMIT: str = "100/minute"
+    # GET/HEAD requests from anyone, counted apart from the limits above
+    READ_RATE_LIMIT: str = "600/minute"
+    RATE_LIMIT_BACKEND: Literal["memory", "redis"] = "memory"
+    RATE_LIMIT_MEMORY_MAXSIZE: int = 100_000
+
+    # Short URLs: sequence values run through a keyed permutation. The key must
+    # be the same on every worker and never change once pastes exist.
+    SHORT_ID_KEY: str | None = None  # falls back to SECRET_KEY
+    SHORT_ID_BLOCK_SIZE: int = 1000
+
+    # Paste bodies at or above this size are stored compressed
+    PASTE_COMPRESSION: Literal["zstd", "gzip", "identity"] = "zstd"
+    PASTE_COMPRESSION_MIN_BYTES: int = 1024
+
+    # Bodies at or above this size live in the blob store, uncompressed so
+    # that Range requests map directly onto stored bytes
+    BLOB_STORE_THRESHOLD_BYTES: int = 1024 * 1024
+    BLOB_STORE_BACKEND: Literal["local", "s3"] = "local"
+    BLOB_STORE_PATH: str = "data/blobs"
+    BLOB_STORE_CHUNK_BYTES: int = 64 * 1024
+    S3_BUCKET: str = "fastbin-pastes"
+    S3_ENDPOINT_URL: str | None = None  # e.g. http://localhost:9000 for MinIO
+    S3_REGION: str | None = None
+    S3_ACCESS_KEY_ID: str | None = None
+    S3_SECRET_ACCESS_KEY: str | None = Field(default=None, repr=False)
+    # Limit for streamed uploads, which are spooled to disk past the blob
+    # threshold instead of being held in memory
+    PASTE_UPLOAD_MAX_BYTES: int = 50 * 1024 * 1024
+    # Blob store bodies over this size are cut short in JSON and HTML views,
+    # which point to /raw for the whole body
+    PASTE_INLINE_MAX_BYTES: int = 1024 * 1024
+
+    # Search indexes this many characters from the start of each body
+    SEARCH_INDEX_MAX_CHARS: int = 32 * 1024
+    # Searches running longer than this are cancelled
+    SEARCH_TIMEOUT_MS: int = 2000
+    # Word searches rank at most this many matches, the newest ones
+    SEARCH_RANK_MAX_CANDIDATES: int = 1000
+
+    # Paste read cache
+    PASTE_CACHE_ENABLED: bool = True
+    PASTE_CACHE_REDIS_ENABLED: bool = False
+    PASTE_CACHE_MAX_ENTRIES: int = 10_000
+    PASTE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    PASTE_CACHE_MAX_ITEM_BYTES: int = 1024 * 1024
+    # Other workers can't invalidate the in-process tier, so keep it short
+    PASTE_CACHE_LOCAL_TTL_SECONDS: int = 30
+    PASTE_CACHE_REDIS_TTL_SECONDS: int = 3600
+    # max-age of public paste responses in browsers and CDNs; an edit or
+    # delete may stay invisible to clients for this long
+    PASTE_HTTP_MAX_AGE_SECONDS: int = 60
+
+    # Feed of the newest public pastes, served from memory. Workers reload it
+    # from Redis, or from the database without it, every refresh interval.
+    RECENT_FEED_SIZE: int = 100
+    RECENT_FEED_REDIS_ENABLED: bool = False
+    RECENT_FEED_REFRESH_SECONDS: int = 5
+
+    # Syntax highlighting
+    HIGHLIGHT_DEFAULT_THEME: str = "default"
+    # Bodies up to this size render on the event loop, larger ones in the pool
+    HIGHLIGHT_INLINE_MAX_BYTES: int = 16 * 1024
+    # Larger bodies are shown as plain text
+    HIGHLIGHT_MAX_BYTES: int = 512 * 1024
+    HIGHLIGHT_WORKERS: int = 2
+    HIGHLIGHT_QUEUE_SIZE: int = 16
+    HIGHLIGHT_CACHE_MAX_ENTRIES: int = 5_000
+    HIGHLIGHT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    HIGHLIGHT_CACHE_REDIS_ENABLED: bool = False
+    HIGHLIGHT_CACHE_REDIS_TTL_SECONDS: int = 86_400
+
+    # Language detection for pastes created as "plaintext", run in batches in
+    # the background on the first LANGUAGE_DETECTION_PREFIX_CHARS characters
+    LANGUAGE_DETECTION_ENABLED: bool = True
+    LANGUAGE_DETECTION_PREFIX_CHARS: int = 4096
+    LANGUAGE_DETECTION_BATCH_SIZE: int = 100
+    LANGUAGE_DETECTION_QUEUE_SIZE: int = 10_000
+    LANGUAGE_DETECTION_INTERVAL_SECONDS: int = 2
 
     # Notifications
     ENABLE_NOTIFICATIONS: bool = False
@@ -64,8 +185,18 @@ class Settings(BaseSettings):
 
     # Analytics
     ANALYTICS_BATCH_SIZE: int = 100
+    VIEW_COUNT_FLUSH_INTERVAL_SECONDS: int = 10
+    # Views held in memory per worker; a flush is forced at half of it and
+    # views past it are dropped. Also bounds views lost if a worker crashes.
+    VIEW_COUNT_MAX_PENDING: int = 10_000
     ANALYTICS_RETENTION_DAYS: int = 90
 
+    # Expired paste cleanup; the pause between batches caps its I/O
+    PASTE_REAPER_ENABLED: bool = True
+    PASTE_REAPER_INTERVAL_SECONDS: int = 300
+    PASTE_REAPER_BATCH_SIZE: int = 500
+    PASTE_REAPER_BATCH_SLEEP_SECONDS: float = 0.5
+
     # OAUTH
     GOOGLE_OAUTH_CLIENT_ID: str
     GOOGLE_OAUTH_CLIENT_SECRET: str
@@ -0,0 +1,91 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+
+class ExecutorBusyError(Exception):
+    """Raised when a BoundedExecutor already has its maximum of queued jobs."""
+
+
+def _timed_call(enqueued_at: float, func: Callable[..., Any], args: tuple) -> tuple:
+    # time.monotonic is system-wide, so this also works in a worker process
+    return time.monotonic() - enqueued_at, func(*args)
+
+
+class BoundedExecutor:
+    """Worker pool for blocking CPU work called from async code.
+
+    Jobs beyond max_workers wait in a queue of at most max_queue entries;
+    submissions past that are rejected instead of piling up. Time spent
+    waiting for a free worker is tracked so the pool can be sized.
+
+    With processes=True jobs run in spawned processes, for pure-Python work
+    that would otherwise hold the GIL; func and its arguments must then be
+    picklable.
+    """
+
+    def __init__(
+        self, max_workers: int, max_queue: int, name: str, processes: bool = False
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        if processes:
+            self._executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=name
+            )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise ExecutorBusyError(f"{self._in_flight} jobs already in flight")
+            self._in_flight += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            wait, result = await loop.run_in_executor(
+                self._executor, _timed_call, time.monotonic(), func, args
+            )
+            with self._lock:
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queued": max(0, self._in_flight - self.max_workers),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_queue_wait_ms": (
+                    self._total_wait / self._completed * 1000
+                    if self._completed
+                    else 0.0
+                ),
+                "max_queue_wait_ms": self._max_wait * 1000,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
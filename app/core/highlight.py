@@ -0,0 +1,139 @@
+import html
+import logging
+from functools import lru_cache
+
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import get_lexer_by_name
+from pygments.lexers.special import TextLexer
+from pygments.styles import get_all_styles
+from pygments.util import ClassNotFound
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.executor import BoundedExecutor, ExecutorBusyError
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+RENDER_KEY_PREFIX = "render:"
+THEMES = frozenset(get_all_styles())
+
+
+def render_html(content: str, language: str | None) -> str:
+    """Highlight content as HTML; runs in the render worker processes."""
+    try:
+        lexer = get_lexer_by_name(language or "text", stripnl=False)
+    except ClassNotFound:
+        lexer = TextLexer(stripnl=False)
+    return highlight(content, lexer, HtmlFormatter(cssclass="highlight"))
+
+
+def render_plain(content: str) -> str:
+    return f'<div class="highlight"><pre>{html.escape(content)}</pre></div>'
+
+
+@lru_cache
+def theme_css(theme: str) -> str:
+    return HtmlFormatter(style=theme).get_style_defs(".highlight")
+
+
+class Highlighter:
+    """Renders pastes to highlighted HTML at most once per body and language.
+
+    Rendered HTML only depends on the content hash, the language and how much
+    of the body was shown (views may get a truncated body; themes are plain
+    CSS on top), so entries never need invalidating. They live in
+    a per-worker LRU bounded by bytes and, optionally, in Redis.
+
+    Small bodies render inline, larger ones in a process pool, and bodies over
+    HIGHLIGHT_MAX_BYTES or arriving while the pool is saturated fall back to
+    escaped plain text.
+    """
+
+    def __init__(self, redis: Redis | None):
+        self.cache = TTLCache(
+            maxsize=settings.HIGHLIGHT_CACHE_MAX_ENTRIES,
+            max_bytes=settings.HIGHLIGHT_CACHE_MAX_BYTES,
+            sizeof=len,
+        )
+        self.redis = redis
+        self.executor = BoundedExecutor(
+            max_workers=settings.HIGHLIGHT_WORKERS,
+            max_queue=settings.HIGHLIGHT_QUEUE_SIZE,
+            name="highlight",
+            processes=True,
+        )
+        self.renders = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def _key(content_hash: str, size: int, language: str | None) -> str:
+        return f"{RENDER_KEY_PREFIX}{content_hash}:{size}:{language or 'text'}"
+
+    async def _get_persisted(self, key: str) -> str | None:
+        if self.redis is None:
+            return None
+        try:
+            return await self.redis.get(key)
+        except RedisError:
+            logger.warning("Redis unavailable, skipping render cache")
+            return None
+
+    async def _persist(self, key: str, rendered: str):
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(
+                key, rendered, ex=settings.HIGHLIGHT_CACHE_REDIS_TTL_SECONDS
+            )
+        except RedisError:
+            logger.warning("Could not write rendered paste to Redis")
+
+    async def render(
+        self, content_hash: str, content: str, language: str | None
+    ) -> str:
+        size = len(content.encode("utf-8"))
+        if size > settings.HIGHLIGHT_MAX_BYTES:
+            self.fallbacks += 1
+            return render_plain(content)
+
+        key = self._key(content_hash, size, language)
+        rendered = self.cache.get(key)
+        if rendered is not None:
+            return rendered
+
+        rendered = await self._get_persisted(key)
+        if rendered is not None:
+            self.cache.set(key, rendered)
+            return rendered
+
+        if size <= settings.HIGHLIGHT_INLINE_MAX_BYTES:
+            rendered = render_html(content, language)
+        else:
+            try:
+                rendered = await self.executor.run(render_html, content, language)
+            except ExecutorBusyError:
+                # Not cached, so a later view can still get it highlighted
+                self.fallbacks += 1
+                return render_plain(content)
+
+        self.renders += 1
+        self.cache.set(key, rendered)
+        await self._persist(key, rendered)
+        return rendered
+
+    def stats(self) -> dict:
+        return {
+            "cache": self.cache.stats(),
+            "renders": self.renders,
+            "fallbacks": self.fallbacks,
+            "pool": self.executor.stats(),
+        }
+
+
+highlighter = Highlighter(
+    redis_client if settings.HIGHLIGHT_CACHE_REDIS_ENABLED else None
+)
@@ -0,0 +1,115 @@
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import jwt
+from jwt.algorithms import get_default_algorithms
+from jwt.utils import base64url_encode
+
+SYMMETRIC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+DEFAULT_KID = "default"
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    # Prepared once: a cryptography key object, or the raw bytes for HMAC
+    signing_key: Any
+    # Carries its prepared key, so PyJWT skips parsing it on every decode
+    verification_key: jwt.PyJWK
+    public_jwk: dict | None
+
+
+class KeyManager:
+    """Holds the prepared JWT keys and picks the right one per token.
+
+    HMAC algorithms use SECRET_KEY. EdDSA/ES256 (and other asymmetric
+    algorithms) load every <kid>.pem private key in keys_dir. Tokens are
+    signed with the active kid and verified with the key named by their
+    "kid" header, so keys can be rotated by adding a new file, switching the
+    active kid, and removing the old file once its tokens have expired.
+    """
+
+    def __init__(self, keys: list[SigningKey], active_kid: str):
+        self._keys = {key.kid: key for key in keys}
+        if active_kid not in self._keys:
+            raise ValueError(f"No JWT key with kid {active_kid!r}")
+        self.active = self._keys[active_kid]
+
+    @classmethod
+    def load(
+        cls,
+        algorithm: str,
+        secret: str,
+        keys_dir: str | None = None,
+        active_kid: str | None = None,
+    ) -> "KeyManager":
+        algorithm_impl = get_default_algorithms().get(algorithm)
+        if algorithm_impl is None:
+            raise ValueError(f"Unsupported JWT algorithm {algorithm!r}")
+
+        if algorithm in SYMMETRIC_ALGORITHMS:
+            kid = active_kid or DEFAULT_KID
+            secret_bytes = secret.encode("utf-8")
+            jwk = {"kty": "oct", "k": base64url_encode(secret_bytes).decode("ascii")}
+            key = SigningKey(
+                kid=kid,
+                algorithm=algorithm,
+                signing_key=algorithm_impl.prepare_key(secret_bytes),
+                verification_key=jwt.PyJWK(jwk, algorithm),
+                public_jwk=None,
+            )
+            return cls([key], kid)
+
+        if not keys_dir:
+            raise ValueError(f"JWT_KEYS_DIR must be set to use {algorithm}")
+
+        keys = []
+        for path in sorted(Path(keys_dir).glob("*.pem")):
+            private_key = algorithm_impl.prepare_key(path.read_bytes())
+            public_jwk = json.loads(algorithm_impl.to_jwk(private_key.public_key()))
+            public_jwk.update({"kid": path.stem, "alg": algorithm, "use": "sig"})
+            keys.append(
+                SigningKey(
+                    kid=path.stem,
+                    algorithm=algorithm,
+                    signing_key=private_key,
+                    verification_key=jwt.PyJWK(public_jwk, algorithm),
+                    public_jwk=public_jwk,
+                )
+            )
+
+        if not keys:
+            raise ValueError(f"No *.pem keys found in {keys_dir}")
+
+        # Without an explicit active kid the last one in sort order signs
+        return cls(keys, active_kid or keys[-1].kid)
+
+    def encode(self, payload: dict) -> str:
+        return jwt.encode(
+            payload,
+            self.active.signing_key,
+            algorithm=self.active.algorithm,
+            headers={"kid": self.active.kid},
+        )
+
+    def decode(self, token: str, **options: Any) -> dict:
+        # Only pay for parsing the header when there is a key to choose
+        key = self.active
+        if len(self._keys) > 1:
+            kid = jwt.get_unverified_header(token).get("kid", self.active.kid)
+            key = self._keys.get(kid)
+            if key is None:
+                raise jwt.InvalidTokenError(f"Unknown key id {kid!r}")
+
+        return jwt.decode(
+            token, key.verification_key, algorithms=[key.algorithm], **options
+        )
+
+    def jwks(self) -> dict:
+        """Public keys in JWKS form; empty for HMAC, whose key must stay secret."""
+        return {
+            "keys": [key.public_jwk for key in self._keys.values() if key.public_jwk]
+        }
@@ -0,0 +1,141 @@
+import json
+import re
+
+# Signatures per language, keyed by the Pygments alias the highlighter uses.
+# A language scores one point per signature found in the text.
+SIGNATURES: dict[str, tuple[str, ...]] = {
+    "python": (
+        r"^\s*def \w+\(.*\)( -> .+)?:\s*$",
+        r"^\s*(from [\w.]+ )?import \w+",
+        r"^\s*class \w+(\(.*\))?:\s*$",
+        r"\bself\.\w+",
+        r"^if __name__ == ['\"]__main__['\"]:",
+        r"^\s*(elif .+|else|try|except( \w+)?( as \w+)?):\s*$",
+    ),
+    "javascript": (
+        r"^\s*(const|let|var) \w+ = ",
+        r"\bfunction\s*\w*\s*\(",
+        r"\bconsole\.\w+\(",
+        r"\brequire\(['\"]",
+        r"\)\s*=>\s*[{(]?",
+        r"^\s*(module\.)?exports?\b",
+    ),
+    "typescript": (
+        r"\w+\??: (string|number|boolean|any|unknown|void)\b",
+        r"^\s*(export )?interface \w+",
+        r"^\s*(export )?type \w+ = ",
+        r"^import .+ from ['\"]",
+    ),
+    "go": (
+        r"^package \w+\s*$",
+        r"^func (\(\w+ \*?\w+\) )?\w+\(",
+        r"\w+ := ",
+        r"\bfmt\.\w+\(",
+        r"^import \($",
+    ),
+    "rust": (
+        r"^\s*(pub )?fn \w+(<.+>)?\(",
+        r"\blet mut \w+",
+        r"^\s*impl\b",
+        r"\b(println|format|vec)!\(",
+        r"^use \w+(::\w+)+",
+    ),
+    "c": (
+        r"^#include <\w+\.h>",
+        r"^\s*int main\s*\(",
+        r"\b(printf|malloc|free)\(",
+        r"^#define \w+",
+    ),
+    "cpp": (
+        r"^#include <\w+>\s*$",
+        r"\bstd::\w+",
+        r"\b(cout|cerr)\s*<<",
+        r"^\s*template\s*<",
+        r"^using namespace \w+;",
+    ),
+    "java": (
+        r"^\s*public (final )?class \w+",
+        r"\bpublic static void main\(",
+        r"\bSystem\.out\.print",
+        r"^import java\.",
+        r"^\s*@Override\s*$",
+    ),
+    "bash": (
+        r"\A#!.*\b(ba|z)?sh\b",
+        r"^\s*echo\b",
+        r"^\s*(if \[|fi$|done$|esac$)",
+        # "${var...}" or "$(cmd)" in double quotes; a bare $ is shared with
+        # PHP, Perl and prices, and ${} or $( alone with JS and jQuery
+        r'"[^"\n]*\$(\{\w+[^}\n]*\}|\(\w)[^"\n]*"',
+        r"^\s*export \w+=",
+    ),
+    "sql": (
+        r"(?i)^\s*select\b.+\bfrom\b",
+        r"(?i)^\s*insert into\b",
+        r"(?i)^\s*(create|alter|drop) (table|index|view)\b",
+        r"(?i)^\s*(where|group by|order by|join)\b",
+    ),
+    "html": (
+        r"(?i)<!doctype html",
+        r"(?i)</?(html|head|body|div|span|script|a href)\b",
+        r"(?i)</\w+>",
+    ),
+    "css": (
+        r"^\s*[.#]?[\w-]+(\s*[,>]\s*[.#]?[\w-]+)*\s*\{\s*$",
+        r"^\s*[\w-]+:\s*[^;{}]+;\s*$",
+        r"^\s*@(media|import|keyframes)\b",
+    ),
+    "yaml": (
+        r"\A---\s*$",
+        r"^[\w-]+:\s*$",
+        r"^\s+[\w-]+: \S",
+        r"^\s*- [\w-]+(: |$)",
+    ),
+    "markdown": (
+        r"^#{1,6} \S",
+        r"^```",
+        r"\[[^\]]+\]\([^)]+\)",
+        r"^\s*[-*] \S",
+    ),
+}
+
+# Fewer matching signatures than this is too weak a signal to act on
+MIN_SCORE = 2
+
+_COMPILED = {
+    language: tuple(re.compile(pattern, re.MULTILINE) for pattern in patterns)
+    for language, patterns in SIGNATURES.items()
+}
+
+
+def _is_json(text: str) -> bool:
+    text = text.strip()
+    if not text or text[0] not in "[{":
+        return False
+    try:
+        json.loads(text)
+    except ValueError:
+        return False
+    return True
+
+
+def detect_language(text: str) -> str | None:
+    """Guess the language of text, or None when no language clearly wins."""
+    if _is_json(text):
+        return "json"
+
+    scores = sorted(
+        (
+            (sum(1 for pattern in patterns if pattern.search(text)), language)
+            for language, patterns in _COMPILED.items()
+        ),
+        reverse=True,
+    )
+    (best, language), (runner_up, _) = scores[0], scores[1]
+    if best < MIN_SCORE or best == runner_up:
+        return None
+    return language
+
+
+def detect_languages(texts: list[str]) -> list[str | None]:
+    return [detect_language(text) for text in texts]
@@ -0,0 +1,47 @@
+import base64
+import binascii
+from datetime import datetime
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def _encode(*parts: str) -> str:
+    raw = "|".join(parts).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _decode(cursor: str) -> list[str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return raw.decode().split("|")
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError(cursor) from None
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Opaque cursor pointing just past the row with this sort key."""
+    return _encode(created_at.isoformat(), str(id))
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(id)
+    except ValueError:
+        raise InvalidCursorError(cursor) from None
+
+
+def encode_rank_cursor(rank: float, id: int) -> str:
+    """Like encode_cursor, for results ordered by a relevance score."""
+    # float.hex round-trips exactly, so the next page starts at the same row
+    return _encode(rank.hex(), str(id))
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        rank, id = _decode(cursor)
+        return float.fromhex(rank), int(id)
+    except ValueError:
+        raise InvalidCursorError(cursor) from None
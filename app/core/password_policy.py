@@ -0,0 +1,71 @@
+import time
+from dataclasses import dataclass, replace
+from typing import Literal
+
+from passlib.context import CryptContext
+
+SUPPORTED_SCHEMES = ("argon2", "bcrypt")
+
+# Calibration never goes below these, whatever the target latency
+MIN_BCRYPT_ROUNDS = 10
+MIN_ARGON2_TIME_COST = 2
+
+
+@dataclass(frozen=True)
+class PasswordPolicy:
+    scheme: Literal["bcrypt", "argon2"] = "bcrypt"
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536
+    argon2_parallelism: int = 4
+
+    def build_context(self) -> CryptContext:
+        """Build a CryptContext hashing with this policy.
+
+        Hashes from other schemes, or with a cost outside +-1 of the policy,
+        are reported by needs_update so they get rehashed on the next login.
+        The +-1 band keeps workers that calibrated slightly differently from
+        rehashing each other's hashes back and forth.
+        """
+        schemes = [self.scheme] + [s for s in SUPPORTED_SCHEMES if s != self.scheme]
+        return CryptContext(
+            schemes=schemes,
+            deprecated="auto",
+            bcrypt__rounds=self.bcrypt_rounds,
+            bcrypt__min_rounds=self.bcrypt_rounds - 1,
+            bcrypt__max_rounds=self.bcrypt_rounds + 1,
+            argon2__type="ID",
+            argon2__rounds=self.argon2_time_cost,
+            argon2__min_rounds=max(1, self.argon2_time_cost - 1),
+            argon2__max_rounds=self.argon2_time_cost + 1,
+            argon2__memory_cost=self.argon2_memory_cost,
+            argon2__parallelism=self.argon2_parallelism,
+        )
+
+
+def _measure_ms(context: CryptContext, samples: int = 3) -> float:
+    hashed = context.hash("calibration-password")
+    started_at = time.perf_counter()
+    for _ in range(samples):
+        context.verify("calibration-password", hashed)
+    return (time.perf_counter() - started_at) / samples * 1000
+
+
+def calibrate(policy: PasswordPolicy, target_ms: float) -> PasswordPolicy:
+    """Return policy with the highest cost whose verification fits target_ms."""
+    if policy.scheme == "bcrypt":
+        # Each bcrypt round doubles the work
+        rounds = MIN_BCRYPT_ROUNDS
+        elapsed = _measure_ms(replace(policy, bcrypt_rounds=rounds).build_context())
+        while elapsed * 2 <= target_ms and rounds < 31:
+            rounds += 1
+            elapsed *= 2
+        return replace(policy, bcrypt_rounds=rounds)
+
+    time_cost = MIN_ARGON2_TIME_COST
+    elapsed = _measure_ms(replace(policy, argon2_time_cost=time_cost).build_context())
+    per_pass = elapsed / time_cost
+    while elapsed + per_pass <= target_ms:
+        time_cost += 1
+        elapsed += per_pass
+    return replace(policy, argon2_time_cost=time_cost)
@@ -0,0 +1,144 @@
+import json
+import logging
+from datetime import UTC, datetime
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the serialized entry gains or changes fields
+PASTE_KEY_PREFIX = "paste:v2:"
+
+# Rough per-entry overhead on top of the content itself
+ENTRY_OVERHEAD_BYTES = 512
+
+
+def entry_size(entry: dict) -> int:
+    return len(entry["content"]) + len(entry["title"] or "") + ENTRY_OVERHEAD_BYTES
+
+
+class PasteCache:
+    """Two-tier read cache for serialized pastes keyed by short_url.
+
+    The in-process tier is bounded by entry count and bytes and uses a short
+    TTL, since other workers can't invalidate it; the Redis tier is shared and
+    invalidated explicitly on update/delete. Neither tier keeps an entry past
+    the paste's expires_at.
+    """
+
+    def __init__(self, redis: Redis | None):
+        self.local = TTLCache(
+            maxsize=settings.PASTE_CACHE_MAX_ENTRIES,
+            max_bytes=settings.PASTE_CACHE_MAX_BYTES,
+            sizeof=entry_size,
+        )
+        self.redis = redis
+        self.redis_hits = 0
+        self.redis_misses = 0
+
+    @staticmethod
+    def _ttl(entry: dict, ttl: float) -> float:
+        if entry["expires_at"] is None:
+            return ttl
+        expires_at = datetime.fromisoformat(entry["expires_at"])
+        return min(ttl, (expires_at - datetime.now(UTC)).total_seconds())
+
+    async def get(self, short_url: str) -> dict | None:
+        if not settings.PASTE_CACHE_ENABLED:
+            return None
+
+        entry = self.local.get(short_url)
+        if entry is not None or self.redis is None:
+            return entry
+
+        try:
+            raw = await self.redis.get(f"{PASTE_KEY_PREFIX}{short_url}")
+        except RedisError:
+            logger.warning("Redis unavailable, skipping paste cache")
+            return None
+
+        if raw is None:
+            self.redis_misses += 1
+            return None
+
+        self.redis_hits += 1
+        entry = json.loads(raw)
+        self._set_local(entry)
+        return entry
+
+    def _set_local(self, entry: dict):
+        ttl = self._ttl(entry, settings.PASTE_CACHE_LOCAL_TTL_SECONDS)
+        self.local.set(entry["short_url"], entry, ttl=ttl)
+
+    async def set(self, entry: dict):
+        if not settings.PASTE_CACHE_ENABLED:
+            return
+        if entry_size(entry) > settings.PASTE_CACHE_MAX_ITEM_BYTES:
+            return
+
+        short_url = entry["short_url"]
+        self._set_local(entry)
+
+        if self.redis is None:
+            return
+
+        ttl = self._ttl(entry, settings.PASTE_CACHE_REDIS_TTL_SECONDS)
+        if ttl <= 0:
+            return
+        try:
+            await self.redis.set(
+                f"{PASTE_KEY_PREFIX}{short_url}", json.dumps(entry), px=int(ttl * 1000)
+            )
+        except RedisError:
+            logger.warning("Could not write paste %s to Redis", short_url)
+
+    async def invalidate(self, short_url: str):
+        self.local.delete(short_url)
+        if self.redis is None:
+            return
+
+        try:
+            await self.redis.delete(f"{PASTE_KEY_PREFIX}{short_url}")
+        except RedisError:
+            logger.warning("Could not invalidate paste %s in Redis", short_url)
+
+    def set_view_counts(self, view_counts: dict[str, int]):
+        """Patch flushed view counts into the in-process tier.
+
+        The entries are updated in place, so their TTLs still run out and
+        edits made on other workers show up as usual.
+        """
+        for short_url, view_count in view_counts.items():
+            entry = self.local.get(short_url)
+            if entry is not None:
+                entry["view_count"] = view_count
+
+    async def invalidate_shared(self, short_urls: list[str]):
+        """Drop entries from the Redis tier only."""
+        if self.redis is None or not short_urls:
+            return
+
+        try:
+            await self.redis.delete(
+                *(f"{PASTE_KEY_PREFIX}{short_url}" for short_url in short_urls)
+            )
+        except RedisError:
+            logger.warning("Could not invalidate %d pastes in Redis", len(short_urls))
+
+    def stats(self) -> dict:
+        return {
+            "local": self.local.stats(),
+            "redis": (
+                {"hits": self.redis_hits, "misses": self.redis_misses}
+                if self.redis is not None
+                else None
+            ),
+        }
+
+
+paste_cache = PasteCache(redis_client if settings.PASTE_CACHE_REDIS_ENABLED else None)
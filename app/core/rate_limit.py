@@ -0,0 +1,146 @@
+import logging
+import math
+import re
+import time
+from dataclasses import dataclass
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+_RATE_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*$")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    limit: int
+    period: float
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """Parse limits like "10/minute" or "100/5minutes"."""
+        match = _RATE_PATTERN.match(value.lower())
+        if not match:
+            raise ValueError(f"Invalid rate limit: {value!r}")
+
+        limit, multiplier, unit = match.groups()
+        period = int(multiplier or 1) * PERIODS[unit]
+        if int(limit) <= 0 or period <= 0:
+            raise ValueError(f"Invalid rate limit: {value!r}")
+        return cls(limit=int(limit), period=period)
+
+    @property
+    def refill_rate(self) -> float:
+        """Tokens added back to a bucket per second."""
+        return self.limit / self.period
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    # Seconds until the bucket is full again / until the next request fits
+    reset_after: float
+    retry_after: float
+
+    @classmethod
+    def from_tokens(
+        cls, rate_limit: RateLimit, allowed: bool, tokens: float, cost: int
+    ) -> "RateLimitResult":
+        rate = rate_limit.refill_rate
+        return cls(
+            allowed=allowed,
+            limit=rate_limit.limit,
+            remaining=max(0, math.floor(tokens)),
+            reset_after=(rate_limit.limit - tokens) / rate,
+            retry_after=0.0 if allowed else (cost - tokens) / rate,
+        )
+
+
+class MemoryRateLimitBackend:
+    """Token buckets kept in this process, evicting the least recently used."""
+
+    def __init__(self, maxsize: int = 100_000):
+        self._buckets = TTLCache(maxsize=maxsize)
+
+    async def hit(self, key: str, rate_limit: RateLimit, cost: int = 1):
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key) or (rate_limit.limit, now)
+        tokens = min(
+            rate_limit.limit, tokens + (now - updated_at) * rate_limit.refill_rate
+        )
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+
+        # An idle bucket is full again after one period, so it can be dropped
+        self._buckets.set(key, (tokens, now), ttl=rate_limit.period)
+        return RateLimitResult.from_tokens(rate_limit, allowed, tokens, cost)
+
+
+# Refill and take from a bucket atomically, using the Redis clock so every
+# node agrees on elapsed time. Floats are returned as strings because Lua
+# numbers are truncated to integers in replies.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local ttl_ms = tonumber(ARGV[4])
+
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], ttl_ms)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimitBackend:
+    """Token buckets shared by every worker through Redis.
+
+    Fails open: if Redis can't be reached the request is allowed.
+    """
+
+    def __init__(self, client: Redis, prefix: str = "ratelimit:"):
+        self.prefix = prefix
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def hit(self, key: str, rate_limit: RateLimit, cost: int = 1):
+        try:
+            allowed, tokens = await self._script(
+                keys=[f"{self.prefix}{key}"],
+                args=[
+                    rate_limit.limit,
+                    rate_limit.refill_rate,
+                    cost,
+                    math.ceil(rate_limit.period * 1000),
+                ],
+            )
+        except RedisError:
+            logger.warning("Redis unavailable, skipping rate limit for %s", key)
+            return RateLimitResult.from_tokens(
+                rate_limit, True, rate_limit.limit, cost
+            )
+
+        return RateLimitResult.from_tokens(
+            rate_limit, bool(int(allowed)), float(tokens), cost
+        )
@@ -0,0 +1,198 @@
+import bisect
+import json
+import logging
+from datetime import UTC, datetime
+from typing import NamedTuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Members are short_urls scored by created_at; the summaries live in a hash
+# next to it so that an entry can be replaced or removed by short_url
+FEED_KEY = "feed:recent:v1"
+FEED_ITEMS_KEY = "feed:recent:v1:items"
+
+# Add or replace an entry, then trim the feed back to its size, removing
+# trimmed entries from both keys in the same step.
+PUSH_SCRIPT = """
+local size = tonumber(ARGV[4])
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[3])
+local stale = redis.call('ZRANGE', KEYS[1], 0, -size - 1)
+if #stale > 0 then
+    redis.call('ZREM', KEYS[1], unpack(stale))
+    redis.call('HDEL', KEYS[2], unpack(stale))
+end
+return #stale
+"""
+
+
+def _parse(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+class FeedItem(NamedTuple):
+    created_at: datetime
+    short_url: str
+    expires_at: datetime | None
+    entry: dict
+
+    @classmethod
+    def from_entry(cls, entry: dict) -> "FeedItem":
+        return cls(
+            _parse(entry["created_at"]),
+            entry["short_url"],
+            _parse(entry["expires_at"]),
+            entry,
+        )
+
+    def sort_key(self) -> tuple[datetime, str]:
+        return self.created_at, self.short_url
+
+
+class RecentFeed:
+    """The newest public pastes, kept ready to serve without a query.
+
+    Entries are JSON-friendly paste summaries. Each worker holds the feed in
+    memory, oldest first and bounded to RECENT_FEED_SIZE entries, and pushes
+    its own writes into it as they happen. With Redis the feed is mirrored to
+    a sorted set that every worker writes to and periodically reloads from;
+    without it, workers reload from the database instead. Expired pastes are
+    skipped when the feed is read, until they are removed.
+    """
+
+    def __init__(self, redis: Redis | None, size: int):
+        self.redis = redis
+        self.size = size
+        self.items: list[FeedItem] = []
+        self.loaded_at: datetime | None = None
+        self._push_script = redis.register_script(PUSH_SCRIPT) if redis else None
+        self._pushes = 0
+
+    def recent(self, limit: int) -> list[dict]:
+        """Up to limit entries, newest first."""
+        now = datetime.now(UTC)
+        entries = []
+        for item in reversed(self.items):
+            if item.expires_at is not None and item.expires_at <= now:
+                continue
+            entries.append(item.entry)
+            if len(entries) == limit:
+                break
+        return entries
+
+    def _find(self, short_url: str) -> int | None:
+        for i, item in enumerate(self.items):
+            if item.short_url == short_url:
+                return i
+        return None
+
+    def _insert(self, item: FeedItem):
+        index = self._find(item.short_url)
+        if index is not None:
+            del self.items[index]
+        bisect.insort(self.items, item, key=FeedItem.sort_key)
+        if len(self.items) > self.size:
+            del self.items[: len(self.items) - self.size]
+
+    async def push(self, entry: dict):
+        """Add or replace a public paste's entry."""
+        item = FeedItem.from_entry(entry)
+        self._insert(item)
+        self._pushes += 1
+
+        if self._push_script is None:
+            return
+        try:
+            await self._push_script(
+                keys=[FEED_KEY, FEED_ITEMS_KEY],
+                args=[
+                    item.short_url,
+                    item.created_at.timestamp(),
+                    json.dumps(entry),
+                    self.size,
+                ],
+            )
+        except RedisError:
+            logger.warning("Could not push paste %s to the feed", item.short_url)
+
+    async def update(self, short_url: str, **changes):
+        """Change fields of an entry, if the paste is in the feed."""
+        index = self._find(short_url)
+        if index is not None:
+            await self.push({**self.items[index].entry, **changes})
+
+    async def remove(self, short_url: str):
+        index = self._find(short_url)
+        if index is not None:
+            del self.items[index]
+
+        if self.redis is None:
+            return
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.zrem(FEED_KEY, short_url)
+                pipe.hdel(FEED_ITEMS_KEY, short_url)
+                await pipe.execute()
+        except RedisError:
+            logger.warning("Could not remove paste %s from the feed", short_url)
+
+    def replace(self, entries: list[dict]):
+        items = sorted(map(FeedItem.from_entry, entries), key=FeedItem.sort_key)
+        self.items = items[-self.size :]
+        self.loaded_at = datetime.now(UTC)
+
+    async def pull(self) -> bool:
+        """Reload the feed from Redis; False if it has to come from elsewhere.
+
+        Removals leave the Redis feed short and pushes only refill it from the
+        top, so a feed with fewer than size entries is reseeded as well.
+        """
+        if self.redis is None:
+            return False
+        try:
+            raw = await self.redis.hgetall(FEED_ITEMS_KEY)
+        except RedisError:
+            logger.warning("Redis unavailable, can't reload the feed")
+            return False
+        if len(raw) < self.size:
+            return False
+
+        self.replace([json.loads(value) for value in raw.values()])
+        return True
+
+    async def seed(self, entries: list[dict]):
+        """Replace the feed with entries loaded from the database.
+
+        Redis is only added to, so pushes made by other workers while the
+        entries were loaded are kept; the next push trims it.
+        """
+        self.replace(entries)
+        if self.redis is None or not self.items:
+            return
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for item in self.items:
+                    pipe.zadd(FEED_KEY, {item.short_url: item.created_at.timestamp()})
+                    pipe.hset(FEED_ITEMS_KEY, item.short_url, json.dumps(item.entry))
+                await pipe.execute()
+        except RedisError:
+            logger.warning("Could not seed the feed in Redis")
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.items),
+            "pushes": self._pushes,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+        }
+
+
+recent_feed = RecentFeed(
+    redis_client if settings.RECENT_FEED_REDIS_ENABLED else None,
+    settings.RECENT_FEED_SIZE,
+)
@@ -0,0 +1,18 @@
+from redis.asyncio import Redis
+
+from app.core.config import settings
+
+redis_client: Redis = Redis.from_url(
+    settings.REDIS_URL,
+    decode_responses=True,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+)
+
+
+async def get_redis() -> Redis:
+    return redis_client
+
+
+async def close_redis():
+    await redis_client.aclose()
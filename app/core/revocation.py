@@ -0,0 +1,247 @@
+import logging
+import time
+import uuid
+from datetime import UTC, datetime
+
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+
+from app.core.bloom import BloomFilter
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis import redis_client
+from app.models import Token
+
+logger = logging.getLogger(__name__)
+
+REVOKED_KEY_PREFIX = "revoked:"
+# Set once every revocation in the tokens table has been copied to Redis;
+# from then on a missing revoked: key means the jti isn't revoked
+REVOCATIONS_SEEDED_KEY = "revocations:seeded"
+SEED_BATCH_SIZE = 1000
+
+# Revocations whose Redis write failed, retried by sync_revocation_store
+_unstored: dict[str, datetime] = {}
+
+# Per-worker cache of jti -> is_blacklisted. Revoked entries live until the
+# token itself expires, non-revoked ones are capped so that revocations made
+# on other workers are picked up within REVOCATION_CACHE_TTL_SECONDS.
+revocation_cache = TTLCache(maxsize=settings.REVOCATION_CACHE_SIZE)
+
+
+def _seconds_until(expires_at: datetime) -> float:
+    return expires_at.timestamp() - time.time()
+
+
+def get_cached_revocation(jti: uuid.UUID | str) -> bool | None:
+    return revocation_cache.get(str(jti))
+
+
+def cache_revocation(jti: uuid.UUID | str, is_blacklisted: bool, expires_at: datetime):
+    ttl = _seconds_until(expires_at)
+    if not is_blacklisted:
+        ttl = min(ttl, settings.REVOCATION_CACHE_TTL_SECONDS)
+    revocation_cache.set(str(jti), is_blacklisted, ttl=ttl)
+
+
+def invalidate_revocation(jti: uuid.UUID | str):
+    revocation_cache.delete(str(jti))
+
+
+def _revoked_key(jti: uuid.UUID | str) -> str:
+    return f"{REVOKED_KEY_PREFIX}{jti}"
+
+
+async def store_revocation(jti: uuid.UUID | str, expires_at: datetime):
+    """Record a revoked jti in Redis until the token would have expired anyway.
+
+    A failed write is logged and left to sync_revocation_store to retry.
+    """
+    if settings.REVOCATION_BACKEND != "redis":
+        return
+
+    if _seconds_until(expires_at) <= 0:
+        return
+
+    try:
+        await redis_client.set(
+            _revoked_key(jti), 1, exat=int(expires_at.timestamp()) + 1
+        )
+    except RedisError:
+        logger.error("Could not write revoked jti %s to Redis", jti, exc_info=True)
+        _unstored[str(jti)] = expires_at
+
+
+async def fetch_revocation(jti: uuid.UUID | str) -> bool | None:
+    """Whether Redis has jti as revoked, or None if it can't tell.
+
+    Once Redis is seeded a miss means not revoked. Before that, or when Redis
+    is unreachable, the caller has to check the tokens table.
+    """
+    if settings.REVOCATION_BACKEND != "redis":
+        return None
+
+    try:
+        seeded, revoked = await redis_client.mget(
+            REVOCATIONS_SEEDED_KEY, _revoked_key(jti)
+        )
+    except RedisError:
+        logger.warning("Redis unavailable, falling back to the tokens table")
+        return None
+    if revoked is not None:
+        return True
+    if seeded is None:
+        return None
+    return False
+
+
+async def _seed_revocations():
+    now = datetime.now(UTC)
+    async with AsyncSessionLocal() as db:
+        rows = await db.stream(
+            select(Token.jti, Token.expires_at).where(
+                Token.is_blacklisted, Token.expires_at > now
+            )
+        )
+        async for batch in rows.partitions(SEED_BATCH_SIZE):
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for jti, expires_at in batch:
+                    pipe.set(
+                        _revoked_key(jti), 1, exat=int(expires_at.timestamp()) + 1
+                    )
+                await pipe.execute()
+    await redis_client.set(REVOCATIONS_SEEDED_KEY, now.isoformat())
+
+
+async def sync_revocation_store():
+    """Retry failed revocation writes, and seed Redis from the tokens table
+    if it hasn't been (first start, or Redis lost its data)."""
+    if settings.REVOCATION_BACKEND != "redis":
+        return
+
+    for jti, expires_at in list(_unstored.items()):
+        if _seconds_until(expires_at) > 0:
+            await redis_client.set(
+                _revoked_key(jti), 1, exat=int(expires_at.timestamp()) + 1
+            )
+        del _unstored[jti]
+
+    if not await redis_client.exists(REVOCATIONS_SEEDED_KEY):
+        await _seed_revocations()
+        logger.info("Seeded revoked jtis in Redis from the tokens table")
+
+
+class RevocationFilter:
+    """Bloom filter over revoked jtis that can say "definitely not revoked".
+
+    Until the first load from the database completes the filter is not
+    trusted and every jti is treated as possibly revoked.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.ready = False
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._pending: list[str] | None = None
+
+    def add(self, jti: uuid.UUID | str):
+        self._bloom.add(str(jti))
+        if self._pending is not None:
+            self._pending.append(str(jti))
+
+    def might_be_revoked(self, jti: uuid.UUID | str) -> bool:
+        return not self.ready or str(jti) in self._bloom
+
+    async def rebuild(self):
+        # jtis revoked while the snapshot query runs may not be in its result,
+        # so they are replayed into the new filter before it is swapped in.
+        self._pending = []
+        try:
+            async with AsyncSessionLocal() as db:
+                count = await db.scalar(
+                    select(func.count())
+                    .select_from(Token)
+                    .where(Token.is_blacklisted, Token.expires_at > datetime.now(UTC))
+                )
+                bloom = BloomFilter(max(self.capacity, count or 0), self.error_rate)
+                jtis = await db.stream_scalars(
+                    select(Token.jti).where(
+                        Token.is_blacklisted, Token.expires_at > datetime.now(UTC)
+                    )
+                )
+                async for jti in jtis:
+                    bloom.add(str(jti))
+
+            for jti in self._pending:
+                bloom.add(jti)
+            self._bloom = bloom
+            self.ready = True
+        finally:
+            self._pending = None
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "items": len(self._bloom),
+            "capacity": self._bloom.capacity,
+            "false_positive_rate": self._bloom.false_positive_rate,
+            "memory_bytes": self._bloom.memory_bytes,
+        }
+
+
+revocation_filter = RevocationFilter(
+    settings.REVOCATION_FILTER_CAPACITY, settings.REVOCATION_FILTER_ERROR_RATE
+)
+
+
+class RevocationSnapshot:
+    """In-memory set of revoked access tokens that haven't expired yet.
+
+    Backs stateless verification: a token is only checked against this set,
+    so revocations made elsewhere are honored after at most one refresh.
+    """
+
+    def __init__(self):
+        # Set once a route verifies with strict=False; only then is the
+        # snapshot refreshed
+        self.in_use = False
+        self._jtis: frozenset[str] = frozenset()
+        # Revocations made on this worker since the last refresh started
+        self._local: dict[str, float] = {}
+        self.refreshed_at: float | None = None
+
+    def add(self, jti: uuid.UUID | str):
+        self._local[str(jti)] = time.monotonic()
+
+    def __contains__(self, jti: uuid.UUID | str) -> bool:
+        return str(jti) in self._jtis or str(jti) in self._local
+
+    def is_fresh(self, max_staleness: float) -> bool:
+        return (
+            self.refreshed_at is not None
+            and time.monotonic() - self.refreshed_at <= max_staleness
+        )
+
+    async def refresh(self):
+        started_at = time.monotonic()
+        async with AsyncSessionLocal() as db:
+            jtis = await db.scalars(
+                select(Token.jti).where(
+                    Token.is_blacklisted,
+                    Token.token_type == "access",
+                    Token.expires_at > datetime.now(UTC),
+                )
+            )
+            self._jtis = frozenset(str(jti) for jti in jtis)
+
+        self._local = {
+            jti: added_at
+            for jti, added_at in self._local.items()
+            if added_at >= started_at
+        }
+        self.refreshed_at = started_at
+
+
+revocation_snapshot = RevocationSnapshot()
@@ -1,17 +1,50 @@
 import uuid
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
 from typing import Literal
 
 import jwt
 from fastapi import HTTPException, status
-from passlib.context import CryptContext
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.models import Token
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.executor import BoundedExecutor, ExecutorBusyError
+from app.core.keys import KeyManager
+from app.core.password_policy import PasswordPolicy, calibrate
+from app.core.revocation import (
+    cache_revocation,
+    fetch_revocation,
+    get_cached_revocation,
+    invalidate_revocation,
+    revocation_filter,
+    revocation_snapshot,
+    store_revocation,
+)
+from app.core.token_partitions import (
+    autocommit_session,
+    drop_expired_token_partitions,
+)
+from app.models import Token, User
+
+password_policy = PasswordPolicy(
+    scheme=settings.PASSWORD_HASH_SCHEME,
+    bcrypt_rounds=settings.BCRYPT_ROUNDS,
+    argon2_time_cost=settings.ARGON2_TIME_COST,
+    argon2_memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2_parallelism=settings.ARGON2_PARALLELISM,
+)
+pwd_context = password_policy.build_context()
+
+
+def calibrate_password_policy():
+    """Tune the hash cost to PASSWORD_HASH_TARGET_MS on this machine."""
+    global password_policy, pwd_context
+
+    if settings.PASSWORD_HASH_TARGET_MS <= 0:
+        return
+
+    password_policy = calibrate(password_policy, settings.PASSWORD_HASH_TARGET_MS)
+    pwd_context = password_policy.build_context()
 
 
 def hash_password(password: str) -> str:
@@ -23,25 +56,81 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verify a password, also returning a new hash if the policy has changed."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+# bcrypt takes 100ms+ per call, so async callers hash on this pool instead of
+# blocking the event loop.
+password_executor = BoundedExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+    name="password-hash",
+)
+
+PASSWORD_POOL_BUSY_EXCEPTION = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Too many authentication requests, try again shortly",
+    headers={"Retry-After": "1"},
+)
+
+
+async def hash_password_async(password: str) -> str:
+    try:
+        return await password_executor.run(hash_password, password)
+    except ExecutorBusyError:
+        raise PASSWORD_POOL_BUSY_EXCEPTION
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return await password_executor.run(
+            verify_password, plain_password, hashed_password
+        )
+    except ExecutorBusyError:
+        raise PASSWORD_POOL_BUSY_EXCEPTION
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    try:
+        return await password_executor.run(
+            verify_and_update_password, plain_password, hashed_password
+        )
+    except ExecutorBusyError:
+        raise PASSWORD_POOL_BUSY_EXCEPTION
+
+
+key_manager = KeyManager.load(
+    algorithm=settings.ALGORITHM,
+    secret=settings.SECRET_KEY,
+    keys_dir=settings.JWT_KEYS_DIR,
+    active_kid=settings.JWT_ACTIVE_KID,
+)
+
+
+def token_lifetime(token_type: str) -> timedelta:
+    if token_type == "access":
+        return timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+
 def create_token(
     data: dict,
     token_type: Literal["access", "refresh"],
     expires_delta: timedelta | None = None,
 ):
     to_encode = data.copy()
-    now = datetime.now(datetime.UTC)
-    if expires_delta:
-        expire = now + timedelta
-    elif token_type == "access":
-        expire = now + timedelta(settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    else:
-        expire = now + timedelta(settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    now = datetime.now(UTC)
+    expire = now + (expires_delta or token_lifetime(token_type))
 
     jti = uuid.uuid4()
-    to_encode.update({"exp": expire, "iat": now, "type": token_type, "jti": jti})
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
+    to_encode.update({"exp": expire, "iat": now, "type": token_type, "jti": str(jti)})
+    encoded_jwt = key_manager.encode(to_encode)
 
     # token = Token(jti=jti, token_type=token_type, expires_at=expire, _metadata=data)
     # db.add(token)
@@ -50,25 +139,33 @@ def create_token(
     return encoded_jwt, jti, expire
 
 
-def create_token_pair(
+def expires_at_filter(expires_at: datetime):
+    # The JWT exp claim is expires_at rounded down to the second. Matching on
+    # it lets Postgres prune the lookup to the one partition holding the token.
+    return (Token.expires_at >= expires_at) & (
+        Token.expires_at < expires_at + timedelta(seconds=1)
+    )
+
+
+async def create_token_pair(
     db: AsyncSession,
     data: dict,
 ):
-    # TODO HANDLE USER_ID / METADATA
-    # USER_ID CAN BE NONE SO ACCOUNT FOR THAT
+    # TODO HANDLE METADATA
+    user_id = int(data["sub"]) if data.get("sub") is not None else None
     access_token, access_jti, access_expire_at = create_token(data, "access")
     refresh_token, refresh_jti, refresh_expire_at = create_token(data, "refresh")
 
     access_token_record = Token(
         jti=access_jti,
-        user_id=None,
+        user_id=user_id,
         token_type="access",
         paired_jti=refresh_jti,
         expires_at=access_expire_at,
     )
     refresh_token_record = Token(
         jti=refresh_jti,
-        user_id=None,
+        user_id=user_id,
         token_type="refresh",
         paired_jti=access_jti,
         expires_at=refresh_expire_at,
@@ -76,49 +173,152 @@ def create_token_pair(
 
     db.add(access_token_record)
     db.add(refresh_token_record)
-    db.commit()
+    await db.commit()
 
     return access_token, refresh_token
 
 
-def blacklist_token(db: AsyncSession, jti: uuid.UUID, reason: str = "Logged Out"):
-    result = await db.execute(select(Token).where(Token.jti == jti))
-    token = result.scalar_one_or_none()
+async def revoke_tokens(db: AsyncSession, tokens: list[Token], reason: str):
+    """Blacklist tokens in the database, then in every revocation cache.
 
-    if token:
+    The revocation holds once the commit is done, so a failed Redis write
+    doesn't fail the request: it is logged and retried by
+    sync_revocation_store, and until then other workers may not see it.
+    """
+    for token in tokens:
         token.is_blacklisted = True
         token.blacklisted_at = datetime.utcnow()
         token.blacklist_reason = reason
-        db.commit()
+    await db.commit()
+
+    for token in tokens:
+        cache_revocation(token.jti, True, token.expires_at)
+        revocation_filter.add(token.jti)
+        revocation_snapshot.add(token.jti)
+    for token in tokens:
+        await store_revocation(token.jti, token.expires_at)
+
+
+async def find_token(
+    db: AsyncSession, jti: uuid.UUID, expires_at: datetime | None = None
+) -> Token | None:
+    query = select(Token).where(Token.jti == jti)
+    if expires_at is not None:
+        query = query.where(expires_at_filter(expires_at))
+    result = await db.execute(query)
+    return result.scalar_one_or_none()
+
+
+async def find_paired_token(db: AsyncSession, token: Token) -> Token | None:
+    """The other token issued with token, looked up in its own partition.
+
+    Both were issued at the same moment, so the pair expires one lifetime
+    of its type after it. When the lifetimes have changed since, the lookup
+    falls back to every partition.
+    """
+    paired_type = "refresh" if token.token_type == "access" else "access"
+    expected = (
+        token.expires_at
+        - token_lifetime(token.token_type)
+        + token_lifetime(paired_type)
+    )
+    result = await db.execute(
+        select(Token).where(
+            Token.jti == token.paired_jti,
+            Token.expires_at >= expected - timedelta(seconds=1),
+            Token.expires_at < expected + timedelta(seconds=1),
+        )
+    )
+    return result.scalar_one_or_none() or await find_token(db, token.paired_jti)
 
 
-def blacklist_token_pair(db: AsyncSession, jti: uuid.UUID, reason: str = "Logged Out"):
-    result = await db.execute(select(Token).where(Token.jti == jti))
-    token = result.scalar_one_or_none()
+async def blacklist_token(
+    db: AsyncSession,
+    jti: uuid.UUID,
+    expires_at: datetime | None = None,
+    reason: str = "Logged Out",
+):
+    """Revoke a token; pass expires_at (the exp claim) to prune the lookup."""
+    token = await find_token(db, jti, expires_at)
 
     if token:
-        blacklist_token(db, jti, reason)
+        await revoke_tokens(db, [token], reason)
+    else:
+        invalidate_revocation(jti)
+
 
+async def blacklist_token_pair(
+    db: AsyncSession,
+    jti: uuid.UUID,
+    expires_at: datetime | None = None,
+    reason: str = "Logged Out",
+):
+    """Revoke a token and the one issued with it, see blacklist_token."""
+    token = await find_token(db, jti, expires_at)
+
+    if token:
+        tokens = [token]
         if token.paired_jti:
-            blacklist_token(db, token.paired_jti, reason)
+            paired = await find_paired_token(db, token)
+            if paired is not None:
+                tokens.append(paired)
+        await revoke_tokens(db, tokens, reason)
+
+
+async def is_token_blacklisted(
+    db: AsyncSession, jti: uuid.UUID, expires_at: datetime | None = None
+) -> bool | None:
+    cached = get_cached_revocation(jti)
+    if cached is not None:
+        return cached
+
+    # A Bloom filter miss means the jti was never revoked
+    if settings.REVOCATION_FILTER_ENABLED:
+        if not revocation_filter.might_be_revoked(jti):
+            return False
 
+    revoked = await fetch_revocation(jti)
+    if revoked is not None:
+        if expires_at is not None:
+            cache_revocation(jti, revoked, expires_at)
+        return revoked
 
-def is_token_blacklisted(db: AsyncSession, jti: uuid.UUID) -> bool | None:
-    result = await db.execute(select(Token).where(Token.jti == jti))
-    token = result.scalar_one_or_none()
+    token = await find_token(db, jti, expires_at)
 
     if token:
+        cache_revocation(jti, token.is_blacklisted, token.expires_at)
         return token.is_blacklisted
 
 
-def cleanup_expired_token(db: AsyncSession):
+async def get_token_user(
+    db: AsyncSession, jti: uuid.UUID, user_id: int, expires_at: datetime
+) -> tuple[User, bool] | None:
+    """Load the token's user and blacklist flag in a single round trip.
+
+    Returns None when the token row is missing, expired or doesn't belong
+    to user_id.
+    """
     result = await db.execute(
-        select(Token).where(Token.expires_at < datetime.now(dateime.UTC))
+        select(User, Token.is_blacklisted)
+        .join(Token, Token.user_id == User.id)
+        .where(
+            Token.jti == jti,
+            expires_at_filter(expires_at),
+            Token.token_type == "access",
+            Token.expires_at > func.now(),
+            User.id == user_id,
+        )
     )
-    tokens = result.all()
+    row = result.one_or_none()
+
+    if row:
+        return row[0], row[1]
 
-    db.delete(tokens)
-    db.commit()
+
+async def cleanup_expired_token() -> list[str]:
+    """Drop expired tokens a day at a time; see app/core/token_partitions.py."""
+    async with autocommit_session() as db:
+        return await drop_expired_token_partitions(db)
 
 
 # def create_access_token(data: dict, expires_delta: timedelta | None = None):
@@ -158,9 +358,7 @@ def cleanup_expired_token(db: AsyncSession):
 
 def decode_token(token: str) -> dict:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = key_manager.decode(token)
         return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(
@@ -0,0 +1,114 @@
+import asyncio
+import hashlib
+import string
+from collections.abc import Awaitable, Callable
+
+BASE62_ALPHABET = string.digits + string.ascii_letters
+
+
+def base62_encode(number: int, length: int = 0) -> str:
+    if number < 0:
+        raise ValueError("number must be non-negative")
+
+    chars = []
+    while number:
+        number, remainder = divmod(number, 62)
+        chars.append(BASE62_ALPHABET[remainder])
+    return "".join(reversed(chars)).rjust(length, BASE62_ALPHABET[0]) or "0"
+
+
+def base62_decode(value: str) -> int:
+    number = 0
+    for char in value:
+        number = number * 62 + BASE62_ALPHABET.index(char)
+    return number
+
+
+class FeistelPermutation:
+    """Keyed bijection on [0, 2**bits) built from a balanced Feistel network.
+
+    Consecutive inputs map to outputs that look random without the key, and
+    because every round is invertible distinct inputs never share an output.
+    """
+
+    def __init__(self, key: bytes, bits: int = 46, rounds: int = 4):
+        if bits <= 0 or bits % 2:
+            raise ValueError("bits must be a positive even number")
+        if rounds < 3:
+            raise ValueError("at least 3 rounds are needed to hide the input")
+
+        self.bits = bits
+        self.rounds = rounds
+        self._half_bits = bits // 2
+        self._half_mask = (1 << self._half_bits) - 1
+        self._half_bytes = (self._half_bits + 7) // 8
+        self._key = hashlib.blake2b(key, digest_size=32).digest()
+
+    @property
+    def size(self) -> int:
+        return 1 << self.bits
+
+    def _round(self, value: int, round_index: int) -> int:
+        digest = hashlib.blake2b(
+            value.to_bytes(self._half_bytes, "little") + bytes([round_index]),
+            key=self._key,
+            digest_size=8,
+        ).digest()
+        return int.from_bytes(digest, "little") & self._half_mask
+
+    def permute(self, value: int) -> int:
+        if not 0 <= value < self.size:
+            raise ValueError(f"value must be in [0, 2**{self.bits})")
+
+        left, right = value >> self._half_bits, value & self._half_mask
+        for round_index in range(self.rounds):
+            left, right = right, left ^ self._round(right, round_index)
+        return (left << self._half_bits) | right
+
+    def invert(self, value: int) -> int:
+        if not 0 <= value < self.size:
+            raise ValueError(f"value must be in [0, 2**{self.bits})")
+
+        left, right = value >> self._half_bits, value & self._half_mask
+        for round_index in reversed(range(self.rounds)):
+            left, right = right ^ self._round(left, round_index), left
+        return (left << self._half_bits) | right
+
+
+class ShortIdGenerator:
+    """Hands out unique fixed-length base62 slugs without a per-call DB trip.
+
+    allocate(n) must return n integers no other caller will ever receive
+    (e.g. n values from a shared sequence). Each is permuted and encoded, so
+    uniqueness of the slugs follows from uniqueness of the integers.
+    """
+
+    def __init__(
+        self,
+        permutation: FeistelPermutation,
+        allocate: Callable[[int], Awaitable[list[int]]],
+        block_size: int = 1000,
+    ):
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+
+        self.permutation = permutation
+        self.allocate = allocate
+        self.block_size = block_size
+        self.length = len(base62_encode(permutation.size - 1))
+        self._block: list[int] = []
+        self._lock = asyncio.Lock()
+
+    def encode(self, value: int) -> str:
+        return base62_encode(self.permutation.permute(value), self.length)
+
+    def decode(self, slug: str) -> int:
+        return self.permutation.invert(base62_decode(slug))
+
+    async def next(self) -> str:
+        while not self._block:
+            async with self._lock:
+                if not self._block:
+                    block = await self.allocate(self.block_size)
+                    self._block = list(reversed(block))
+        return self.encode(self._block.pop())
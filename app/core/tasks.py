@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def _run_periodically(
+    name: str, interval: float, func: Callable[[], Awaitable[None]]
+):
+    while True:
+        try:
+            await func()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Background task %s failed", name)
+        await asyncio.sleep(interval)
+
+
+async def _run_once(name: str, coro: Awaitable[None]):
+    try:
+        await coro
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception("Background task %s failed", name)
+
+
+def _track(task: asyncio.Task) -> asyncio.Task:
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def start_periodic_task(
+    name: str, interval: float, func: Callable[[], Awaitable[None]]
+) -> asyncio.Task:
+    """Run func every interval seconds until stop_background_tasks is called."""
+    return _track(
+        asyncio.create_task(_run_periodically(name, interval, func), name=name)
+    )
+
+
+def start_task(name: str, coro: Awaitable[None]) -> asyncio.Task:
+    """Run coro once in the background; cancelled by stop_background_tasks."""
+    return _track(asyncio.create_task(_run_once(name, coro), name=name))
+
+
+async def stop_background_tasks():
+    tasks = list(_background_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
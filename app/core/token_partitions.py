@@ -0,0 +1,128 @@
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# The tokens table is range-partitioned by expires_at into one partition per
+# UTC day, named tokens_pYYYYMMDD.
+PARTITION_PREFIX = "tokens_p"
+
+# Serializes partition maintenance between workers
+MAINTENANCE_LOCK_ID = 0x746F6B656E73  # "tokens"
+
+
+def partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def partition_ddl(day: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(day)} PARTITION OF tokens "
+        f"FOR VALUES FROM ('{day.isoformat()} 00:00+00') "
+        f"TO ('{(day + timedelta(days=1)).isoformat()} 00:00+00')"
+    )
+
+
+@asynccontextmanager
+async def autocommit_session() -> AsyncIterator[AsyncSession]:
+    """A session whose statements each commit on their own.
+
+    Partition maintenance needs one, since DETACH PARTITION ... CONCURRENTLY
+    can't run inside a transaction block.
+    """
+    async with AsyncSessionLocal() as db:
+        await db.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+        yield db
+
+
+async def list_token_partitions(db: AsyncSession) -> dict[date, str]:
+    result = await db.scalars(
+        text(
+            "SELECT c.relname FROM pg_inherits i"
+            " JOIN pg_class c ON c.oid = i.inhrelid"
+            " WHERE i.inhparent = 'tokens'::regclass"
+        )
+    )
+    return {
+        datetime.strptime(name.removeprefix(PARTITION_PREFIX), "%Y%m%d").date(): name
+        for name in result
+        if name.startswith(PARTITION_PREFIX)
+    }
+
+
+async def list_detaching_partitions(db: AsyncSession) -> set[str]:
+    """Partitions left half detached by an interrupted concurrent detach."""
+    result = await db.scalars(
+        text(
+            "SELECT c.relname FROM pg_inherits i"
+            " JOIN pg_class c ON c.oid = i.inhrelid"
+            " WHERE i.inhparent = 'tokens'::regclass AND i.inhdetachpending"
+        )
+    )
+    return set(result)
+
+
+async def create_token_partitions(db: AsyncSession, through: date) -> list[str]:
+    """Create the daily partitions from today through the given day."""
+    existing = await list_token_partitions(db)
+    day = datetime.now(UTC).date()
+    created = []
+    while day <= through:
+        if day not in existing:
+            await db.execute(text(partition_ddl(day)))
+            created.append(partition_name(day))
+        day += timedelta(days=1)
+    return created
+
+
+async def drop_expired_token_partitions(db: AsyncSession) -> list[str]:
+    """Drop the partitions of days that are over, which only hold expired tokens.
+
+    Dropping a partition is a catalog change, so it costs the same no matter
+    how many tokens the day held, and leaves nothing behind to vacuum.
+    Partitions are detached CONCURRENTLY, which only takes a SHARE UPDATE
+    EXCLUSIVE lock on tokens, so token lookups and logins carry on while it
+    waits for queries already using the partition. db must come from
+    autocommit_session().
+    """
+    today = datetime.now(UTC).date()
+    detaching = await list_detaching_partitions(db)
+    dropped = []
+    for day, name in sorted((await list_token_partitions(db)).items()):
+        if day >= today:
+            break
+        # An interrupted detach has to be finished rather than started over
+        mode = "FINALIZE" if name in detaching else "CONCURRENTLY"
+        await db.execute(text(f"ALTER TABLE tokens DETACH PARTITION {name} {mode}"))
+        await db.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    return dropped
+
+
+async def maintain_token_partitions():
+    """Keep partitions ready for every token that can be issued, drop old ones.
+
+    Partitions are created TOKEN_PARTITIONS_AHEAD_DAYS past the lifetime of a
+    refresh token, so logins keep working for that long if maintenance fails.
+    """
+    through = datetime.now(UTC).date() + timedelta(
+        days=settings.REFRESH_TOKEN_EXPIRE_DAYS + settings.TOKEN_PARTITIONS_AHEAD_DAYS
+    )
+    async with autocommit_session() as db:
+        await db.execute(select(func.pg_advisory_lock(MAINTENANCE_LOCK_ID)))
+        try:
+            created = await create_token_partitions(db, through)
+            dropped = await drop_expired_token_partitions(db)
+        finally:
+            await db.execute(select(func.pg_advisory_unlock(MAINTENANCE_LOCK_ID)))
+
+    if created or dropped:
+        logger.info("Token partitions created: %s, dropped: %s", created, dropped)
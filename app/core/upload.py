@@ -0,0 +1,127 @@
+import asyncio
+import codecs
+import hashlib
+import tempfile
+from collections.abc import AsyncIterator
+
+# Byte order marks, longest first so UTF-32 isn't mistaken for UTF-16
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+class UploadTooLargeError(Exception):
+    pass
+
+
+class UploadEncodingError(Exception):
+    pass
+
+
+def detect_encoding(head: bytes) -> str:
+    """Pick the encoding of a text body from its first few bytes."""
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+    return "utf-8"
+
+
+class SpooledUpload:
+    """A text body received in chunks, normalized to UTF-8 without a BOM.
+
+    The body is kept in memory up to spool_bytes and in a temporary file
+    beyond that; content_hash matches hash_content() of the decoded text.
+    """
+
+    def __init__(self, spool_bytes: int):
+        self.file = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+        self.size = 0
+        self.source_encoding: str | None = None
+        self._sha256 = hashlib.sha256()
+        self._head = b""
+        self._decoder = None
+
+    @property
+    def content_hash(self) -> str:
+        return self._sha256.hexdigest()
+
+    def _start(self, head: bytes):
+        self.source_encoding = detect_encoding(head)
+        self._decoder = codecs.getincrementaldecoder(self.source_encoding)()
+
+    async def _append(self, text: str):
+        # Incomplete multi-byte sequences are held back by the decoder until
+        # the next chunk, so each write is whole UTF-8 characters
+        data = text.encode("utf-8")
+        if not data:
+            return
+        self._sha256.update(data)
+        self.size += len(data)
+        await asyncio.to_thread(self.file.write, data)
+
+    async def write(self, chunk: bytes):
+        if self._decoder is None:
+            # Wait for enough bytes to recognize any byte order mark
+            self._head += chunk
+            if len(self._head) < 4:
+                return
+            chunk, self._head = self._head, b""
+            self._start(chunk)
+        await self._append(self._decoder.decode(chunk))
+
+    async def finish(self):
+        if self._decoder is None:
+            head, self._head = self._head, b""
+            self._start(head)
+            await self._append(self._decoder.decode(head))
+        await self._append(self._decoder.decode(b"", final=True))
+
+    def read_text(self) -> str:
+        self.file.seek(0)
+        return self.file.read().decode("utf-8")
+
+    def read_head(self, size: int) -> str:
+        """First size bytes as text, minus any character cut off at the end."""
+        self.file.seek(0)
+        return self.file.read(size).decode("utf-8", errors="ignore")
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+async def spool_upload(
+    chunks: AsyncIterator[bytes], max_bytes: int, spool_bytes: int
+) -> SpooledUpload:
+    """Read a request body chunk by chunk without holding all of it in memory.
+
+    Raises UploadTooLargeError past max_bytes and UploadEncodingError if the
+    body isn't valid UTF-8 (or UTF-16/32 with a BOM).
+    """
+    upload = SpooledUpload(spool_bytes)
+    received = 0
+
+    try:
+        async for chunk in chunks:
+            received += len(chunk)
+            if received > max_bytes:
+                raise UploadTooLargeError(received)
+            await upload.write(chunk)
+        await upload.finish()
+    except UnicodeDecodeError as e:
+        upload.close()
+        raise UploadEncodingError(str(e)) from None
+    except BaseException:
+        upload.close()
+        raise
+
+    return upload
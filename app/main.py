@@ -1,12 +1,36 @@
 from fastapi import FastAPI, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from contextlib import asynccontextmanager
+import asyncio
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.sql import text
 
+from app.api import auth, views
+from app.api.v1 import api_router
 from app.core.config import get_settings
 from app.core.database import engine, get_db
+from app.core.highlight import highlighter
+from app.core.paste_cache import paste_cache
+from app.core.recent_feed import recent_feed
+from app.core.redis import close_redis
+from app.core.revocation import (
+    revocation_filter,
+    revocation_snapshot,
+    sync_revocation_store,
+)
+from app.core.security import (
+    calibrate_password_policy,
+    key_manager,
+    password_executor,
+)
+from app.core.tasks import start_periodic_task, start_task, stop_background_tasks
+from app.core.templates import templates
+from app.core.token_partitions import maintain_token_partitions
+from app.middleware import RateLimitMiddleware
+from app.services import PasteService, SearchService
+from app.services.language_detector import language_detector
+from app.services.paste_reaper import paste_reaper
+from app.services.view_counter import view_counter
 from app.models import User, Paste
 
 settings = get_settings()
@@ -19,19 +43,74 @@ async def lifespan(app: FastAPI):
     print(f"Starting {settings.APP_NAME}...")
     print("Database connection established")
 
+    await asyncio.to_thread(calibrate_password_policy)
+
+    start_periodic_task(
+        "view-count-flush",
+        settings.VIEW_COUNT_FLUSH_INTERVAL_SECONDS,
+        view_counter.flush,
+    )
+    start_periodic_task(
+        "recent-feed-refresh",
+        settings.RECENT_FEED_REFRESH_SECONDS,
+        PasteService.refresh_recent_feed,
+    )
+    start_periodic_task(
+        "language-detection",
+        settings.LANGUAGE_DETECTION_INTERVAL_SECONDS,
+        language_detector.drain,
+    )
+    if settings.PASTE_REAPER_ENABLED:
+        start_periodic_task(
+            "paste-reaper", settings.PASTE_REAPER_INTERVAL_SECONDS, paste_reaper.run
+        )
+    # Only finds work once, after upgrading past the search columns migration
+    start_task("search-text-backfill", SearchService.backfill_blob_search_text())
+    start_periodic_task(
+        "token-partition-maintenance",
+        settings.TOKEN_PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+        maintain_token_partitions,
+    )
+    # Only routes verifying with strict=False read the snapshot
+    if settings.REVOCATION_SNAPSHOT_ENABLED and revocation_snapshot.in_use:
+        start_periodic_task(
+            "revocation-snapshot-refresh",
+            settings.REVOCATION_SNAPSHOT_REFRESH_SECONDS,
+            revocation_snapshot.refresh,
+        )
+    if settings.REVOCATION_BACKEND == "redis":
+        start_periodic_task(
+            "revocation-store-sync",
+            settings.REVOCATION_STORE_SYNC_SECONDS,
+            sync_revocation_store,
+        )
+    if settings.REVOCATION_FILTER_ENABLED:
+        start_periodic_task(
+            "revocation-filter-refresh",
+            settings.REVOCATION_FILTER_REFRESH_SECONDS,
+            revocation_filter.rebuild,
+        )
+
     yield
 
     # Shutdown
+    await stop_background_tasks()
+    await view_counter.flush()
     print("Closing database connections...")
     await engine.dispose()
+    await close_redis()
+    password_executor.shutdown()
+    highlighter.executor.shutdown()
     print("Application shutdown complete")
 
 
 app = FastAPI(title=settings.APP_NAME, debug=settings.DEBUG, lifespan=lifespan)
+app.add_middleware(RateLimitMiddleware)
+app.include_router(auth.router)
+app.include_router(api_router)
+app.include_router(views.router)
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
-templates = Jinja2Templates(directory="app/templates")
-
 
 # Health check endpoint
 @app.get("/health")
@@ -39,6 +118,12 @@ async def health_check():
     return {"status": "healthy", "app": settings.APP_NAME}
 
 
+# Public signing keys, so other services can verify our tokens locally
+@app.get("/.well-known/jwks.json")
+async def jwks():
+    return key_manager.jwks()
+
+
 # Database test endpoint
 @app.get("/api/v1/health")
 async def detailed_health(db: AsyncSession = Depends(get_db)):
@@ -46,11 +131,30 @@ async def detailed_health(db: AsyncSession = Depends(get_db)):
     try:
         # Test database connection
         await db.execute(text("SELECT 1"))
-        return {"status": "healthy", "database": "connected", "app": settings.APP_NAME}
+        return {
+            "status": "healthy",
+            "database": "connected",
+            "app": settings.APP_NAME,
+            "revocation_filter": revocation_filter.stats(),
+            "password_hashing": password_executor.stats(),
+            "paste_cache": paste_cache.stats(),
+            "highlighting": highlighter.stats(),
+            "language_detection": language_detector.stats(),
+            "view_counts": view_counter.stats(),
+            "paste_reaper": paste_reaper.stats(),
+            "recent_feed": recent_feed.stats(),
+        }
     except Exception as e:
         return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
 
 
+# Storage savings from deduplication and compression; scans paste_contents,
+# so it is kept out of the health check above
+@app.get("/api/v1/health/storage")
+async def storage_stats(db: AsyncSession = Depends(get_db)):
+    return await PasteService.get_storage_stats(db)
+
+
 @app.get("/static-health")
 async def static_health_check(request: Request):
     return templates.TemplateResponse(request, "base.html", {})
@@ -1,3 +1,4 @@
 from app.middleware.auth_middleware import AuthMiddleware
+from app.middleware.rate_limit import LoginRateLimiter, RateLimitMiddleware
 
-__all__["AuthMiddleware"]
+__all__ = ["AuthMiddleware", "LoginRateLimiter", "RateLimitMiddleware"]
@@ -1,24 +1,41 @@
+from datetime import UTC, datetime
 from typing import Literal
 
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPAuthorizationCredentials, OAuth2PasswordBearer
-from sqlalchemy import select
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.security import decode_token, is_token_blacklisted
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_db
+from app.core.revocation import (
+    cache_revocation,
+    get_cached_revocation,
+    revocation_snapshot,
+)
+from app.core.security import decode_token, get_token_user, is_token_blacklisted
 from app.models.user import User
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
-oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
+# HTTPBearer hands over HTTPAuthorizationCredentials, which verify_claims expects
+oauth2_scheme = HTTPBearer()
+oauth2_scheme_optional = HTTPBearer(auto_error=False)
+
+TOKEN_REVOKED_EXCEPTION = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Token has been revoked",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+INVALID_TOKEN_ID_EXCEPTION = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Invalid token ID",
+    headers={"WWW-Authenticate": "Bearer"},
+)
 
 
 class AuthMiddleware:
     @staticmethod
-    async def verify_token(
+    def verify_claims(
         credentials: HTTPAuthorizationCredentials,
         required_token_type: Literal["access", "refresh"],
-        db: AsyncSession,
     ):
         token = credentials.credentials
         CREDENTIALS_EXCEPTION = HTTPException(
@@ -42,52 +59,125 @@ class AuthMiddleware:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        is_blacklsited = is_token_blacklisted(db, jti)
+        return {"payload": payload, "jti": jti, "token_type": token_type, "exp": exp}
+
+    @staticmethod
+    async def verify_token(
+        credentials: HTTPAuthorizationCredentials,
+        required_token_type: Literal["access", "refresh"],
+        db: AsyncSession,
+        strict: bool = True,
+    ):
+        """Verify a token's claims and revocation state.
+
+        With strict=False the revocation check is answered from the in-memory
+        revocation snapshot without touching the database, as long as the
+        snapshot is within REVOCATION_SNAPSHOT_MAX_STALENESS_SECONDS.
+        """
+        result = AuthMiddleware.verify_claims(credentials, required_token_type)
+
+        if not strict and revocation_snapshot.is_fresh(
+            settings.REVOCATION_SNAPSHOT_MAX_STALENESS_SECONDS
+        ):
+            if result["jti"] in revocation_snapshot:
+                raise TOKEN_REVOKED_EXCEPTION
+            return result
+
+        is_blacklsited = await is_token_blacklisted(
+            db, result["jti"], datetime.fromtimestamp(result["exp"], UTC)
+        )
         if is_blacklsited == True:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has been revoked",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            raise TOKEN_REVOKED_EXCEPTION
         if is_blacklsited == None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token ID",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            raise INVALID_TOKEN_ID_EXCEPTION
 
-        return {"payload": payload, "jti": jti, "token_type": token_type, "exp": exp}
+        return result
 
     @staticmethod
-    async def get_current_user(
-        credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
-        db: AsyncSession = Depends(get_db),
+    async def resolve_user(
+        credentials: HTTPAuthorizationCredentials, db: AsyncSession
     ) -> User:
-        # payload = decode_token(token)
-        # if payload.get("type") != "access":
-        #     raise HTTPException(
-        #         status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token type"
-        #     )
-        result = await AuthMiddleware.verify_token(credentials, "access", db)
-        payload = result.get("payload")
-
-        user_id: int = payload.get("sub")
+        """Validate an access token and load its user in one database round trip."""
+        result = AuthMiddleware.verify_claims(credentials, "access")
+        jti = result["jti"]
+
+        user_id = result["payload"].get("sub")
         if user_id is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
             )
 
-        result = await db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        if get_cached_revocation(jti) is True:
+            raise TOKEN_REVOKED_EXCEPTION
 
-        if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
-            )
+        expires_at = datetime.fromtimestamp(result["exp"], UTC)
+        row = await get_token_user(db, jti, int(user_id), expires_at)
+        if row is None:
+            raise INVALID_TOKEN_ID_EXCEPTION
+
+        user, is_blacklisted = row
+        cache_revocation(jti, is_blacklisted, expires_at)
+        if is_blacklisted:
+            raise TOKEN_REVOKED_EXCEPTION
 
         return user
 
+    @staticmethod
+    def token_verifier(strict: bool = True):
+        """Dependency returning the verified access token claims.
+
+        Routes that don't need the User row and can tolerate a short revocation
+        window use token_verifier(strict=False) to skip the database entirely.
+        """
+        if not strict:
+            revocation_snapshot.in_use = True
+
+        async def verify_access_token(
+            credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+            db: AsyncSession = Depends(get_db),
+        ) -> dict:
+            return await AuthMiddleware.verify_token(
+                credentials, "access", db, strict=strict
+            )
+
+        return verify_access_token
+
+    @staticmethod
+    def optional_token_verifier(strict: bool = True):
+        """Like token_verifier, but anonymous or invalid callers get None.
+
+        A database session is only opened when a token is presented and has
+        to be checked strictly.
+        """
+        if not strict:
+            revocation_snapshot.in_use = True
+
+        async def verify_optional_access_token(
+            credentials: HTTPAuthorizationCredentials | None = Depends(
+                oauth2_scheme_optional
+            ),
+        ) -> dict | None:
+            if not credentials:
+                return None
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    return await AuthMiddleware.verify_token(
+                        credentials, "access", db, strict=strict
+                    )
+            except HTTPException:
+                return None
+
+        return verify_optional_access_token
+
+    @staticmethod
+    async def get_current_user(
+        credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+        db: AsyncSession = Depends(get_db),
+    ) -> User:
+        return await AuthMiddleware.resolve_user(credentials, db)
+
     @staticmethod
     async def get_current_active_user(
         current_user: User = Depends(get_current_user),
@@ -101,26 +191,15 @@ class AuthMiddleware:
 
     @staticmethod
     async def get_current_user_optional(
-        credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme_optional),
+        credentials: HTTPAuthorizationCredentials | None = Depends(
+            oauth2_scheme_optional
+        ),
         db: AsyncSession = Depends(get_db),
     ) -> User | None:
-        if not credentials.credentials:
+        if not credentials:
             return None
 
         try:
-            # payload = decode_token(token)
-            # if payload.get("type") != "access":
-            #     return None
-            result = await AuthMiddleware.verify_token(credentials, "access", db)
-            payload = result.get("payload")
-
-            user_id: int = payload.get("sub")
-            if user_id is None:
-                return None
-
-            result = await db.execute(select(User).where(User.id == user_id))
-            user = result.scalar_one_or_none()
-
-            return user
+            return await AuthMiddleware.resolve_user(credentials, db)
         except Exception:
             return None
@@ -0,0 +1,174 @@
+import math
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from fastapi.security import HTTPAuthorizationCredentials, OAuth2PasswordRequestForm
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.rate_limit import (
+    MemoryRateLimitBackend,
+    RateLimit,
+    RateLimitResult,
+    RedisRateLimitBackend,
+)
+from app.core.redis import redis_client
+from app.core.revocation import revocation_snapshot
+from app.middleware.auth_middleware import AuthMiddleware
+
+
+def create_rate_limit_backend() -> MemoryRateLimitBackend | RedisRateLimitBackend:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitBackend(redis_client)
+    return MemoryRateLimitBackend(maxsize=settings.RATE_LIMIT_MEMORY_MAXSIZE)
+
+
+rate_limit_backend = create_rate_limit_backend()
+
+
+def get_client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit_exceeded(result: RateLimitResult) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests",
+        headers={"Retry-After": str(max(1, round(result.retry_after)))},
+    )
+
+
+class LoginRateLimiter:
+    """Throttles login attempts before any password hash is computed.
+
+    Attempts are counted per client IP and per submitted email (guards
+    against credential stuffing from many IPs), and per user id once the
+    account has been looked up.
+    """
+
+    @staticmethod
+    async def check(key: str):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        result = await rate_limit_backend.hit(
+            f"login:{key}", RateLimit.parse(settings.DEFAULT_RATE_LIMIT)
+        )
+        if not result.allowed:
+            raise rate_limit_exceeded(result)
+
+    @staticmethod
+    async def check_login_attempt(
+        request: Request, form_data: OAuth2PasswordRequestForm = Depends()
+    ) -> OAuth2PasswordRequestForm:
+        await LoginRateLimiter.check(f"ip:{get_client_ip(request)}")
+        await LoginRateLimiter.check(f"email:{form_data.username.strip().lower()}")
+        return form_data
+
+    @staticmethod
+    async def check_user(user_id: int):
+        await LoginRateLimiter.check(f"user:{user_id}")
+
+
+def rate_limit_headers(result: RateLimitResult) -> dict[str, str]:
+    headers = {
+        "X-RateLimit-Limit": str(result.limit),
+        "X-RateLimit-Remaining": str(result.remaining),
+        "X-RateLimit-Reset": str(math.ceil(result.reset_after)),
+    }
+    if not result.allowed:
+        headers["Retry-After"] = str(max(1, math.ceil(result.retry_after)))
+    return headers
+
+
+# Methods that only read, which draw from the separate READ_RATE_LIMIT budget
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class RateLimitMiddleware:
+    """Per-client token bucket applied to every HTTP request.
+
+    Callers presenting a valid access token are keyed by user id and get
+    AUTHENTICATED_RATE_LIMIT; everyone else is keyed by IP and gets
+    DEFAULT_RATE_LIMIT. Reads go to a bucket of their own with
+    READ_RATE_LIMIT, so that browsing doesn't use up the budget for writes.
+    Static assets and health checks aren't limited. The token is checked
+    statelessly (signature, exp and the revocation snapshot) so identifying
+    the caller never hits the database.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend: MemoryRateLimitBackend | RedisRateLimitBackend | None = None,
+        exempt_paths: tuple[str, ...] = ("/health", "/api/v1/health"),
+        exempt_prefixes: tuple[str, ...] = ("/static/",),
+    ):
+        self.app = app
+        self.backend = backend or rate_limit_backend
+        self.exempt_paths = exempt_paths
+        self.exempt_prefixes = exempt_prefixes
+        self.anonymous_limit = RateLimit.parse(settings.DEFAULT_RATE_LIMIT)
+        self.authenticated_limit = RateLimit.parse(settings.AUTHENTICATED_RATE_LIMIT)
+        self.read_limit = RateLimit.parse(settings.READ_RATE_LIMIT)
+
+    def is_exempt(self, scope: Scope) -> bool:
+        path = scope["path"]
+        return path in self.exempt_paths or path.startswith(self.exempt_prefixes)
+
+    def identify(self, scope: Scope) -> tuple[str, RateLimit]:
+        for name, value in scope["headers"]:
+            if name != b"authorization":
+                continue
+
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                break
+
+            try:
+                credentials = HTTPAuthorizationCredentials(
+                    scheme=scheme, credentials=token
+                )
+                result = AuthMiddleware.verify_claims(credentials, "access")
+            except HTTPException:
+                break
+
+            user_id = result["payload"].get("sub")
+            if user_id is not None and result["jti"] not in revocation_snapshot:
+                return f"user:{user_id}", self.authenticated_limit
+            break
+
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}", self.anonymous_limit
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or self.is_exempt(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key, rate_limit = self.identify(scope)
+        if scope["method"] in READ_METHODS:
+            key, rate_limit = f"read:{key}", self.read_limit
+        result = await self.backend.hit(key, rate_limit)
+        headers = rate_limit_headers(result)
+
+        if not result.allowed:
+            response = JSONResponse(
+                {"detail": "Too many requests"},
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers=headers,
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -1,8 +1,9 @@
 from app.core.database import Base
 from app.models.paste import Paste
+from app.models.paste_content import PasteContent
 
 # from app.models.token_blacklist import BlacklistedToken
 from app.models.token import Token
 from app.models.user import User
 
-__all__ = ["Base", "User", "Paste", "Token"]
+__all__ = ["Base", "User", "Paste", "PasteContent", "Token"]
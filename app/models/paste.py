@@ -1,10 +1,37 @@
-from datetime import datetime
+from datetime import UTC, datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import (
+    Boolean,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Sequence,
+    String,
+    and_,
+    event,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import Mapped, Session, attributes, mapped_column, relationship
 from typing_extensions import override
 
 from app.core.database import Base
+from app.models.paste_content import (
+    SEARCH_CONFIG,
+    PasteContent,
+    acquire_blob,
+    acquire_content,
+    hash_content,
+    release_content,
+    search_head,
+)
+
+# Source of the integers behind short URLs, see app/core/short_id.py
+short_id_seq = Sequence("paste_short_id_seq", metadata=Base.metadata)
 
 
 class Paste(Base):
@@ -13,10 +40,23 @@ class Paste(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
 
     title: Mapped[str | None] = mapped_column(String(255), nullable=True)
-    content: Mapped[str] = mapped_column(Text, nullable=False)
+    # The body lives in paste_contents, shared between identical pastes
+    content_hash: Mapped[str] = mapped_column(
+        ForeignKey("paste_contents.hash"), index=True, nullable=False
+    )
     language: Mapped[str | None] = mapped_column(
         String(50), default="plaintext", nullable=True
     )
+    # Title words, weighted above body words when ranking search results
+    title_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig,"
+            " coalesce(title, '')), 'A')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
 
     short_url: Mapped[str] = mapped_column(
         String(20), unique=True, index=True, nullable=False
@@ -29,6 +69,7 @@ class Paste(Base):
         DateTime(timezone=True), nullable=True
     )
 
+    # ON DELETE CASCADE skips the paste_contents refcounts, see User.pastes
     user_id: Mapped[int | None] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True
     )
@@ -44,12 +85,99 @@ class Paste(Base):
     )
 
     user: Mapped["User"] = relationship("User", back_populates="pastes")
+    # Bodies can be large; load them only where they are needed, with
+    # joinedload(Paste.body) or session.refresh(paste, ["body"])
+    body: Mapped[PasteContent] = relationship(lazy="raise")
+
+    # Body set on this instance and not yet read back through `body`
+    _content = None
+    # Size and search head of a body attached with attach_blob()
+    _blob_size = None
+    _blob_head = None
 
     __table_args__ = (
-        Index("idx_user_created", "user_id", "created_at"),
+        # A user's pastes, newest first; id breaks ties for keyset pagination
+        Index("idx_user_created", "user_id", "created_at", "id"),
         Index("idx_expires_public", "expires_at", "is_public"),
+        # Public listing, newest first
+        Index(
+            "idx_public_created",
+            "created_at",
+            "id",
+            postgresql_where=text("is_public"),
+        ),
+        Index("ix_pastes_title_vector", "title_vector", postgresql_using="gin"),
     )
 
+    @property
+    def content(self) -> str:
+        if self._content is not None:
+            return self._content
+        return self.body.content
+
+    @content.setter
+    def content(self, value: str):
+        self._content = value
+        self._blob_size = None
+        self.content_hash = hash_content(value)
+
+    def attach_blob(self, content_hash: str, size: int, head: str):
+        """Use a body that was written straight to the blob store.
+
+        head is the start of the body, indexed for search.
+        """
+        self._content = None
+        self._blob_size = size
+        self._blob_head = search_head(head)
+        self.content_hash = content_hash
+
+    @hybrid_property
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at <= datetime.now(UTC)
+
+    @is_expired.inplace.expression
+    @classmethod
+    def _is_expired_expression(cls):
+        return and_(cls.expires_at.is_not(None), cls.expires_at <= func.now())
+
     @override
     def __repr__(self):
         return f"<Paste(id={self.id}, short_url={self.short_url}, title={self.title})>"
+
+
+@event.listens_for(Session, "before_flush")
+def _acquire_paste_contents(session: Session, flush_context, instances):
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Paste) and obj not in session.deleted:
+            for content_hash in attributes.get_history(obj, "content_hash").added:
+                if obj._blob_size is not None:
+                    acquire_blob(
+                        session, content_hash, obj._blob_size, obj._blob_head
+                    )
+                else:
+                    acquire_content(session, content_hash, obj.content)
+
+    # Released after the flush, once no pastes row references them any more
+    released = session.info["released_content_hashes"] = []
+    for obj in session.dirty:
+        if isinstance(obj, Paste):
+            released.extend(attributes.get_history(obj, "content_hash").deleted)
+    for obj in session.deleted:
+        if isinstance(obj, Paste):
+            released.append(obj.content_hash)
+
+
+@event.listens_for(Session, "after_flush")
+def _release_paste_contents(session: Session, flush_context):
+    for content_hash in session.info.pop("released_content_hashes", []):
+        if content_hash is not None:
+            blob_key = release_content(session, content_hash)
+            if blob_key is not None:
+                # Deleted after the commit, see PasteService.delete_released_blobs
+                session.info.setdefault("released_blob_keys", []).append(blob_key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _keep_released_blobs(session: Session):
+    # The rows are back, so are the references to their blobs
+    session.info.pop("released_blob_keys", None)
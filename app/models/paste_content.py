@@ -0,0 +1,205 @@
+import hashlib
+from datetime import datetime
+
+from sqlalchemy import (
+    CheckConstraint,
+    Computed,
+    DateTime,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    func,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, Session, mapped_column
+from typing_extensions import override
+
+from app.core.blob_store import blob_store
+from app.core.compression import IDENTITY, compress, decompress
+from app.core.config import settings
+from app.core.database import Base
+
+# Text search configuration; "simple" doesn't stem, which suits code
+SEARCH_CONFIG = "simple"
+
+
+def hash_content(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def search_head(content: str) -> str:
+    """The part of a body that is indexed for search."""
+    # Postgres text can't hold NUL characters
+    return content[: settings.SEARCH_INDEX_MAX_CHARS].replace("\x00", "")
+
+
+class PasteContent(Base):
+    """A paste body stored once, shared by every paste with the same hash."""
+
+    __tablename__: str = "paste_contents"
+
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # The UTF-8 body, stored in its Content-Encoding (identity, gzip or zstd)
+    data: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    # Set instead of data for large bodies, which live in the blob store
+    blob_key: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    encoding: Mapped[str] = mapped_column(
+        String(16), default=IDENTITY, server_default=IDENTITY, nullable=False
+    )
+    # Size of the body before compression
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    ref_count: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+
+    # Uncompressed start of the body, for word and trigram (substring) search
+    search_text: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(search_text, ''))",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    __table_args__ = (
+        CheckConstraint(
+            "data IS NOT NULL OR blob_key IS NOT NULL", name="ck_paste_contents_body"
+        ),
+        Index(
+            "ix_paste_contents_search_vector", "search_vector", postgresql_using="gin"
+        ),
+    )
+
+    # Decompressed body, filled in on first access
+    _content = None
+
+    @property
+    def content(self) -> str:
+        if self._content is None:
+            if self.blob_key is not None:
+                raise RuntimeError("Body is in the blob store, use load_content()")
+            self._content = decompress(self.data, self.encoding).decode("utf-8")
+        return self._content
+
+    async def load_content(self) -> str:
+        """Like content, but also fetches bodies kept in the blob store."""
+        if self._content is None and self.blob_key is not None:
+            self._content = (await blob_store.read(self.blob_key)).decode("utf-8")
+        return self.content
+
+    @override
+    def __repr__(self):
+        return f"<PasteContent(hash={self.hash}, ref_count={self.ref_count})>"
+
+
+def _add_reference(session: Session, content_hash: str) -> bool:
+    result = session.connection().execute(
+        update(PasteContent)
+        .where(PasteContent.hash == content_hash)
+        .values(ref_count=PasteContent.ref_count + 1)
+    )
+    return bool(result.rowcount)
+
+
+def _insert_content(session: Session, **values):
+    # Someone may have inserted the same body since _add_reference
+    stmt = pg_insert(PasteContent).values(ref_count=1, **values)
+    session.connection().execute(
+        stmt.on_conflict_do_update(
+            index_elements=[PasteContent.hash],
+            set_={"ref_count": PasteContent.ref_count + 1},
+        )
+    )
+
+
+def acquire_content(session: Session, content_hash: str, content: str):
+    """Take a reference to a body, inserting it only if the hash is new.
+
+    Bodies over BLOB_STORE_THRESHOLD_BYTES must already be in the blob store
+    under their hash (see PasteService.offload_content).
+    """
+    if _add_reference(session, content_hash):
+        return
+
+    raw = content.encode("utf-8")
+    if len(raw) >= settings.BLOB_STORE_THRESHOLD_BYTES:
+        acquire_blob(session, content_hash, len(raw), search_head(content))
+        return
+
+    data, encoding = compress(
+        raw, settings.PASTE_COMPRESSION, settings.PASTE_COMPRESSION_MIN_BYTES
+    )
+    _insert_content(
+        session,
+        hash=content_hash,
+        data=data,
+        encoding=encoding,
+        size=len(raw),
+        search_text=search_head(content),
+    )
+
+
+def acquire_blob(session: Session, content_hash: str, size: int, head: str):
+    """Take a reference to a body already in the blob store under its hash.
+
+    head is the start of the body, as returned by search_head().
+    """
+    if _add_reference(session, content_hash):
+        return
+
+    _insert_content(
+        session,
+        hash=content_hash,
+        data=None,
+        encoding=IDENTITY,
+        blob_key=content_hash,
+        size=size,
+        search_text=head,
+    )
+
+
+def release_content(session: Session, content_hash: str) -> str | None:
+    """Drop a reference to a body and delete the body with the last one.
+
+    Returns the blob key of a deleted body that lived in the blob store; the
+    blob is left for the caller to delete once the transaction commits.
+    """
+    connection = session.connection()
+    ref_count = connection.scalar(
+        update(PasteContent)
+        .where(PasteContent.hash == content_hash)
+        .values(ref_count=PasteContent.ref_count - 1)
+        .returning(PasteContent.ref_count)
+    )
+    if ref_count is not None and ref_count <= 0:
+        return connection.scalar(
+            PasteContent.__table__.delete()
+            .where(PasteContent.hash == content_hash, PasteContent.ref_count <= 0)
+            .returning(PasteContent.blob_key)
+        )
+    return None
+
+
+async def lock_blob(db: AsyncSession, blob_key: str, exclusive: bool = False):
+    """Lock a blob key until the transaction ends.
+
+    Writers hold it shared from putting a blob until the row referencing it
+    commits, and deleters hold it exclusive while they check that nothing
+    references the blob and delete it. Without it a writer could find the
+    blob still there, skip the upload, and commit its row just after a
+    deleter checked.
+    """
+    lock = (
+        func.pg_advisory_xact_lock if exclusive else func.pg_advisory_xact_lock_shared
+    )
+    await db.execute(select(lock(func.hashtextextended(blob_key, 0))))
@@ -13,18 +13,20 @@ class Token(Base):
     __tablename__: str = "tokens"
 
     jti: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     token_type: Mapped[str] = mapped_column(String(30), nullable=False)
 
     # If token_type == "access" then paired_jti refers to "refresh"
     # otherwise , paired_jti refers to "access"
     paired_jti: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4
+        UUID(as_uuid=True), index=True, nullable=False, default=uuid.uuid4
     )
 
+    # Partition key, so it has to be part of the primary key. Daily partitions
+    # are created and dropped by app/core/token_partitions.py.
     expires_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False
+        DateTime(timezone=True), primary_key=True
     )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -44,6 +46,8 @@ class Token(Base):
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="tokens")
 
+    __table_args__ = {"postgresql_partition_by": "RANGE (expires_at)"}
+
     @override
     def __repr__(self):
         return f"<Token(JTI={self.jti}, \npaired_jti={self.paired_jti}, \nuser={self.user if self.user else 'Anon'})>"
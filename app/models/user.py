@@ -30,6 +30,9 @@ class User(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, server_default="TRUE")
 
     # Relationships
+    # Delete users with session.delete(): the cascade then deletes their
+    # pastes through the ORM, whose flush hooks release the paste_contents
+    # references. The database's ON DELETE CASCADE alone would leak them.
     pastes: Mapped[list["Paste"]] = relationship(
         "Paste", back_populates="user", cascade="all, delete-orphan"
     )
@@ -1,3 +1,23 @@
+from app.schemas.paste import (
+    PasteCreate,
+    PasteMetadata,
+    PastePage,
+    PasteResponse,
+    PasteSummary,
+    PasteUpdate,
+)
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token, TokenRefresh
 
-__all__ = ["UserCreate", "UserLogin", "UserResponse", "Token", "TokenRefres"]
+__all__ = [
+    "UserCreate",
+    "UserLogin",
+    "UserResponse",
+    "Token",
+    "TokenRefresh",
+    "PasteCreate",
+    "PasteMetadata",
+    "PasteUpdate",
+    "PastePage",
+    "PasteResponse",
+    "PasteSummary",
+]
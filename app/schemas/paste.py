@@ -0,0 +1,103 @@
+from datetime import UTC, datetime
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.core.config import settings
+
+
+def validate_expires_at(v: datetime | None) -> datetime | None:
+    """Reject expiry times that are already in the past."""
+
+    if v is None:
+        return v
+
+    if v.tzinfo is None:
+        v = v.replace(tzinfo=UTC)
+
+    if v <= datetime.now(UTC):
+        raise ValueError("Expiry time must be in the future")
+
+    return v
+
+
+def validate_content_size(v: str | None) -> str | None:
+    """Reject bodies over PASTE_UPLOAD_MAX_BYTES, the /upload limit too."""
+
+    max_bytes = settings.PASTE_UPLOAD_MAX_BYTES
+    # A character is at least one byte, so most bodies skip the encoding
+    if v is not None and len(v) > max_bytes // 4 and len(v.encode()) > max_bytes:
+        raise ValueError(f"Paste exceeds {max_bytes} bytes")
+    return v
+
+
+class PasteMetadata(BaseModel):
+    title: str | None = Field(default=None, max_length=255)
+    language: str = Field(default="plaintext", max_length=50)
+    is_public: bool = True
+    expires_at: datetime | None = None
+
+    @field_validator("expires_at")
+    @classmethod
+    def validate_expires_at(cls, v: datetime | None) -> datetime | None:
+        return validate_expires_at(v)
+
+
+class PasteCreate(PasteMetadata):
+    content: str = Field(..., min_length=1)
+
+    @field_validator("content")
+    @classmethod
+    def validate_content_size(cls, v: str) -> str:
+        return validate_content_size(v)
+
+
+class PasteUpdate(BaseModel):
+    # None means "leave unchanged"; only expires_at can be set to null
+    title: str | None = Field(default=None, max_length=255)
+    content: str | None = Field(default=None, min_length=1)
+    language: str | None = Field(default=None, max_length=50)
+    is_public: bool | None = None
+    expires_at: datetime | None = None
+
+    @field_validator("title", "content", "language", "is_public")
+    @classmethod
+    def reject_null(cls, v):
+        if v is None:
+            raise ValueError("Field can't be null, leave it out to keep it")
+        return v
+
+    @field_validator("content")
+    @classmethod
+    def validate_content_size(cls, v: str | None) -> str | None:
+        return validate_content_size(v)
+
+    @field_validator("expires_at")
+    @classmethod
+    def validate_expires_at(cls, v: datetime | None) -> datetime | None:
+        return validate_expires_at(v)
+
+
+class PasteSummary(BaseModel):
+    short_url: str
+    title: str | None
+    language: str | None
+    is_public: bool
+    view_count: int
+    expires_at: datetime | None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class PasteResponse(PasteSummary):
+    content: str
+    # Set when content is only the start of a large body; /raw has all of it
+    truncated: bool = False
+
+
+class PastePage(BaseModel):
+    items: list[PasteSummary]
+    # Pass as ?cursor= to get the next page; None on the last page
+    next_cursor: str | None
@@ -26,7 +26,7 @@ def validate_password_strength(v: str) -> str:
 
 class UserCreate(BaseModel):
     email: EmailStr
-    password: Field(
+    password: str = Field(
         ..., min_length=8, description="Password must be atleast 8 characters long"
     )
 
@@ -38,7 +38,7 @@ class UserCreate(BaseModel):
 
 class UserLogin(BaseModel):
     email: EmailStr
-    password: Field(
+    password: str = Field(
         ..., min_length=8, description="Password must be atleast 8 characters long"
     )
 
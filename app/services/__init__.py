@@ -1,3 +1,5 @@
 from app.services.auth_service import AuthService
+from app.services.paste_service import PasteService
+from app.services.search_service import SearchService
 
-__all__ = ["AuthService"]
+__all__ = ["AuthService", "PasteService", "SearchService"]
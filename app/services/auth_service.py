@@ -6,38 +6,41 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.security import (
-    create_access_token,
+    create_token,
     decode_token,
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_and_update_password_async,
 )
+from app.middleware.rate_limit import LoginRateLimiter
 from app.models import User
 from app.schemas import UserCreate, UserLogin
 
 
 class AuthService:
     @staticmethod
-    def create_user(db: AsyncSession, user_data: UserCreate) -> User:
-        existing_user = db.query(User).filter(User.email == user_data.email).first()
+    async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
+        result = await db.execute(select(User).where(User.email == user_data.email))
+        existing_user = result.scalar_one_or_none()
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered",
             )
 
-        hashed_password = hash_password(user_data.password)
+        hashed_password = await hash_password_async(user_data.password)
 
         db_user = User(email=user_data.email, hashed_password=hashed_password)
 
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
 
         return db_user
 
     @staticmethod
-    def authenticate_user(db: AsyncSession, user_data: UserLogin) -> User:
-        user = db.query(User).filter(User.email == user_data.email).first()
+    async def authenticate_user(db: AsyncSession, user_data: UserLogin) -> User:
+        result = await db.execute(select(User).where(User.email == user_data.email))
+        user = result.scalar_one_or_none()
 
         if not user:
             raise HTTPException(
@@ -45,16 +48,26 @@ class AuthService:
                 detail="Incorrect email or password",
             )
 
-        if not verify_password(user_data.password, user.hashed_password):
+        await LoginRateLimiter.check_user(user.id)
+
+        is_valid, new_hash = await verify_and_update_password_async(
+            user_data.password, user.hashed_password
+        )
+        if not is_valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
             )
 
+        # The stored hash predates the current policy, swap it transparently
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
+
         return user
 
     @staticmethod
-    def get_user_from_token(db: AsyncSession, refresh_token: str) -> User:
+    async def get_user_from_token(db: AsyncSession, refresh_token: str) -> User:
         payload = decode_token(refresh_token)
 
         if payload.get("type") != "refresh":
@@ -62,13 +75,14 @@ class AuthService:
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token type"
             )
 
-        user_id: int = payload.get("sub")
+        # sub is the user id as a string, see create_token_for_user
+        user_id = payload.get("sub")
         if user_id is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
             )
-        result = await db.execute(select(User).where(User.id == user_id))
+        result = await db.execute(select(User).where(User.id == int(user_id)))
         user = result.scalar_one_or_none()
 
         if not user:
@@ -81,7 +95,9 @@ class AuthService:
     @staticmethod
     def create_token_for_user(user: User) -> str:
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
+        access_token, _, _ = create_token(
+            data={"sub": str(user.id)},
+            token_type="access",
+            expires_delta=access_token_expires,
         )
         return access_token
@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+from sqlalchemy import Integer, String, column, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.language import detect_languages
+from app.core.paste_cache import paste_cache
+from app.core.recent_feed import recent_feed
+from app.models import Paste
+
+UNDETECTED_LANGUAGE = "plaintext"
+
+
+class LanguageDetector:
+    """Guesses the language of new "plaintext" pastes in the background.
+
+    Creating a paste only queues its id and the first
+    LANGUAGE_DETECTION_PREFIX_CHARS characters. drain() classifies the queue
+    in batches off the event loop and stores the results with one UPDATE per
+    batch. Pastes queued past LANGUAGE_DETECTION_QUEUE_SIZE, or still queued
+    at shutdown, keep "plaintext".
+    """
+
+    def __init__(self, max_queue: int):
+        self._queue: asyncio.Queue[tuple[int, str]] = asyncio.Queue(max_queue)
+        self._lock = asyncio.Lock()
+        self._classified = 0
+        self._detected = 0
+        self._dropped = 0
+        self._busy_seconds = 0.0
+
+    def submit(self, paste_id: int, text: str):
+        if not settings.LANGUAGE_DETECTION_ENABLED:
+            return
+        try:
+            self._queue.put_nowait(
+                (paste_id, text[: settings.LANGUAGE_DETECTION_PREFIX_CHARS])
+            )
+        except asyncio.QueueFull:
+            self._dropped += 1
+
+    @staticmethod
+    async def write(db: AsyncSession, languages: dict[int, str]) -> dict[str, str]:
+        """Store detected languages; returns those that changed by short_url."""
+        detected = values(
+            column("id", Integer), column("language", String), name="detected"
+        ).data(list(languages.items()))
+        # Skip pastes whose owner picked a language in the meantime
+        result = await db.execute(
+            update(Paste)
+            .where(
+                Paste.id == detected.c.id, Paste.language == UNDETECTED_LANGUAGE
+            )
+            # Unlike view counts this goes through onupdate: updated_at moves
+            # and ETags change, since the highlighted rendering does too
+            .values(language=detected.c.language)
+            .returning(Paste.short_url, Paste.language)
+        )
+        changed = dict(result.tuples().all())
+        await db.commit()
+        return changed
+
+    async def drain(self):
+        async with self._lock:
+            while not self._queue.empty():
+                batch = [
+                    self._queue.get_nowait()
+                    for _ in range(
+                        min(self._queue.qsize(), settings.LANGUAGE_DETECTION_BATCH_SIZE)
+                    )
+                ]
+                started_at = time.perf_counter()
+
+                guesses = await asyncio.to_thread(
+                    detect_languages, [text for _, text in batch]
+                )
+                languages = {
+                    paste_id: language
+                    for (paste_id, _), language in zip(batch, guesses, strict=True)
+                    if language is not None
+                }
+                changed = {}
+                if languages:
+                    async with AsyncSessionLocal() as db:
+                        changed = await self.write(db, languages)
+                    for short_url, language in changed.items():
+                        await paste_cache.invalidate(short_url)
+                        await recent_feed.update(short_url, language=language)
+
+                self._busy_seconds += time.perf_counter() - started_at
+                self._classified += len(batch)
+                self._detected += len(changed)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "classified": self._classified,
+            "detected": self._detected,
+            "dropped": self._dropped,
+            "pastes_per_second": (
+                self._classified / self._busy_seconds if self._busy_seconds else None
+            ),
+        }
+
+
+language_detector = LanguageDetector(settings.LANGUAGE_DETECTION_QUEUE_SIZE)
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import (
+    Integer,
+    String,
+    column,
+    delete,
+    exists,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.blob_store import blob_store
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.paste_cache import paste_cache
+from app.core.recent_feed import recent_feed
+from app.models import Paste, PasteContent
+from app.models.paste_content import lock_blob
+
+logger = logging.getLogger(__name__)
+
+
+class PasteReaper:
+    """Deletes expired pastes in bounded batches.
+
+    Each batch is one short transaction over at most PASTE_REAPER_BATCH_SIZE
+    rows found through idx_expires_public, followed by a pause so that
+    autovacuum and regular traffic keep up. The cursor is the expires_at of
+    the last deleted paste; the next batch starts there instead of walking
+    index entries for rows that are already gone. Rows skipped while
+    another transaction held them can sit behind the cursor, so it is
+    cleared once a run catches up and the next run starts from the oldest
+    expired paste. Until a paste is reaped every read path filters it out
+    with Paste.is_expired.
+    """
+
+    def __init__(self):
+        self.cursor: datetime | None = None
+        self._lock = asyncio.Lock()
+        self._deleted = 0
+        self._batches = 0
+        self._blobs_deleted = 0
+
+    @staticmethod
+    async def release_contents(db: AsyncSession, counts: Counter) -> list[str]:
+        """Drop references held by bulk-deleted pastes.
+
+        Bulk deletes skip the ORM flush hooks that normally do this. Returns
+        the blob keys of bodies whose last reference went away.
+        """
+        released = values(
+            column("hash", String), column("refs", Integer), name="released"
+        ).data(list(counts.items()))
+        await db.execute(
+            update(PasteContent)
+            .where(PasteContent.hash == released.c.hash)
+            .values(ref_count=PasteContent.ref_count - released.c.refs)
+        )
+        result = await db.execute(
+            delete(PasteContent)
+            .where(PasteContent.hash.in_(counts), PasteContent.ref_count <= 0)
+            .returning(PasteContent.blob_key)
+        )
+        return [blob_key for blob_key in result.scalars() if blob_key is not None]
+
+    @staticmethod
+    async def delete_batch(
+        db: AsyncSession, cursor: datetime | None, limit: int
+    ) -> tuple[list, list[str]]:
+        expired = select(Paste.id).where(Paste.is_expired)
+        if cursor is not None:
+            expired = expired.where(Paste.expires_at >= cursor)
+        # SKIP LOCKED lets several workers reap at once without waiting on
+        # each other or on pastes that are being edited
+        expired = (
+            expired.order_by(Paste.expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        result = await db.execute(
+            delete(Paste)
+            .where(Paste.id.in_(expired))
+            .returning(Paste.short_url, Paste.content_hash, Paste.expires_at)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        blob_keys = []
+        if rows:
+            blob_keys = await PasteReaper.release_contents(
+                db, Counter(row.content_hash for row in rows)
+            )
+        await db.commit()
+        return rows, blob_keys
+
+    @staticmethod
+    async def delete_blobs(blob_keys: list[str]) -> int:
+        """Delete the blobs that no body references any more.
+
+        A new paste with the same body may have taken the blob again since
+        it was released; those are kept. Returns how many were deleted.
+        """
+        deleted = 0
+        async with AsyncSessionLocal() as db:
+            for blob_key in blob_keys:
+                async with db.begin():
+                    await lock_blob(db, blob_key, exclusive=True)
+                    referenced = await db.scalar(
+                        select(exists().where(PasteContent.blob_key == blob_key))
+                    )
+                    if not referenced:
+                        await blob_store.delete(blob_key)
+                        deleted += 1
+        return deleted
+
+    async def run(self):
+        async with self._lock:
+            while True:
+                async with AsyncSessionLocal() as db:
+                    rows, blob_keys = await self.delete_batch(
+                        db, self.cursor, settings.PASTE_REAPER_BATCH_SIZE
+                    )
+                if not rows:
+                    self.cursor = None
+                    return
+
+                self.cursor = max(row.expires_at for row in rows)
+                self._batches += 1
+                self._deleted += len(rows)
+                for row in rows:
+                    await paste_cache.invalidate(row.short_url)
+                    await recent_feed.remove(row.short_url)
+                if blob_keys:
+                    self._blobs_deleted += await self.delete_blobs(blob_keys)
+
+                if len(rows) < settings.PASTE_REAPER_BATCH_SIZE:
+                    self.cursor = None
+                    return
+                await asyncio.sleep(settings.PASTE_REAPER_BATCH_SLEEP_SECONDS)
+
+    def stats(self) -> dict:
+        return {
+            "cursor": self.cursor.isoformat() if self.cursor else None,
+            "deleted": self._deleted,
+            "batches": self._batches,
+            "blobs_deleted": self._blobs_deleted,
+        }
+
+
+paste_reaper = PasteReaper()
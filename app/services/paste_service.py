@@ -0,0 +1,483 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import BigInteger, Row, Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only, raiseload
+
+from app.core.blob_store import blob_store
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.core.paste_cache import paste_cache
+from app.core.recent_feed import recent_feed
+from app.core.short_id import FeistelPermutation, ShortIdGenerator
+from app.core.upload import UploadEncodingError, UploadTooLargeError, spool_upload
+from app.models import Paste, PasteContent
+from app.models.paste import short_id_seq
+from app.models.paste_content import lock_blob
+from app.schemas import PasteCreate, PasteMetadata, PasteUpdate
+from app.services.language_detector import UNDETECTED_LANGUAGE, language_detector
+from app.services.paste_reaper import PasteReaper
+from app.services.view_counter import view_counter
+
+
+async def allocate_short_ids(count: int) -> list[int]:
+    """Reserve count values of the short id sequence in one round trip."""
+    async with AsyncSessionLocal() as db:
+        result = await db.scalars(
+            select(short_id_seq.next_value()).select_from(
+                func.generate_series(1, count)
+            )
+        )
+        return list(result)
+
+
+short_id_generator = ShortIdGenerator(
+    FeistelPermutation((settings.SHORT_ID_KEY or settings.SECRET_KEY).encode()),
+    allocate_short_ids,
+    block_size=settings.SHORT_ID_BLOCK_SIZE,
+)
+
+
+async def load_inline_content(body: PasteContent) -> tuple[str, bool]:
+    """A body as shown in JSON and HTML views, and whether it was cut short.
+
+    Blob store bodies over PASTE_INLINE_MAX_BYTES are cut to their first
+    PASTE_INLINE_MAX_BYTES bytes; /raw serves them whole.
+    """
+    max_bytes = settings.PASTE_INLINE_MAX_BYTES
+    if body.blob_key is None or body.size <= max_bytes:
+        return await body.load_content(), False
+
+    head = await blob_store.read_range(body.blob_key, 0, max_bytes - 1)
+    # Drops a character split by the cut
+    return head.decode("utf-8", errors="ignore"), True
+
+
+def serialize_paste(paste: Paste, content: str, truncated: bool = False) -> dict:
+    """JSON-friendly snapshot of a paste, as stored in the paste cache."""
+    return {
+        "id": paste.id,
+        "short_url": paste.short_url,
+        "title": paste.title,
+        "content": content,
+        "truncated": truncated,
+        "content_hash": paste.content_hash,
+        "content_encoding": paste.body.encoding,
+        "language": paste.language,
+        "is_public": paste.is_public,
+        "user_id": paste.user_id,
+        "view_count": paste.view_count,
+        "expires_at": paste.expires_at.isoformat() if paste.expires_at else None,
+        "created_at": paste.created_at.isoformat(),
+        "updated_at": paste.updated_at.isoformat(),
+    }
+
+
+def summarize_paste(paste: Paste) -> dict:
+    """JSON-friendly PasteSummary of a paste, as stored in the recent feed."""
+    return {
+        "short_url": paste.short_url,
+        "title": paste.title,
+        "language": paste.language,
+        "is_public": paste.is_public,
+        "view_count": paste.view_count,
+        "expires_at": paste.expires_at.isoformat() if paste.expires_at else None,
+        "created_at": paste.created_at.isoformat(),
+        "updated_at": paste.updated_at.isoformat(),
+    }
+
+
+def summary_query() -> Select:
+    """Select pastes with only the columns of PasteSummary, never the body."""
+    return select(Paste).options(
+        load_only(
+            Paste.short_url,
+            Paste.title,
+            Paste.language,
+            Paste.is_public,
+            Paste.view_count,
+            Paste.expires_at,
+            Paste.created_at,
+            Paste.updated_at,
+        ),
+        raiseload(Paste.body),
+    )
+
+
+PASTE_NOT_FOUND_EXCEPTION = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND, detail="Paste not found"
+)
+
+PASTE_TOO_LARGE_EXCEPTION = HTTPException(
+    status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+    detail=f"Paste exceeds {settings.PASTE_UPLOAD_MAX_BYTES} bytes",
+)
+
+PASTE_NOT_TEXT_EXCEPTION = HTTPException(
+    status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+    detail="Paste body must be UTF-8 text (or UTF-16/32 with a byte order mark)",
+)
+
+EMPTY_PASTE_EXCEPTION = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST, detail="Paste body is empty"
+)
+
+INVALID_CURSOR_EXCEPTION = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+)
+
+
+class PasteService:
+    @staticmethod
+    async def offload_content(db: AsyncSession, paste: Paste):
+        """Upload a large body to the blob store before its row is flushed."""
+        raw = paste.content.encode("utf-8")
+        if len(raw) >= settings.BLOB_STORE_THRESHOLD_BYTES:
+            await lock_blob(db, paste.content_hash)
+            await blob_store.put(paste.content_hash, raw)
+
+    @staticmethod
+    async def create_paste(
+        db: AsyncSession, paste_data: PasteCreate, user_id: int | None
+    ) -> Paste:
+        paste = Paste(
+            **paste_data.model_dump(),
+            short_url=await short_id_generator.next(),
+            user_id=user_id,
+        )
+        await PasteService.offload_content(db, paste)
+        db.add(paste)
+        await db.commit()
+        await db.refresh(paste)
+
+        if paste.language == UNDETECTED_LANGUAGE:
+            language_detector.submit(paste.id, paste.content)
+        if paste.is_public:
+            await recent_feed.push(summarize_paste(paste))
+
+        return paste
+
+    @staticmethod
+    async def upload_paste(
+        db: AsyncSession,
+        chunks: AsyncIterator[bytes],
+        metadata: PasteMetadata,
+        user_id: int | None,
+        content_length: int | None = None,
+    ) -> Paste:
+        """Create a paste from a body streamed in chunks.
+
+        Bodies past BLOB_STORE_THRESHOLD_BYTES are spooled to a temporary file
+        and copied from there to the blob store, never held in memory whole.
+        """
+        max_bytes = settings.PASTE_UPLOAD_MAX_BYTES
+        if content_length is not None and content_length > max_bytes:
+            raise PASTE_TOO_LARGE_EXCEPTION
+
+        try:
+            upload = await spool_upload(
+                chunks, max_bytes, settings.BLOB_STORE_THRESHOLD_BYTES
+            )
+        except UploadTooLargeError:
+            raise PASTE_TOO_LARGE_EXCEPTION from None
+        except UploadEncodingError:
+            raise PASTE_NOT_TEXT_EXCEPTION from None
+
+        with upload:
+            if upload.size == 0:
+                raise EMPTY_PASTE_EXCEPTION
+
+            paste = Paste(
+                **metadata.model_dump(),
+                short_url=await short_id_generator.next(),
+                user_id=user_id,
+            )
+            if upload.size >= settings.BLOB_STORE_THRESHOLD_BYTES:
+                await lock_blob(db, upload.content_hash)
+                await blob_store.put_file(upload.content_hash, upload.file)
+                paste.attach_blob(
+                    upload.content_hash,
+                    upload.size,
+                    upload.read_head(settings.SEARCH_INDEX_MAX_CHARS),
+                )
+            else:
+                paste.content = upload.read_text()
+
+            db.add(paste)
+            await db.commit()
+            await db.refresh(paste)
+
+            if paste.language == UNDETECTED_LANGUAGE:
+                language_detector.submit(
+                    paste.id,
+                    upload.read_head(settings.LANGUAGE_DETECTION_PREFIX_CHARS),
+                )
+            if paste.is_public:
+                await recent_feed.push(summarize_paste(paste))
+
+        return paste
+
+    @staticmethod
+    async def get_paste(short_url: str, user_id: int | None) -> dict:
+        """Return a serialized paste, from the cache when possible.
+
+        A database session is only opened on a cache miss. Expired pastes and
+        other users' private pastes are reported as not found.
+        """
+        entry = await paste_cache.get(short_url)
+
+        if entry is None:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Paste)
+                    .options(joinedload(Paste.body, innerjoin=True))
+                    .where(Paste.short_url == short_url, ~Paste.is_expired)
+                )
+                paste = result.scalar_one_or_none()
+
+            if paste is None:
+                raise PASTE_NOT_FOUND_EXCEPTION
+
+            entry = serialize_paste(paste, *await load_inline_content(paste.body))
+            await paste_cache.set(entry)
+
+        if not entry["is_public"] and entry["user_id"] != user_id:
+            raise PASTE_NOT_FOUND_EXCEPTION
+
+        view_counter.record(entry["id"])
+        view_count = entry["view_count"] + view_counter.pending(entry["id"])
+        return {**entry, "view_count": view_count}
+
+    @staticmethod
+    async def get_paste_validators(short_url: str, user_id: int | None) -> dict:
+        """Return what a conditional GET is answered from, without the body.
+
+        Comes from the paste cache when possible and otherwise from a query
+        that leaves paste_contents.data and any blob untouched. Same
+        visibility rules as get_paste; no view is recorded.
+        """
+        entry = await paste_cache.get(short_url)
+
+        if entry is None:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(
+                        Paste.id,
+                        Paste.is_public,
+                        Paste.user_id,
+                        Paste.content_hash,
+                        PasteContent.encoding.label("content_encoding"),
+                        Paste.expires_at,
+                        Paste.updated_at,
+                    )
+                    .join(Paste.body)
+                    .where(Paste.short_url == short_url, ~Paste.is_expired)
+                )
+                row = result.one_or_none()
+
+            if row is None:
+                raise PASTE_NOT_FOUND_EXCEPTION
+            validators = row._asdict()
+        else:
+            validators = {
+                field: entry[field]
+                for field in (
+                    "id",
+                    "is_public",
+                    "user_id",
+                    "content_hash",
+                    "content_encoding",
+                )
+            }
+            validators["expires_at"] = (
+                datetime.fromisoformat(entry["expires_at"])
+                if entry["expires_at"]
+                else None
+            )
+            validators["updated_at"] = datetime.fromisoformat(entry["updated_at"])
+
+        if not validators["is_public"] and validators["user_id"] != user_id:
+            raise PASTE_NOT_FOUND_EXCEPTION
+
+        return validators
+
+    @staticmethod
+    def record_view(paste_id: int):
+        view_counter.record(paste_id)
+
+    @staticmethod
+    async def get_raw_paste(short_url: str, user_id: int | None) -> Row:
+        """Return a paste body as stored, with the fields for caching headers."""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(
+                    Paste.id,
+                    Paste.is_public,
+                    Paste.user_id,
+                    Paste.content_hash,
+                    Paste.expires_at,
+                    Paste.updated_at,
+                    PasteContent.data,
+                    PasteContent.blob_key,
+                    PasteContent.encoding,
+                    PasteContent.size,
+                )
+                .join(Paste.body)
+                .where(Paste.short_url == short_url, ~Paste.is_expired)
+            )
+            row = result.one_or_none()
+
+        if row is None or (not row.is_public and row.user_id != user_id):
+            raise PASTE_NOT_FOUND_EXCEPTION
+
+        view_counter.record(row.id)
+        return row
+
+    @staticmethod
+    async def list_pastes(
+        db: AsyncSession,
+        cursor: str | None,
+        limit: int,
+        user_id: int | None = None,
+    ) -> dict:
+        """One page of pastes, newest first, without their bodies.
+
+        Lists the user's own pastes when user_id is given and public pastes
+        otherwise. Pages are keyset-paginated on (created_at, id), so any
+        page costs one index range scan of limit + 1 rows.
+        """
+        query = (
+            summary_query()
+            .where(~Paste.is_expired)
+            .order_by(Paste.created_at.desc(), Paste.id.desc())
+            .limit(limit + 1)
+        )
+        if user_id is not None:
+            query = query.where(Paste.user_id == user_id)
+        else:
+            query = query.where(Paste.is_public)
+
+        if cursor is not None:
+            try:
+                created_at, paste_id = decode_cursor(cursor)
+            except InvalidCursorError:
+                raise INVALID_CURSOR_EXCEPTION from None
+            query = query.where(
+                tuple_(Paste.created_at, Paste.id) < tuple_(created_at, paste_id)
+            )
+
+        pastes = list(await db.scalars(query))
+        next_cursor = None
+        if len(pastes) > limit:
+            pastes = pastes[:limit]
+            next_cursor = encode_cursor(pastes[-1].created_at, pastes[-1].id)
+
+        return {"items": pastes, "next_cursor": next_cursor}
+
+    @staticmethod
+    def recent_pastes(limit: int) -> list[dict]:
+        """The newest public pastes, served from the recent feed."""
+        return recent_feed.recent(limit)
+
+    @staticmethod
+    async def refresh_recent_feed():
+        """Reload the recent feed, from the database if Redis can't serve it."""
+        if await recent_feed.pull():
+            return
+        async with AsyncSessionLocal() as db:
+            page = await PasteService.list_pastes(db, None, settings.RECENT_FEED_SIZE)
+        await recent_feed.seed([summarize_paste(paste) for paste in page["items"]])
+
+    @staticmethod
+    async def get_owned_paste(db: AsyncSession, short_url: str, user_id: int) -> Paste:
+        result = await db.execute(select(Paste).where(Paste.short_url == short_url))
+        paste = result.scalar_one_or_none()
+
+        if paste is None:
+            raise PASTE_NOT_FOUND_EXCEPTION
+
+        if paste.user_id is None or paste.user_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You do not own this paste",
+            )
+
+        return paste
+
+    @staticmethod
+    async def delete_released_blobs(db: AsyncSession):
+        """Delete the blobs of bodies whose last paste went in the last commit."""
+        blob_keys = db.info.pop("released_blob_keys", None)
+        if blob_keys:
+            await PasteReaper.delete_blobs(blob_keys)
+
+    @staticmethod
+    async def update_paste(
+        db: AsyncSession, short_url: str, paste_data: PasteUpdate, user_id: int
+    ) -> dict:
+        paste = await PasteService.get_owned_paste(db, short_url, user_id)
+
+        for field, value in paste_data.model_dump(exclude_unset=True).items():
+            setattr(paste, field, value)
+        if paste_data.content is not None:
+            await PasteService.offload_content(db, paste)
+
+        await db.commit()
+        await PasteService.delete_released_blobs(db)
+        await db.refresh(paste)
+        await db.refresh(paste, ["body"])
+        await paste_cache.invalidate(short_url)
+        if paste.is_public:
+            await recent_feed.push(summarize_paste(paste))
+        else:
+            await recent_feed.remove(short_url)
+
+        if paste_data.content is not None:
+            return serialize_paste(paste, paste_data.content)
+        return serialize_paste(paste, *await load_inline_content(paste.body))
+
+    @staticmethod
+    async def delete_paste(db: AsyncSession, short_url: str, user_id: int):
+        paste = await PasteService.get_owned_paste(db, short_url, user_id)
+
+        await db.delete(paste)
+        await db.commit()
+        await PasteService.delete_released_blobs(db)
+        await paste_cache.invalidate(short_url)
+        await recent_feed.remove(short_url)
+
+    @staticmethod
+    async def get_storage_stats(db: AsyncSession) -> dict:
+        """How much deduplication and compression save on paste bodies."""
+        size = PasteContent.size.cast(BigInteger)
+        result = await db.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(PasteContent.ref_count), 0),
+                func.coalesce(func.sum(size * PasteContent.ref_count), 0),
+                func.coalesce(func.sum(size), 0),
+                func.coalesce(func.sum(func.octet_length(PasteContent.data)), 0),
+                func.coalesce(
+                    func.sum(size).filter(PasteContent.blob_key.is_not(None)), 0
+                ),
+            )
+        )
+        bodies, pastes, logical_bytes, unique_bytes, stored_bytes, blob_bytes = map(
+            int, result.one()
+        )
+
+        return {
+            "pastes": pastes,
+            "unique_bodies": bodies,
+            "logical_bytes": logical_bytes,
+            "unique_bytes": unique_bytes,
+            "stored_bytes": stored_bytes,
+            "blob_bytes": blob_bytes,
+            "dedup_ratio": logical_bytes / unique_bytes if unique_bytes else 1.0,
+            "compression_ratio": (
+                (unique_bytes - blob_bytes) / stored_bytes if stored_bytes else 1.0
+            ),
+        }
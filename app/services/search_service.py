@@ -0,0 +1,230 @@
+import logging
+from typing import Literal
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, func, or_, select, text, tuple_, union, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.blob_store import BlobNotFoundError, blob_store
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    encode_rank_cursor,
+)
+from app.models import Paste, PasteContent
+from app.models.paste_content import SEARCH_CONFIG, search_head
+from app.services.paste_service import INVALID_CURSOR_EXCEPTION, summary_query
+
+logger = logging.getLogger(__name__)
+
+SearchMode = Literal["words", "substring", "regex"]
+
+# Trigram indexes can't narrow down patterns shorter than a trigram
+MIN_PATTERN_CHARS = 3
+
+BACKFILL_BATCH_SIZE = 100
+
+# SQLSTATEs of errors caused by the query rather than by the database
+INVALID_REGULAR_EXPRESSION = "2201B"
+QUERY_CANCELED = "57014"
+
+INVALID_PATTERN_EXCEPTION = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid regular expression"
+)
+
+PATTERN_TOO_SHORT_EXCEPTION = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail=f"Patterns must be at least {MIN_PATTERN_CHARS} characters long",
+)
+
+SEARCH_TIMEOUT_EXCEPTION = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Search took too long, try a more specific query",
+)
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SearchService:
+    @staticmethod
+    def matching_ids(query: str, mode: SearchMode) -> Select:
+        """Ids of pastes whose title or indexed body matches the query.
+
+        Title and body are matched in separate branches of a UNION, so each
+        branch can use its own GIN index (tsvector, or pg_trgm for substring
+        and regex searches where it is installed).
+        """
+        if mode == "words":
+            tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+            body_match = PasteContent.search_vector.bool_op("@@")(tsquery)
+            title_match = Paste.title_vector.bool_op("@@")(tsquery)
+        elif mode == "substring":
+            pattern = f"%{escape_like(query)}%"
+            body_match = PasteContent.search_text.ilike(pattern, escape="\\")
+            title_match = Paste.title.ilike(pattern, escape="\\")
+        else:
+            body_match = PasteContent.search_text.regexp_match(query, flags="i")
+            title_match = Paste.title.regexp_match(query, flags="i")
+
+        return union(
+            select(Paste.id)
+            .join(PasteContent, Paste.content_hash == PasteContent.hash)
+            .where(body_match),
+            select(Paste.id).where(title_match),
+        )
+
+    @staticmethod
+    def search_query(
+        query: str,
+        mode: SearchMode,
+        cursor: str | None,
+        limit: int,
+        user_id: int | None,
+    ) -> Select:
+        """The statement behind search(), fetching limit + 1 rows.
+
+        ts_rank reads the tsvectors of every row it ranks, so word searches
+        only rank the newest SEARCH_RANK_MAX_CANDIDATES visible matches;
+        older matches of very common words are left out.
+        """
+        matches = SearchService.matching_ids(query, mode).subquery()
+        candidates = select(Paste.id).where(
+            Paste.id.in_(select(matches.c.id)),
+            or_(Paste.is_public, Paste.user_id == user_id)
+            if user_id is not None
+            else Paste.is_public,
+            ~Paste.is_expired,
+        )
+        if mode == "words":
+            # Ordered so that every page ranks the same candidates
+            candidates = candidates.order_by(Paste.id.desc()).limit(
+                settings.SEARCH_RANK_MAX_CANDIDATES
+            )
+
+        stmt = (
+            summary_query()
+            .join(PasteContent, Paste.content_hash == PasteContent.hash)
+            .where(Paste.id.in_(candidates))
+        )
+
+        if mode == "words":
+            tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+            sort_key = func.ts_rank(
+                Paste.title_vector.op("||")(PasteContent.search_vector), tsquery
+            )
+            stmt = stmt.add_columns(sort_key)
+            if cursor is not None:
+                stmt = stmt.where(
+                    tuple_(sort_key, Paste.id) < tuple_(*decode_rank_cursor(cursor))
+                )
+        else:
+            sort_key = Paste.created_at
+            if cursor is not None:
+                stmt = stmt.where(
+                    tuple_(sort_key, Paste.id) < tuple_(*decode_cursor(cursor))
+                )
+
+        return stmt.order_by(sort_key.desc(), Paste.id.desc()).limit(limit + 1)
+
+    @staticmethod
+    async def search(
+        db: AsyncSession,
+        query: str,
+        mode: SearchMode,
+        cursor: str | None,
+        limit: int,
+        user_id: int | None,
+    ) -> dict:
+        """One page of search results, without paste bodies.
+
+        Word searches are ranked by ts_rank over title and body, substring
+        and regex searches are ordered newest first. Only the first
+        SEARCH_INDEX_MAX_CHARS characters of each body are searched. Results
+        include public pastes and the caller's own; expired ones are left out.
+        """
+        if mode != "words" and len(query) < MIN_PATTERN_CHARS:
+            raise PATTERN_TOO_SHORT_EXCEPTION
+
+        try:
+            stmt = SearchService.search_query(query, mode, cursor, limit, user_id)
+        except InvalidCursorError:
+            raise INVALID_CURSOR_EXCEPTION from None
+
+        await db.execute(
+            text(f"SET LOCAL statement_timeout = {int(settings.SEARCH_TIMEOUT_MS)}")
+        )
+        try:
+            rows = (await db.execute(stmt)).all()
+        except DBAPIError as e:
+            sqlstate = getattr(e.orig, "sqlstate", None)
+            if sqlstate == INVALID_REGULAR_EXPRESSION:
+                raise INVALID_PATTERN_EXCEPTION from None
+            if sqlstate == QUERY_CANCELED:
+                raise SEARCH_TIMEOUT_EXCEPTION from None
+            raise
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = (
+                encode_rank_cursor(last[1], last[0].id)
+                if mode == "words"
+                else encode_cursor(last[0].created_at, last[0].id)
+            )
+
+        return {"items": [row[0] for row in rows], "next_cursor": next_cursor}
+
+    @staticmethod
+    async def backfill_blob_search_text():
+        """Index blob store bodies that were stored before search existed.
+
+        The migration adding search_text only filled it in for bodies kept
+        in the database. This reads the start of every blob without it.
+        """
+        # Enough bytes for SEARCH_INDEX_MAX_CHARS characters of UTF-8
+        max_bytes = settings.SEARCH_INDEX_MAX_CHARS * 4
+        last_hash = ""
+        while True:
+            async with AsyncSessionLocal() as db:
+                rows = (
+                    await db.execute(
+                        select(PasteContent.hash, PasteContent.blob_key)
+                        .where(
+                            PasteContent.blob_key.is_not(None),
+                            PasteContent.search_text.is_(None),
+                            PasteContent.hash > last_hash,
+                        )
+                        .order_by(PasteContent.hash)
+                        .limit(BACKFILL_BATCH_SIZE)
+                    )
+                ).all()
+                if not rows:
+                    return
+
+                for row in rows:
+                    try:
+                        head = await blob_store.read_range(
+                            row.blob_key, 0, max_bytes - 1
+                        )
+                    except BlobNotFoundError:
+                        logger.warning("Blob %s is missing, not indexed", row.blob_key)
+                        continue
+                    await db.execute(
+                        update(PasteContent)
+                        .where(PasteContent.hash == row.hash)
+                        .values(
+                            search_text=search_head(
+                                head.decode("utf-8", errors="ignore")
+                            )
+                        )
+                    )
+                await db.commit()
+            last_hash = rows[-1].hash
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+from itertools import islice
+
+from sqlalchemy import Integer, column, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.paste_cache import paste_cache
+from app.core.tasks import start_task
+from app.models import Paste
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """Collects paste views in memory and writes them back in batches.
+
+    Reads never write to the database; a flush turns the pending counts into
+    one set-based UPDATE per ANALYTICS_BATCH_SIZE pastes. A flush is forced
+    once half of VIEW_COUNT_MAX_PENDING views are held, and views past the
+    limit are dropped while flushes fail, which bounds both memory and how
+    many views are lost if the worker dies without shutting down.
+    """
+
+    def __init__(self):
+        self._pending: dict[int, int] = {}
+        # Views being written by the running flush, still shown until the
+        # cache has the flushed counts
+        self._flushing: dict[int, int] = {}
+        # Views held in memory, pending or being flushed
+        self._held = 0
+        self._dropped = 0
+        self._flush_failed = False
+        self._lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+
+    def record(self, paste_id: int):
+        if self._held >= settings.VIEW_COUNT_MAX_PENDING:
+            self._dropped += 1
+            return
+
+        self._pending[paste_id] = self._pending.get(paste_id, 0) + 1
+        self._held += 1
+
+        # After a failed flush, leave retries to the periodic flush
+        if (
+            self._held >= settings.VIEW_COUNT_MAX_PENDING // 2
+            and not self._flush_failed
+            and (self._flush_task is None or self._flush_task.done())
+        ):
+            self._flush_task = start_task("view-count-forced-flush", self.flush())
+
+    def pending(self, paste_id: int) -> int:
+        return self._pending.get(paste_id, 0) + self._flushing.get(paste_id, 0)
+
+    @staticmethod
+    async def write(db: AsyncSession, counts: dict[int, int]) -> dict[str, int]:
+        """Add views to the pastes; returns their new counts by short_url."""
+        view_counts = {}
+        items = iter(counts.items())
+        while batch := list(islice(items, settings.ANALYTICS_BATCH_SIZE)):
+            views = values(
+                column("id", Integer), column("views", Integer), name="views"
+            ).data(batch)
+            result = await db.execute(
+                update(Paste)
+                .where(Paste.id == views.c.id)
+                .values(
+                    view_count=Paste.view_count + views.c.views,
+                    # Views aren't edits, keep updated_at (and ETags) stable
+                    updated_at=Paste.updated_at,
+                )
+                .returning(Paste.short_url, Paste.view_count)
+            )
+            view_counts.update(result.tuples().all())
+        await db.commit()
+        return view_counts
+
+    async def flush(self):
+        async with self._lock:
+            counts, self._pending = self._pending, {}
+            if not counts:
+                return
+
+            self._flushing = counts
+            try:
+                async with AsyncSessionLocal() as db:
+                    view_counts = await self.write(db, counts)
+            except BaseException:
+                # Put the counts back so the next flush retries them, also
+                # when a forced flush is cancelled at shutdown
+                for paste_id, views in counts.items():
+                    self._pending[paste_id] = self._pending.get(paste_id, 0) + views
+                self._flushing = {}
+                self._flush_failed = True
+                raise
+
+            # Swap the flushed views for the new totals in one step, so the
+            # count a reader sees never goes backwards
+            paste_cache.set_view_counts(view_counts)
+            self._flushing = {}
+            self._held -= sum(counts.values())
+            self._flush_failed = False
+        # Other workers reload the new totals once their local entries expire
+        await paste_cache.invalidate_shared(list(view_counts))
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._held,
+            "dropped": self._dropped,
+            "flush_failed": self._flush_failed,
+        }
+
+
+view_counter = ViewCounter()
@@ -0,0 +1,85 @@
+"""Encode/decode throughput of JWT signing per algorithm.
+
+Compares passing raw key material to PyJWT on every call (what create_token
+and decode_token used to do) with the prepared keys held by KeyManager.
+
+    uv run python -m benchmarks.jwt_benchmark
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from app.core.keys import KeyManager
+
+ITERATIONS = 5_000
+PAYLOAD = {
+    "sub": "42",
+    "type": "access",
+    "jti": "0f8fad5b-d9cb-469f-a165-70867728950e",
+}
+
+
+def ops_per_second(func, iterations: int = ITERATIONS) -> float:
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - started_at)
+
+
+def write_pem(keys_dir: Path, private_key) -> bytes:
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    (keys_dir / "bench.pem").write_bytes(pem)
+    return pem
+
+
+def bench(algorithm: str, raw_key, raw_public_key, manager: KeyManager):
+    raw_token = jwt.encode(PAYLOAD, raw_key, algorithm=algorithm)
+    token = manager.encode(PAYLOAD)
+    return {
+        "encode (raw key)": ops_per_second(
+            lambda: jwt.encode(PAYLOAD, raw_key, algorithm=algorithm)
+        ),
+        "encode (KeyManager)": ops_per_second(lambda: manager.encode(PAYLOAD)),
+        "decode (raw key)": ops_per_second(
+            lambda: jwt.decode(raw_token, raw_public_key, algorithms=[algorithm])
+        ),
+        "decode (KeyManager)": ops_per_second(lambda: manager.decode(token)),
+    }
+
+
+def main():
+    results = {}
+
+    secret = "x" * 43
+    results["HS256"] = bench("HS256", secret, secret, KeyManager.load("HS256", secret))
+
+    for algorithm, private_key in (
+        ("ES256", ec.generate_private_key(ec.SECP256R1())),
+        ("EdDSA", ed25519.Ed25519PrivateKey.generate()),
+    ):
+        with tempfile.TemporaryDirectory() as keys_dir:
+            pem = write_pem(Path(keys_dir), private_key)
+            public_pem = private_key.public_key().public_bytes(
+                serialization.Encoding.PEM,
+                serialization.PublicFormat.SubjectPublicKeyInfo,
+            )
+            manager = KeyManager.load(algorithm, "", keys_dir)
+            results[algorithm] = bench(algorithm, pem, public_pem, manager)
+
+    columns = list(next(iter(results.values())))
+    print(f"{'algorithm':<10}" + "".join(f"{c:>22}" for c in columns))
+    for algorithm, row in results.items():
+        print(f"{algorithm:<10}" + "".join(f"{row[c]:>20,.0f}/s" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
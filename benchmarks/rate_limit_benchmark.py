@@ -0,0 +1,69 @@
+"""Per-request overhead of RateLimitMiddleware with the in-memory backend.
+
+Calls the ASGI app directly, so the numbers exclude HTTP parsing and
+routing. "bearer" requests carry an HS256 access token, which is verified
+statelessly to key the bucket by user.
+
+    uv run python -m benchmarks.rate_limit_benchmark
+"""
+
+import asyncio
+import time
+
+from app.core.config import settings
+from app.core.rate_limit import MemoryRateLimitBackend
+from app.core.security import create_token
+from app.middleware.rate_limit import RateLimitMiddleware
+
+ITERATIONS = 50_000
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def microseconds_per_request(app, scope: dict) -> float:
+    started_at = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await app(scope, receive, send)
+    return (time.perf_counter() - started_at) / ITERATIONS * 1_000_000
+
+
+async def main():
+    # High enough that every request is let through and does the full work
+    settings.READ_RATE_LIMIT = f"{ITERATIONS * 10}/minute"
+    settings.DEFAULT_RATE_LIMIT = f"{ITERATIONS * 10}/minute"
+    settings.AUTHENTICATED_RATE_LIMIT = f"{ITERATIONS * 10}/minute"
+    middleware = RateLimitMiddleware(ok_app, backend=MemoryRateLimitBackend())
+
+    token, _, _ = create_token({"sub": "1"}, "access")
+    anonymous = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/pastes/abc",
+        "headers": [],
+        "client": ("203.0.113.7", 1234),
+    }
+    bearer = {
+        **anonymous,
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+    }
+
+    baseline = await microseconds_per_request(ok_app, anonymous)
+    print(f"{'no middleware':<24}{baseline:>8.1f} us")
+    for label, scope in (("anonymous", anonymous), ("bearer", bearer)):
+        total = await microseconds_per_request(middleware, scope)
+        print(f"{label:<24}{total:>8.1f} us  (+{total - baseline:.1f} us)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
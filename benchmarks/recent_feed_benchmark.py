@@ -0,0 +1,65 @@
+"""Serving the recent public pastes from the feed vs querying them per read.
+
+Readers run concurrently on one event loop, as requests on one worker would.
+"SQL" runs the public listing query for every read, "feed" reads the
+in-memory feed loaded once from the same query. Needs the database from
+DATABASE_URL with some public pastes in it.
+
+    uv run python -m benchmarks.recent_feed_benchmark
+"""
+
+import asyncio
+import statistics
+import time
+
+from app.core.database import AsyncSessionLocal, engine
+from app.services.paste_service import PasteService
+
+LIMIT = 20
+READS_PER_READER = 200
+CONCURRENCY = (1, 16, 64)
+
+
+async def read_sql():
+    async with AsyncSessionLocal() as db:
+        await PasteService.list_pastes(db, None, LIMIT)
+
+
+async def read_feed():
+    PasteService.recent_pastes(LIMIT)
+
+
+async def run_readers(read, readers: int) -> tuple[float, list[float]]:
+    latencies = []
+
+    async def reader():
+        for _ in range(READS_PER_READER):
+            started_at = time.perf_counter()
+            await read()
+            latencies.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(reader() for _ in range(readers)))
+    elapsed = time.perf_counter() - started_at
+    return len(latencies) / elapsed, latencies
+
+
+async def main():
+    await PasteService.refresh_recent_feed()
+    await read_sql()  # warm up the pool
+
+    for readers in CONCURRENCY:
+        for label, read in (("SQL", read_sql), ("feed", read_feed)):
+            rate, latencies = await run_readers(read, readers)
+            quantiles = statistics.quantiles(latencies, n=100)
+            print(
+                f"{label:<6}{readers:>4} readers{rate:>12,.0f} reads/s"
+                f"  p50 {quantiles[49] * 1000:>8.3f} ms"
+                f"  p99 {quantiles[98] * 1000:>8.3f} ms"
+            )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
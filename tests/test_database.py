@@ -1,9 +1,19 @@
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
 import pytest
 import pytest_asyncio
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from app.core.database import Base
-from app.models import User, Paste
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
 from app.core.config import get_settings
+from app.core.database import Base
+from app.core.security import create_token, get_token_user
+from app.middleware import AuthMiddleware
+from app.models import Paste, PasteContent, Token, User
+from app.services import PasteService
 
 settings = get_settings()
 
@@ -79,3 +89,154 @@ async def test_user_paste_relationship(test_db):
 
     assert len(user.pastes) == 1
     assert user.pastes[0].title == "User's Paste"
+
+
+async def ref_counts(session: AsyncSession) -> dict[str, int]:
+    result = await session.execute(
+        select(PasteContent.hash, PasteContent.ref_count).execution_options(
+            populate_existing=True
+        )
+    )
+    return dict(result.tuples().all())
+
+
+@pytest.mark.asyncio
+async def test_identical_pastes_share_a_body(test_db):
+    """Test pastes with the same content share one counted paste_contents row"""
+    first = Paste(content="shared body", short_url="same01")
+    second = Paste(content="shared body", short_url="same02")
+    test_db.add_all([first, second])
+    await test_db.commit()
+
+    assert first.content_hash == second.content_hash
+    assert await ref_counts(test_db) == {first.content_hash: 2}
+
+
+@pytest.mark.asyncio
+async def test_updates_and_deletes_release_bodies(test_db):
+    """Test the last paste using a body takes the paste_contents row with it"""
+    first = Paste(content="shared body", short_url="rel001")
+    second = Paste(content="shared body", short_url="rel002")
+    test_db.add_all([first, second])
+    await test_db.commit()
+    shared = first.content_hash
+
+    first.content = "edited body"
+    await test_db.commit()
+    assert await ref_counts(test_db) == {shared: 1, first.content_hash: 1}
+
+    await test_db.delete(second)
+    await test_db.commit()
+    assert await ref_counts(test_db) == {first.content_hash: 1}
+
+    await test_db.delete(first)
+    await test_db.commit()
+    assert await ref_counts(test_db) == {}
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_user_releases_their_bodies(test_db):
+    """Test pastes deleted along with their owner still release their bodies"""
+    user = User(email="leaving@example.com", hashed_password="hash123")
+    test_db.add(user)
+    await test_db.commit()
+    test_db.add_all(
+        [
+            Paste(content="kept body", short_url="usr001"),
+            Paste(content="kept body", short_url="usr002", user_id=user.id),
+            Paste(content="owned body", short_url="usr003", user_id=user.id),
+        ]
+    )
+    await test_db.commit()
+
+    await test_db.delete(user)
+    await test_db.commit()
+
+    counts = await ref_counts(test_db)
+    assert list(counts.values()) == [1]
+
+
+@pytest.mark.asyncio
+async def test_storage_stats_count_bodies_once(test_db, monkeypatch):
+    monkeypatch.setattr(settings, "PASTE_COMPRESSION_MIN_BYTES", 1_000_000)
+    test_db.add_all(
+        [
+            Paste(content="x" * 100, short_url="sta001"),
+            Paste(content="x" * 100, short_url="sta002"),
+            Paste(content="y" * 50, short_url="sta003"),
+        ]
+    )
+    await test_db.commit()
+
+    stats = await PasteService.get_storage_stats(test_db)
+
+    assert stats["pastes"] == 3
+    assert stats["unique_bodies"] == 2
+    assert stats["logical_bytes"] == 250
+    assert stats["unique_bytes"] == stats["stored_bytes"] == 150
+    assert stats["dedup_ratio"] == 250 / 150
+    assert stats["compression_ratio"] == 1.0
+
+
+async def add_access_token(session: AsyncSession, user: User, **overrides):
+    token, jti, expires_at = create_token({"sub": str(user.id)}, "access")
+    row = Token(jti=jti, token_type="access", expires_at=expires_at, user_id=user.id)
+    for field, value in overrides.items():
+        setattr(row, field, value)
+    session.add(row)
+    await session.commit()
+    return token, jti, expires_at
+
+
+@pytest_asyncio.fixture
+async def token_owner(test_db):
+    # tokens is partitioned by day; one catch-all partition will do here
+    await test_db.execute(
+        text("CREATE TABLE tokens_default PARTITION OF tokens DEFAULT")
+    )
+    user = User(email="owner@example.com", hashed_password="hash123")
+    test_db.add(user)
+    await test_db.commit()
+    return user
+
+
+@pytest.mark.asyncio
+async def test_get_token_user_checks_the_token_row(test_db, token_owner):
+    """Test only an unexpired access token row of the same user is accepted"""
+    _, jti, expires_at = await add_access_token(test_db, token_owner)
+    user, is_blacklisted = await get_token_user(
+        test_db, jti, token_owner.id, expires_at
+    )
+    assert user.id == token_owner.id and is_blacklisted is False
+
+    # Missing row, or one belonging to someone else
+    assert await get_token_user(test_db, uuid4(), token_owner.id, expires_at) is None
+    assert await get_token_user(test_db, jti, token_owner.id + 1, expires_at) is None
+
+    expired_at = datetime.now(UTC) - timedelta(minutes=1)
+    _, expired_jti, _ = await add_access_token(
+        test_db, token_owner, expires_at=expired_at
+    )
+    assert (
+        await get_token_user(test_db, expired_jti, token_owner.id, expired_at) is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_resolve_user_rejects_tokens_without_a_row(test_db, token_owner):
+    token, _, _ = await add_access_token(test_db, token_owner)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    user = await AuthMiddleware.resolve_user(credentials, test_db)
+    assert user.id == token_owner.id
+
+    other = User(email="other@example.com", hashed_password="hash123")
+    test_db.add(other)
+    await test_db.commit()
+    # No token row at all, and a row that belongs to another user
+    stray, _, _ = create_token({"sub": str(token_owner.id)}, "access")
+    borrowed, _, _ = await add_access_token(test_db, token_owner, user_id=other.id)
+    for token in (stray, borrowed):
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        with pytest.raises(HTTPException) as exc_info:
+            await AuthMiddleware.resolve_user(credentials, test_db)
+        assert exc_info.value.status_code == 401
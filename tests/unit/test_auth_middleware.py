@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core.revocation import RevocationSnapshot, cache_revocation
+from app.core.security import create_token
+from app.middleware import AuthMiddleware
+from app.middleware import auth_middleware as middleware_module
+
+
+class NoDatabase:
+    def __getattr__(self, name):
+        raise AssertionError(f"db.{name} used")
+
+
+@pytest.fixture
+def snapshot(monkeypatch):
+    snapshot = RevocationSnapshot()
+    snapshot.refreshed_at = time.monotonic()
+    monkeypatch.setattr(middleware_module, "revocation_snapshot", snapshot)
+    return snapshot
+
+
+def access_token():
+    token, jti, expires_at = create_token({"sub": "1"}, "access")
+    return (
+        HTTPAuthorizationCredentials(scheme="Bearer", credentials=token),
+        jti,
+        expires_at,
+    )
+
+
+def verify(credentials, strict):
+    return asyncio.run(
+        AuthMiddleware.verify_token(credentials, "access", NoDatabase(), strict)
+    )
+
+
+def test_stateless_verification_skips_the_database(monkeypatch, snapshot):
+    """Test strict=False checks only the signature and the snapshot"""
+
+    async def is_token_blacklisted(*args):
+        raise AssertionError("revocation looked up")
+
+    monkeypatch.setattr(middleware_module, "is_token_blacklisted", is_token_blacklisted)
+    credentials, jti, _ = access_token()
+
+    assert verify(credentials, strict=False)["jti"] == str(jti)
+
+    snapshot.add(jti)
+    with pytest.raises(HTTPException) as exc_info:
+        verify(credentials, strict=False)
+    assert exc_info.value.detail == "Token has been revoked"
+
+
+def test_strict_verification_rejects_revoked_tokens(snapshot):
+    """Test strict=True checks revocation even with a fresh snapshot"""
+    credentials, jti, expires_at = access_token()
+    cache_revocation(jti, True, expires_at)
+
+    with pytest.raises(HTTPException) as exc_info:
+        verify(credentials, strict=True)
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == "Token has been revoked"
@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+
+from app.core.blob_store import BlobNotFoundError, LocalBlobStore
+
+
+async def read_stream(store: LocalBlobStore, key: str, start=0, end=None) -> bytes:
+    chunks = await store.open_stream(key, start, end)
+    return b"".join([chunk async for chunk in chunks])
+
+
+def test_open_stream_reads_ranges(tmp_path):
+    """Test open_stream yields the same bytes as stream, first chunk included"""
+    store = LocalBlobStore(str(tmp_path), chunk_size=4)
+    data = bytes(range(100))
+    asyncio.run(store.put("abcdef", data))
+
+    assert asyncio.run(read_stream(store, "abcdef")) == data
+    assert asyncio.run(read_stream(store, "abcdef", 10, 20)) == data[10:21]
+
+
+def test_open_stream_fails_before_streaming(tmp_path):
+    """Test a missing blob is reported when the stream is opened"""
+    store = LocalBlobStore(str(tmp_path), chunk_size=4)
+
+    with pytest.raises(BlobNotFoundError):
+        asyncio.run(store.open_stream("missing"))
@@ -0,0 +1,46 @@
+import uuid
+
+import pytest
+
+from app.core.bloom import BloomFilter
+
+
+def test_no_false_negatives():
+    """Test every added item is reported as present"""
+    bloom = BloomFilter(capacity=1_000, error_rate=0.01)
+    items = [str(uuid.uuid4()) for _ in range(1_000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    assert len(bloom) == 1_000
+
+
+def test_false_positive_rate_within_target():
+    """Test the observed false-positive rate stays near the configured rate"""
+    bloom = BloomFilter(capacity=5_000, error_rate=0.01)
+    for _ in range(5_000):
+        bloom.add(str(uuid.uuid4()))
+
+    probes = 20_000
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(probes))
+
+    assert false_positives / probes < 0.02
+    assert bloom.false_positive_rate == pytest.approx(0.01, rel=0.2)
+
+
+def test_memory_footprint():
+    """Test sizing follows the standard m = -n ln p / (ln 2)^2 formula"""
+    bloom = BloomFilter(capacity=10_000_000, error_rate=0.001)
+
+    # ~14.4 bits per item at a 0.1% error rate
+    assert 17_000_000 < bloom.memory_bytes < 18_500_000
+    assert bloom.num_hashes == 10
+    assert bloom.false_positive_rate == 0
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        BloomFilter(capacity=0)
+    with pytest.raises(ValueError):
+        BloomFilter(capacity=10, error_rate=1.5)
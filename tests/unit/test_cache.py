@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from app.core.cache import TTLCache
+
+
+def test_get_and_set():
+    """Test values round-trip through the cache"""
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+    assert "a" in cache
+
+
+def test_lru_eviction():
+    """Test the least recently used entry is evicted first"""
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_entry_expires(monkeypatch):
+    """Test entries are dropped once their TTL has elapsed"""
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+
+    cache = TTLCache(maxsize=10)
+    cache.set("a", True, ttl=5)
+    assert cache.get("a") is True
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_non_positive_ttl_is_not_stored():
+    """Test already-expired entries are never cached"""
+    cache = TTLCache(maxsize=10)
+    cache.set("a", 1)
+    cache.set("a", 2, ttl=0)
+
+    assert "a" not in cache
+
+
+def test_invalid_maxsize():
+    with pytest.raises(ValueError):
+        TTLCache(maxsize=0)
+
+
+def test_byte_budget_evicts_lru():
+    """Test entries are evicted once the byte budget is exceeded"""
+    cache = TTLCache(maxsize=100, max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "xxxx")
+    cache.set("c", "xxxx")
+
+    assert "a" not in cache
+    assert cache.total_bytes == 8
+    assert cache.evictions == 1
+
+
+def test_oversized_value_is_not_cached():
+    """Test a single value larger than the byte budget is skipped"""
+    cache = TTLCache(maxsize=100, max_bytes=10, sizeof=len)
+    cache.set("a", "x" * 11)
+
+    assert "a" not in cache
+    assert cache.total_bytes == 0
+
+
+def test_stats_counters():
+    """Test hit and miss counters"""
+    cache = TTLCache(maxsize=10)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+
+    assert cache.stats() == {
+        "entries": 1,
+        "bytes": 0,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+    }
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from app.core.compression import (
+    GZIP,
+    IDENTITY,
+    ZSTD,
+    accepts_encoding,
+    compress,
+    decompress,
+)
+
+LOG = b"".join(
+    b"2025-11-26 08:36:11 INFO request handled path=/api/v1/pastes/%d\n" % i
+    for i in range(500)
+)
+
+
+@pytest.mark.parametrize("encoding", [ZSTD, GZIP])
+def test_round_trip(encoding):
+    data, stored_encoding = compress(LOG, encoding)
+
+    assert stored_encoding == encoding
+    assert len(data) < len(LOG) / 5
+    assert decompress(data, stored_encoding) == LOG
+
+
+def test_small_or_incompressible_data_stays_identity():
+    assert compress(b"print(1)", ZSTD, min_size=1024) == (b"print(1)", IDENTITY)
+
+    noise = os.urandom(512)
+    data, encoding = compress(noise, GZIP)
+    assert encoding == IDENTITY
+    assert data == noise
+
+
+def test_accepts_encoding():
+    assert accepts_encoding("gzip, deflate, br, zstd", ZSTD)
+    assert accepts_encoding("br;q=1.0, gzip;q=0.8", GZIP)
+    assert not accepts_encoding("gzip;q=0, br", GZIP)
+    assert not accepts_encoding("gzip", ZSTD)
+    assert accepts_encoding("*", ZSTD)
+    assert not accepts_encoding("*, zstd;q=0", ZSTD)
+    assert not accepts_encoding(None, GZIP)
+    assert accepts_encoding(None, IDENTITY)
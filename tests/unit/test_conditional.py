@@ -0,0 +1,50 @@
+from datetime import UTC, datetime, timedelta
+
+from app.core.conditional import (
+    cache_control,
+    http_date,
+    is_not_modified,
+    make_etag,
+)
+
+UPDATED_AT = datetime(2025, 11, 26, 8, 36, 11, 764386, tzinfo=UTC)
+ETAG = make_etag("9eb62034")
+
+
+def test_if_none_match():
+    assert is_not_modified({"if-none-match": '"9eb62034"'}, ETAG, UPDATED_AT)
+    assert is_not_modified({"if-none-match": '"other", W/"9eb62034"'}, ETAG, UPDATED_AT)
+    assert is_not_modified({"if-none-match": "*"}, ETAG, UPDATED_AT)
+    assert not is_not_modified({"if-none-match": '"other"'}, ETAG, UPDATED_AT)
+
+
+def test_if_modified_since():
+    last_modified = http_date(UPDATED_AT)
+    assert last_modified == "Wed, 26 Nov 2025 08:36:11 GMT"
+
+    assert is_not_modified({"if-modified-since": last_modified}, ETAG, UPDATED_AT)
+    later = http_date(UPDATED_AT + timedelta(seconds=1))
+    earlier = http_date(UPDATED_AT - timedelta(seconds=1))
+    assert is_not_modified({"if-modified-since": later}, ETAG, UPDATED_AT)
+    assert not is_not_modified({"if-modified-since": earlier}, ETAG, UPDATED_AT)
+    assert not is_not_modified({"if-modified-since": "garbage"}, ETAG, UPDATED_AT)
+
+
+def test_if_none_match_takes_precedence():
+    headers = {
+        "if-none-match": '"other"',
+        "if-modified-since": http_date(UPDATED_AT),
+    }
+    assert not is_not_modified(headers, ETAG, UPDATED_AT)
+    assert not is_not_modified({}, ETAG, UPDATED_AT)
+
+
+def test_cache_control():
+    assert cache_control(False, None, 60) == "private, no-cache"
+    assert cache_control(True, None, 60) == "public, max-age=60"
+
+    soon = datetime.now(UTC) + timedelta(seconds=30)
+    assert cache_control(True, soon, 60) in (
+        "public, max-age=29",
+        "public, max-age=30",
+    )
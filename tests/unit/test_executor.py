@@ -0,0 +1,57 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from app.core.executor import BoundedExecutor, ExecutorBusyError
+
+
+def test_runs_off_the_event_loop():
+    """Test jobs run on pool threads and return their result"""
+    executor = BoundedExecutor(max_workers=1, max_queue=1, name="test")
+
+    async def main():
+        return await executor.run(lambda: threading.current_thread().name)
+
+    assert asyncio.run(main()).startswith("test")
+    assert executor.stats()["completed"] == 1
+    executor.shutdown()
+
+
+def test_runs_in_worker_processes():
+    """Test processes=True runs jobs outside the calling process"""
+    executor = BoundedExecutor(max_workers=1, max_queue=1, name="test", processes=True)
+
+    async def main():
+        return await executor.run(os.getpid)
+
+    assert asyncio.run(main()) != os.getpid()
+    assert executor.stats()["completed"] == 1
+    executor.shutdown()
+
+
+def test_rejects_when_queue_is_full():
+    """Test submissions past workers + queue raise ExecutorBusyError"""
+    executor = BoundedExecutor(max_workers=1, max_queue=1, name="test")
+    release = threading.Event()
+
+    async def main():
+        jobs = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(ExecutorBusyError):
+            await executor.run(release.wait)
+
+        stats = executor.stats()
+        assert stats["in_flight"] == 2
+        assert stats["queued"] == 1
+        assert stats["rejected"] == 1
+
+        release.set()
+        await asyncio.gather(*jobs)
+
+    asyncio.run(main())
+    assert executor.stats()["in_flight"] == 0
+    assert executor.stats()["max_queue_wait_ms"] > 0
+    executor.shutdown()
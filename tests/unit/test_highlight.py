@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("pygments")
+
+from app.core.config import settings  # noqa: E402
+from app.core.highlight import Highlighter, render_plain  # noqa: E402
+
+CODE = "def f():\n    return 1\n"
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+@pytest.fixture
+def make_highlighter(monkeypatch):
+    monkeypatch.setattr(settings, "HIGHLIGHT_INLINE_MAX_BYTES", 1_000_000)
+    highlighters = []
+
+    def make(redis=None):
+        highlighters.append(Highlighter(redis))
+        return highlighters[-1]
+
+    yield make
+    for highlighter in highlighters:
+        highlighter.executor.shutdown()
+
+
+def test_renders_once_per_body(make_highlighter):
+    """Test repeat views hit the worker cache, then Redis on other workers"""
+    redis = FakeRedis()
+    first = make_highlighter(redis)
+
+    rendered = asyncio.run(first.render("hash", CODE, "python"))
+    assert '<span class="k">def</span>' in rendered
+    assert asyncio.run(first.render("hash", CODE, "python")) == rendered
+    assert first.stats()["renders"] == 1
+    assert first.stats()["cache"]["hits"] == 1
+
+    second = make_highlighter(redis)
+    assert asyncio.run(second.render("hash", CODE, "python")) == rendered
+    assert second.stats()["renders"] == 0
+
+
+def test_truncated_bodies_are_cached_separately(make_highlighter):
+    """Test a body cut short for a view doesn't stand in for the whole body"""
+    highlighter = make_highlighter()
+
+    head = asyncio.run(highlighter.render("hash", CODE[:8], "python"))
+    whole = asyncio.run(highlighter.render("hash", CODE, "python"))
+
+    assert head != whole
+    assert highlighter.stats()["renders"] == 2
+
+
+def test_large_bodies_fall_back_to_plain_text(monkeypatch, make_highlighter):
+    monkeypatch.setattr(settings, "HIGHLIGHT_MAX_BYTES", 10)
+    highlighter = make_highlighter()
+
+    assert asyncio.run(highlighter.render("hash", CODE, "python")) == render_plain(
+        CODE
+    )
+    stats = highlighter.stats()
+    assert stats["fallbacks"] == 1
+    assert stats["renders"] == 0
+    assert stats["cache"]["entries"] == 0
+
+
+def test_unknown_languages_render_as_text(make_highlighter):
+    highlighter = make_highlighter()
+
+    rendered = asyncio.run(highlighter.render("hash", "<b>", "no-such-language"))
+
+    assert "&lt;b&gt;" in rendered
+    assert "<span class=" not in rendered
+    assert highlighter.stats()["fallbacks"] == 0
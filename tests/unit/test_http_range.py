@@ -0,0 +1,27 @@
+import pytest
+
+from app.core.http_range import RangeNotSatisfiableError, parse_range
+
+
+def test_byte_ranges():
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=900-", 1000) == (900, 999)
+    assert parse_range("bytes=990-2000", 1000) == (990, 999)
+
+
+def test_suffix_range_tails_the_body():
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    assert parse_range("bytes=-5000", 1000) == (0, 999)
+
+
+def test_full_body_when_range_is_absent_or_unsupported():
+    assert parse_range(None, 1000) is None
+    assert parse_range("items=0-5", 1000) is None
+    assert parse_range("bytes=0-1,5-9", 1000) is None
+    assert parse_range("bytes=a-b", 1000) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=50-10", "bytes=-0"])
+def test_unsatisfiable_ranges(header):
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range(header, 1000)
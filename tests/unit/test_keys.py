@@ -0,0 +1,95 @@
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+
+from app.core.keys import DEFAULT_KID, KeyManager
+
+SECRET = "s" * 32
+
+
+def write_key(keys_dir, kid: str):
+    pem = ed25519.Ed25519PrivateKey.generate().private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    (keys_dir / f"{kid}.pem").write_bytes(pem)
+
+
+def verify_with_jwks(manager: KeyManager, token: str) -> dict:
+    """Verify a token the way another service would, from the JWKS only"""
+    kid = jwt.get_unverified_header(token)["kid"]
+    jwk = jwt.PyJWKSet.from_dict(manager.jwks())[kid]
+    return jwt.decode(token, jwk, algorithms=[jwk.algorithm_name])
+
+
+def test_hmac_round_trip():
+    """Test HMAC tokens carry the default kid and the secret isn't published"""
+    manager = KeyManager.load("HS256", SECRET)
+    token = manager.encode({"sub": "1"})
+
+    assert jwt.get_unverified_header(token)["kid"] == DEFAULT_KID
+    assert manager.decode(token) == {"sub": "1"}
+    assert manager.jwks() == {"keys": []}
+
+
+def test_last_key_signs_by_default(tmp_path):
+    """Test the last kid in sort order signs when none is configured"""
+    write_key(tmp_path, "2026-01")
+    write_key(tmp_path, "2026-02")
+
+    manager = KeyManager.load("EdDSA", SECRET, str(tmp_path))
+
+    assert manager.active.kid == "2026-02"
+    assert sorted(k["kid"] for k in manager.jwks()["keys"]) == ["2026-01", "2026-02"]
+
+
+def test_rotation_keeps_old_tokens_valid(tmp_path):
+    """Test tokens signed before a rotation verify until their key is removed"""
+    write_key(tmp_path, "old")
+    before = KeyManager.load("EdDSA", SECRET, str(tmp_path))
+    old_token = before.encode({"sub": "1"})
+    assert verify_with_jwks(before, old_token) == {"sub": "1"}
+
+    write_key(tmp_path, "new")
+    rotated = KeyManager.load("EdDSA", SECRET, str(tmp_path), active_kid="new")
+    new_token = rotated.encode({"sub": "2"})
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert rotated.decode(old_token) == {"sub": "1"}
+    assert rotated.decode(new_token) == {"sub": "2"}
+    assert verify_with_jwks(rotated, old_token) == {"sub": "1"}
+    assert verify_with_jwks(rotated, new_token) == {"sub": "2"}
+
+    (tmp_path / "old.pem").unlink()
+    retired = KeyManager.load("EdDSA", SECRET, str(tmp_path), active_kid="new")
+    assert retired.decode(new_token) == {"sub": "2"}
+    with pytest.raises(jwt.InvalidTokenError):
+        retired.decode(old_token)
+
+
+def test_token_signed_by_other_key_is_rejected(tmp_path):
+    """Test a token naming a known kid but signed by another key fails"""
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        write_key(tmp_path / name, "main")
+    ours = KeyManager.load("EdDSA", SECRET, str(tmp_path / "a"))
+    theirs = KeyManager.load("EdDSA", SECRET, str(tmp_path / "b"))
+
+    with pytest.raises(jwt.InvalidSignatureError):
+        ours.decode(theirs.encode({"sub": "1"}))
+
+
+def test_invalid_configuration(tmp_path):
+    """Test misconfigured keys fail at startup rather than per request"""
+    with pytest.raises(ValueError):
+        KeyManager.load("none", SECRET)
+    with pytest.raises(ValueError):
+        KeyManager.load("EdDSA", SECRET)
+    with pytest.raises(ValueError):
+        KeyManager.load("EdDSA", SECRET, str(tmp_path))
+
+    write_key(tmp_path, "main")
+    with pytest.raises(ValueError):
+        KeyManager.load("EdDSA", SECRET, str(tmp_path), active_kid="missing")
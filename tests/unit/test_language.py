@@ -0,0 +1,43 @@
+import pytest
+
+from app.core.language import detect_language, detect_languages
+
+
+@pytest.mark.parametrize(
+    "language, text",
+    [
+        ("python", "import os\n\ndef main():\n    print(os.getcwd())\n"),
+        ("javascript", "const fs = require('fs');\nconsole.log(fs);\n"),
+        ("go", 'package main\n\nimport "fmt"\n\nfunc main() { fmt.Println(1) }\n'),
+        ("c", '#include <stdio.h>\nint main(void) { printf("hi"); }\n'),
+        ("bash", "#!/bin/bash\necho hello\n"),
+        ("sql", "SELECT id, title FROM pastes\nWHERE is_public;\n"),
+        ("json", '{"a": 1, "b": [1, 2]}'),
+    ],
+)
+def test_detects_common_languages(language, text):
+    assert detect_language(text) == language
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "<?php\necho $greeting;\n",
+        "const greet = (name) => {\n  $('#out').text(`Hello ${name}`);\n};\n",
+    ],
+)
+def test_dollar_variables_alone_are_not_bash(text):
+    assert detect_language(text) != "bash"
+
+
+def test_detects_quoted_bash_expansions():
+    text = 'for f in *.txt; do\n  cp "$f" "${f%.txt}.bak"\ndone\n'
+    assert detect_language(text) == "bash"
+
+
+def test_prose_is_left_undetected():
+    assert detect_language("Remember to buy milk.\nAnd eggs, maybe.\n") is None
+
+
+def test_detects_a_batch_in_order():
+    assert detect_languages(["echo hi", '{"a": 1}']) == [None, "json"]
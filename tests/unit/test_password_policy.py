@@ -0,0 +1,105 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.core import password_policy as policy_module
+from app.core import security
+from app.core.password_policy import PasswordPolicy, calibrate
+from app.middleware.rate_limit import LoginRateLimiter
+from app.schemas import UserLogin
+from app.services.auth_service import AuthService
+
+# Cheap argon2 parameters keep the tests fast
+FAST_ARGON2 = PasswordPolicy(
+    scheme="argon2", argon2_time_cost=2, argon2_memory_cost=256, argon2_parallelism=1
+)
+
+
+def fake_measure(ms_at_minimum: float):
+    """_measure_ms stand-in: verification at the minimum cost takes ms_at_minimum"""
+
+    def measure(context: CryptContext, samples: int = 3) -> float:
+        return ms_at_minimum
+
+    return measure
+
+
+@pytest.mark.parametrize(
+    "target_ms, rounds", [(10, 10), (50, 10), (99, 10), (100, 11), (250, 12)]
+)
+def test_bcrypt_calibration_stays_within_target(monkeypatch, target_ms, rounds):
+    """Test each extra bcrypt round doubles the estimate, and the floor holds"""
+    monkeypatch.setattr(policy_module, "_measure_ms", fake_measure(50))
+
+    assert calibrate(PasswordPolicy(), target_ms).bcrypt_rounds == rounds
+
+
+@pytest.mark.parametrize(
+    "target_ms, time_cost", [(10, 2), (59, 2), (60, 3), (100, 5), (109, 5)]
+)
+def test_argon2_calibration_stays_within_target(monkeypatch, target_ms, time_cost):
+    """Test argon2 passes are added while one more still fits the target"""
+    monkeypatch.setattr(policy_module, "_measure_ms", fake_measure(40))
+
+    calibrated = calibrate(FAST_ARGON2, target_ms)
+    assert calibrated.argon2_time_cost == time_cost
+    assert calibrated.argon2_memory_cost == FAST_ARGON2.argon2_memory_cost
+
+
+def test_calibration_measures_the_policy_scheme():
+    calibrated = calibrate(FAST_ARGON2, target_ms=0)
+
+    assert calibrated.scheme == "argon2"
+    assert calibrated.argon2_time_cost == policy_module.MIN_ARGON2_TIME_COST
+
+
+class FakeSession:
+    def __init__(self, user):
+        self.user = user
+        self.commits = 0
+
+    async def execute(self, statement):
+        return SimpleNamespace(scalar_one_or_none=lambda: self.user)
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def bcrypt_user(monkeypatch):
+    async def allow(user_id):
+        pass
+
+    monkeypatch.setattr(LoginRateLimiter, "check_user", staticmethod(allow))
+    monkeypatch.setattr(security, "pwd_context", FAST_ARGON2.build_context())
+    legacy = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    return SimpleNamespace(id=1, hashed_password=legacy.hash("Correct@Horse9"))
+
+
+def login(user, password: str) -> FakeSession:
+    db = FakeSession(user)
+    credentials = UserLogin(email="user@example.com", password=password)
+    asyncio.run(AuthService.authenticate_user(db, credentials))
+    return db
+
+
+def test_login_rehashes_to_the_current_scheme(bcrypt_user):
+    """Test a bcrypt hash is replaced by an argon2 one on successful login"""
+    db = login(bcrypt_user, "Correct@Horse9")
+
+    assert bcrypt_user.hashed_password.startswith("$argon2id$")
+    assert security.verify_password("Correct@Horse9", bcrypt_user.hashed_password)
+    assert db.commits == 1
+
+
+def test_wrong_password_does_not_rehash(bcrypt_user):
+    hashed = bcrypt_user.hashed_password
+
+    with pytest.raises(HTTPException) as exc_info:
+        login(bcrypt_user, "Wrong@Horse9")
+
+    assert exc_info.value.status_code == 401
+    assert bcrypt_user.hashed_password == hashed
@@ -0,0 +1,106 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services import paste_reaper as reaper_module
+from app.services.paste_reaper import PasteReaper
+
+START = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def expired_rows(count: int, offset: int = 0) -> list:
+    return [
+        SimpleNamespace(
+            short_url=f"p{offset + i}",
+            content_hash=f"h{offset + i}",
+            expires_at=START + timedelta(minutes=offset + i),
+        )
+        for i in range(count)
+    ]
+
+
+class FakeSession:
+    """Stands in for AsyncSessionLocal() in delete_blobs."""
+
+    def __init__(self, referenced: set[str], log: list):
+        self.referenced = referenced
+        self.log = log
+        self._key = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    def begin(self):
+        return self
+
+    async def execute(self, statement):
+        # pg_advisory_xact_lock(hashtextextended(:key, 0))
+        self._key = statement.compile().params["hashtextextended_1"]
+        self.log.append(("lock", self._key))
+
+    async def scalar(self, statement):
+        return self._key in self.referenced
+
+
+@pytest.fixture
+def no_side_effects(monkeypatch):
+    async def ignore(short_url):
+        pass
+
+    monkeypatch.setattr(reaper_module.paste_cache, "invalidate", ignore)
+    monkeypatch.setattr(reaper_module.recent_feed, "remove", ignore)
+    monkeypatch.setattr(
+        reaper_module, "AsyncSessionLocal", lambda: FakeSession(set(), [])
+    )
+    monkeypatch.setattr(settings, "PASTE_REAPER_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "PASTE_REAPER_BATCH_SLEEP_SECONDS", 0)
+
+
+def test_cursor_follows_batches_and_resets_when_caught_up(
+    monkeypatch, no_side_effects
+):
+    """Test batches resume from the cursor and a caught-up run clears it"""
+    batches = [expired_rows(2), expired_rows(1, offset=2)]
+    cursors = []
+
+    async def delete_batch(db, cursor, limit):
+        cursors.append(cursor)
+        return (batches.pop(0) if batches else []), []
+
+    monkeypatch.setattr(PasteReaper, "delete_batch", staticmethod(delete_batch))
+    reaper = PasteReaper()
+
+    asyncio.run(reaper.run())
+    assert cursors == [None, START + timedelta(minutes=1)]
+    assert reaper.cursor is None
+    assert reaper.stats()["deleted"] == 3
+
+    # Nothing left: a run that finds nothing also starts over next time
+    reaper.cursor = START
+    asyncio.run(reaper.run())
+    assert cursors[-1] == START
+    assert reaper.cursor is None
+
+
+def test_delete_blobs_keeps_referenced_blobs(monkeypatch):
+    """Test only unreferenced blobs are deleted, each under its lock"""
+    log = []
+    monkeypatch.setattr(
+        reaper_module, "AsyncSessionLocal", lambda: FakeSession({"taken"}, log)
+    )
+
+    async def delete(blob_key):
+        log.append(("delete", blob_key))
+
+    monkeypatch.setattr(reaper_module.blob_store, "delete", delete)
+
+    deleted = asyncio.run(PasteReaper.delete_blobs(["gone", "taken"]))
+
+    assert deleted == 1
+    assert log == [("lock", "gone"), ("delete", "gone"), ("lock", "taken")]
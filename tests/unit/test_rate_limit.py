@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("redis")
+
+from app.core.config import settings  # noqa: E402
+from app.core.rate_limit import MemoryRateLimitBackend, RateLimit  # noqa: E402
+from app.middleware.rate_limit import RateLimitMiddleware  # noqa: E402
+
+
+def test_parse_rate_limit():
+    """Test settings strings parse into limit and period"""
+    assert RateLimit.parse("10/minute") == RateLimit(limit=10, period=60)
+    assert RateLimit.parse("100/5minutes") == RateLimit(limit=100, period=300)
+    assert RateLimit.parse("1 / Second") == RateLimit(limit=1, period=1)
+
+    with pytest.raises(ValueError):
+        RateLimit.parse("ten/minute")
+    with pytest.raises(ValueError):
+        RateLimit.parse("0/minute")
+
+
+def test_bucket_exhausts_and_refills(monkeypatch):
+    """Test a bucket rejects once empty and refills over time"""
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+
+    backend = MemoryRateLimitBackend()
+    rate_limit = RateLimit.parse("2/minute")
+
+    async def hit():
+        return await backend.hit("ip:1.2.3.4", rate_limit)
+
+    assert asyncio.run(hit()).remaining == 1
+    assert asyncio.run(hit()).allowed
+    rejected = asyncio.run(hit())
+    assert not rejected.allowed
+    assert rejected.retry_after == pytest.approx(30)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 30)
+    assert asyncio.run(hit()).allowed
+
+
+def test_keys_are_independent():
+    """Test each key gets its own bucket"""
+    backend = MemoryRateLimitBackend()
+    rate_limit = RateLimit.parse("1/hour")
+
+    async def main():
+        assert (await backend.hit("a", rate_limit)).allowed
+        assert (await backend.hit("b", rate_limit)).allowed
+        assert not (await backend.hit("a", rate_limit)).allowed
+
+    asyncio.run(main())
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def request_status(middleware: RateLimitMiddleware, method: str, path: str) -> int:
+    statuses = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": [],
+        "client": ("203.0.113.7", 1234),
+    }
+    asyncio.run(middleware(scope, receive, send))
+    return statuses[0]
+
+
+def test_reads_have_their_own_budget(monkeypatch):
+    """Test browsing doesn't use up the write budget and vice versa"""
+    monkeypatch.setattr(settings, "DEFAULT_RATE_LIMIT", "1/hour")
+    monkeypatch.setattr(settings, "READ_RATE_LIMIT", "2/hour")
+    middleware = RateLimitMiddleware(ok_app, backend=MemoryRateLimitBackend())
+
+    assert request_status(middleware, "GET", "/api/v1/pastes/abc") == 200
+    assert request_status(middleware, "POST", "/api/v1/pastes") == 200
+    assert request_status(middleware, "POST", "/api/v1/pastes") == 429
+    assert request_status(middleware, "HEAD", "/api/v1/pastes/abc") == 200
+    assert request_status(middleware, "GET", "/api/v1/pastes/abc") == 429
+
+
+def test_static_and_health_are_exempt(monkeypatch):
+    """Test assets and health checks never count against a budget"""
+    monkeypatch.setattr(settings, "READ_RATE_LIMIT", "1/hour")
+    middleware = RateLimitMiddleware(ok_app, backend=MemoryRateLimitBackend())
+
+    for _ in range(3):
+        assert request_status(middleware, "GET", "/static/css/style.css") == 200
+        assert request_status(middleware, "GET", "/health") == 200
+    assert request_status(middleware, "GET", "/") == 200
+    assert request_status(middleware, "GET", "/") == 429
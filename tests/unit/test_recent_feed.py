@@ -0,0 +1,86 @@
+import asyncio
+import json
+from datetime import UTC, datetime, timedelta
+
+from app.core.recent_feed import RecentFeed
+
+
+def entry(short_url: str, minute: int, expires_at: datetime | None = None) -> dict:
+    created_at = datetime(2026, 1, 1, 12, minute, tzinfo=UTC)
+    return {
+        "short_url": short_url,
+        "title": None,
+        "language": "plaintext",
+        "is_public": True,
+        "view_count": 0,
+        "expires_at": expires_at.isoformat() if expires_at else None,
+        "created_at": created_at.isoformat(),
+        "updated_at": created_at.isoformat(),
+    }
+
+
+def short_urls(feed: RecentFeed) -> list[str]:
+    return [e["short_url"] for e in feed.recent(10)]
+
+
+def test_keeps_newest_entries_in_order():
+    """Test the feed is newest first and bounded, whatever the push order"""
+    feed = RecentFeed(None, size=3)
+
+    async def main():
+        for short_url, minute in [("b", 2), ("d", 4), ("a", 1), ("c", 3), ("e", 0)]:
+            await feed.push(entry(short_url, minute))
+
+    asyncio.run(main())
+    assert short_urls(feed) == ["d", "c", "b"]
+    assert [e["short_url"] for e in feed.recent(2)] == ["d", "c"]
+
+
+def test_push_replaces_and_remove_drops():
+    """Test entries are replaced by short_url and can be removed"""
+    feed = RecentFeed(None, size=3)
+
+    async def main():
+        await feed.push(entry("a", 1))
+        await feed.push(entry("b", 2))
+        await feed.update("a", language="python")
+        await feed.update("missing", language="go")
+        await feed.remove("b")
+
+    asyncio.run(main())
+    assert short_urls(feed) == ["a"]
+    assert feed.recent(1)[0]["language"] == "python"
+
+
+class FakeRedis:
+    def __init__(self, items: dict):
+        self.items = items
+
+    def register_script(self, script):
+        return None
+
+    async def hgetall(self, key):
+        return self.items
+
+
+def test_pull_needs_a_full_feed():
+    """Test a Redis feed shortened by removals is left to be reseeded"""
+    entries = {e["short_url"]: json.dumps(e) for e in [entry("a", 1), entry("b", 2)]}
+    feed = RecentFeed(FakeRedis(entries), size=3)
+
+    assert asyncio.run(feed.pull()) is False
+    assert short_urls(feed) == []
+
+    feed.size = 2
+    assert asyncio.run(feed.pull()) is True
+    assert short_urls(feed) == ["b", "a"]
+
+
+def test_skips_expired_entries():
+    """Test expired pastes are left out until they are removed"""
+    feed = RecentFeed(None, size=3)
+    past = datetime.now(UTC) - timedelta(minutes=1)
+    future = datetime.now(UTC) + timedelta(minutes=1)
+    feed.replace([entry("a", 1), entry("b", 2, past), entry("c", 3, future)])
+
+    assert short_urls(feed) == ["c", "a"]
@@ -0,0 +1,83 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+pytest.importorskip("redis")
+
+from redis.exceptions import ConnectionError as RedisConnectionError  # noqa: E402
+
+from app.core import revocation  # noqa: E402
+from app.core.config import settings  # noqa: E402
+
+
+class FakeRedis:
+    def __init__(self, keys=(), fail=False):
+        self.keys = set(keys)
+        self.fail = fail
+
+    async def exists(self, key):
+        if self.fail:
+            raise RedisConnectionError()
+        return int(key in self.keys)
+
+    async def mget(self, *keys):
+        if self.fail:
+            raise RedisConnectionError()
+        return [1 if key in self.keys else None for key in keys]
+
+    async def set(self, key, value, exat=None):
+        if self.fail:
+            raise RedisConnectionError()
+        self.keys.add(key)
+
+
+@pytest.fixture
+def redis_backend(monkeypatch):
+    monkeypatch.setattr(settings, "REVOCATION_BACKEND", "redis")
+
+    def use(client):
+        monkeypatch.setattr(revocation, "redis_client", client)
+
+    return use
+
+
+def test_seeded_redis_answers_without_the_tokens_table(redis_backend):
+    """Test a miss means not revoked once Redis has been seeded"""
+    redis_backend(
+        FakeRedis(keys={"revoked:revoked-jti", revocation.REVOCATIONS_SEEDED_KEY})
+    )
+
+    assert asyncio.run(revocation.fetch_revocation("revoked-jti")) is True
+    assert asyncio.run(revocation.fetch_revocation("other-jti")) is False
+
+
+def test_unseeded_redis_only_answers_for_revoked_jtis(redis_backend):
+    """Test a miss is left to the tokens table until Redis is seeded"""
+    redis_backend(FakeRedis(keys={"revoked:revoked-jti"}))
+
+    assert asyncio.run(revocation.fetch_revocation("revoked-jti")) is True
+    assert asyncio.run(revocation.fetch_revocation("other-jti")) is None
+
+
+def test_redis_errors_fall_back(redis_backend):
+    """Test an unreachable Redis is treated as unknown on reads"""
+    redis_backend(FakeRedis(fail=True))
+
+    assert asyncio.run(revocation.fetch_revocation("jti")) is None
+
+
+def test_failed_revocation_write_is_retried(redis_backend, monkeypatch):
+    """Test a revocation that didn't reach Redis is written by the next sync"""
+    monkeypatch.setattr(revocation, "_unstored", {})
+    redis = FakeRedis(keys={revocation.REVOCATIONS_SEEDED_KEY}, fail=True)
+    redis_backend(redis)
+    expires_at = datetime.now(UTC) + timedelta(minutes=5)
+
+    asyncio.run(revocation.store_revocation("jti", expires_at))
+    assert revocation._unstored == {"jti": expires_at}
+
+    redis.fail = False
+    asyncio.run(revocation.sync_revocation_store())
+    assert revocation._unstored == {}
+    assert asyncio.run(revocation.fetch_revocation("jti")) is True
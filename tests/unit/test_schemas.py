@@ -0,0 +1,34 @@
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.schemas import PasteCreate, PasteUpdate
+
+
+@pytest.mark.parametrize("field", ["title", "content", "language", "is_public"])
+def test_update_rejects_null(field):
+    """Test an explicit null is a validation error, not a NOT NULL violation"""
+    with pytest.raises(ValidationError):
+        PasteUpdate.model_validate({field: None})
+
+
+def test_update_clears_expiry_with_null():
+    update = PasteUpdate.model_validate({"expires_at": None})
+    assert update.model_dump(exclude_unset=True) == {"expires_at": None}
+
+
+def test_update_leaves_out_unset_fields():
+    update = PasteUpdate.model_validate({"title": "new"})
+    assert update.model_dump(exclude_unset=True) == {"title": "new"}
+
+
+@pytest.mark.parametrize("schema", [PasteCreate, PasteUpdate])
+def test_content_is_capped_in_bytes(monkeypatch, schema):
+    """Test content over PASTE_UPLOAD_MAX_BYTES is rejected once UTF-8 encoded"""
+    monkeypatch.setattr(settings, "PASTE_UPLOAD_MAX_BYTES", 8)
+
+    assert schema.model_validate({"content": "é" * 4}).content == "é" * 4
+    with pytest.raises(ValidationError, match="exceeds 8 bytes"):
+        schema.model_validate({"content": "é" * 5})
+    with pytest.raises(ValidationError):
+        schema.model_validate_json('{"content": "%s"}' % ("x" * 9))
@@ -0,0 +1,77 @@
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.core.pagination import InvalidCursorError, encode_cursor, encode_rank_cursor
+from app.services.search_service import SearchService, escape_like
+
+
+def compile_query(*args):
+    compiled = SearchService.search_query(*args).compile(
+        dialect=postgresql.dialect()
+    )
+    return str(compiled), compiled.params
+
+
+@pytest.mark.parametrize(
+    "value, escaped",
+    [
+        ("plain", "plain"),
+        ("100%", "100\\%"),
+        ("snake_case", "snake\\_case"),
+        ("C:\\path", "C:\\\\path"),
+        ("\\%_", "\\\\\\%\\_"),
+    ],
+)
+def test_escape_like(value, escaped):
+    assert escape_like(value) == escaped
+
+
+def test_substring_search_matches_literally():
+    """Test LIKE wildcards in the query match only themselves"""
+    sql, params = compile_query("50%_off", "substring", None, 20, None)
+
+    assert "ILIKE" in sql and "ESCAPE '\\'" in sql
+    assert params["search_text_1"] == params["title_1"] == "%50\\%\\_off%"
+
+
+def test_word_search_ranks_a_bounded_candidate_set():
+    """Test only the newest candidates are ranked, the same for every page"""
+    sql, params = compile_query("hello world", "words", None, 20, None)
+
+    candidates = sql[sql.index("ORDER BY pastes.id DESC") :]
+    assert candidates.startswith("ORDER BY pastes.id DESC \n LIMIT %(param_1)s")
+    assert params["param_1"] == settings.SEARCH_RANK_MAX_CANDIDATES
+    assert params["param_2"] == 21
+    assert "ts_rank" in sql
+
+
+def test_pattern_searches_are_newest_first_without_ranking():
+    sql, params = compile_query("^def ", "regex", None, 10, None)
+
+    assert "ts_rank" not in sql
+    assert "~*" in sql
+    assert sql.endswith(
+        "ORDER BY pastes.created_at DESC, pastes.id DESC \n LIMIT %(param_1)s::INTEGER"
+    )
+    assert params["param_1"] == 11
+
+
+def test_visibility_includes_own_pastes():
+    sql, params = compile_query("hello", "words", None, 20, 7)
+
+    assert "pastes.is_public OR pastes.user_id = %(user_id_1)s" in sql
+    assert params["user_id_1"] == 7
+
+
+def test_cursors_must_match_the_mode():
+    """Test a rank cursor is rejected by pattern searches and vice versa"""
+    rank_cursor = encode_rank_cursor(0.5, 3)
+    date_cursor = encode_cursor(datetime(2026, 1, 1, tzinfo=UTC), 3)
+
+    compile_query("hello", "words", rank_cursor, 20, None)
+    compile_query("hello", "substring", date_cursor, 20, None)
+    with pytest.raises(InvalidCursorError):
+        compile_query("hello", "substring", rank_cursor, 20, None)
@@ -0,0 +1,84 @@
+import asyncio
+import itertools
+import random
+
+import pytest
+
+from app.core.short_id import (
+    FeistelPermutation,
+    ShortIdGenerator,
+    base62_decode,
+    base62_encode,
+)
+
+
+def test_permutation_is_a_bijection():
+    """Test every input in the domain maps to a distinct output"""
+    permutation = FeistelPermutation(b"test-key", bits=16)
+    outputs = {permutation.permute(value) for value in range(permutation.size)}
+
+    assert outputs == set(range(permutation.size))
+
+
+def test_permutation_inverts():
+    permutation = FeistelPermutation(b"test-key")
+    for value in (0, 1, 2, 12345, permutation.size - 1):
+        assert permutation.invert(permutation.permute(value)) == value
+
+
+def test_permutation_depends_on_key():
+    first = FeistelPermutation(b"first")
+    second = FeistelPermutation(b"second")
+
+    values = range(10)
+    assert [first.permute(v) for v in values] != [second.permute(v) for v in values]
+
+
+def test_base62_round_trip():
+    for number in (0, 61, 62, 2**46 - 1):
+        assert base62_decode(base62_encode(number)) == number
+    assert base62_encode(5, length=8) == "00000005"
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        FeistelPermutation(b"key", bits=15)
+    with pytest.raises(ValueError):
+        FeistelPermutation(b"key").permute(2**46)
+
+
+def test_concurrent_workers_never_collide():
+    """Test slugs from many workers sharing one sequence are all unique"""
+    sequence = itertools.count(1)
+
+    async def allocate(count: int) -> list[int]:
+        # Yield so that workers interleave their block allocations
+        await asyncio.sleep(0)
+        return [next(sequence) for _ in range(count)]
+
+    async def run_worker(generator: ShortIdGenerator, count: int) -> list[str]:
+        slugs = []
+        for _ in range(count):
+            slugs.append(await generator.next())
+            if random.random() < 0.01:
+                await asyncio.sleep(0)
+        return slugs
+
+    async def main() -> list[str]:
+        workers = [
+            ShortIdGenerator(
+                FeistelPermutation(b"shared-key"), allocate, block_size=block_size
+            )
+            for block_size in (1, 7, 100, 1000)
+        ]
+        # Several concurrent requests per worker share its block
+        results = await asyncio.gather(
+            *(run_worker(worker, 5_000) for worker in workers for _ in range(3))
+        )
+        return [slug for slugs in results for slug in slugs]
+
+    slugs = asyncio.run(main())
+
+    assert len(slugs) == 60_000
+    assert len(set(slugs)) == len(slugs)
+    assert {len(slug) for slug in slugs} == {8}
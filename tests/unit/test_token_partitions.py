@@ -0,0 +1,40 @@
+import asyncio
+from datetime import date
+
+from app.core.token_partitions import (
+    list_token_partitions,
+    partition_ddl,
+    partition_name,
+)
+
+
+class FakeSession:
+    def __init__(self, names):
+        self.names = names
+
+    async def scalars(self, statement):
+        return iter(self.names)
+
+
+def test_partition_name():
+    assert partition_name(date(2026, 3, 9)) == "tokens_p20260309"
+
+
+def test_partition_ddl_covers_one_utc_day():
+    """Test a partition runs from UTC midnight to the next, across months"""
+    assert partition_ddl(date(2026, 1, 31)) == (
+        "CREATE TABLE IF NOT EXISTS tokens_p20260131 PARTITION OF tokens "
+        "FOR VALUES FROM ('2026-01-31 00:00+00') TO ('2026-02-01 00:00+00')"
+    )
+
+
+def test_list_token_partitions_parses_days():
+    """Test partition names map back to their day and other tables are ignored"""
+    db = FakeSession(["tokens_p20261231", "tokens_p20270101", "tokens_archive"])
+
+    partitions = asyncio.run(list_token_partitions(db))
+
+    assert partitions == {
+        date(2026, 12, 31): "tokens_p20261231",
+        date(2027, 1, 1): "tokens_p20270101",
+    }
@@ -0,0 +1,64 @@
+import asyncio
+import codecs
+import hashlib
+
+import pytest
+
+from app.core.upload import (
+    UploadEncodingError,
+    UploadTooLargeError,
+    spool_upload,
+)
+
+TEXT = "naïve café 日本語 🐍\n" * 5_000
+
+
+async def iter_chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def spool(data: bytes, chunk_size: int = 1001, max_bytes: int = 10**7):
+    return asyncio.run(
+        spool_upload(iter_chunks(data, chunk_size), max_bytes, spool_bytes=4096)
+    )
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        TEXT.encode("utf-8"),
+        codecs.BOM_UTF8 + TEXT.encode("utf-8"),
+        TEXT.encode("utf-16"),
+        TEXT.encode("utf-32"),
+    ],
+)
+def test_normalizes_to_utf8(data):
+    """Test chunks splitting characters are reassembled and BOMs dropped"""
+    with spool(data) as upload:
+        assert upload.read_text() == TEXT
+        assert upload.size == len(TEXT.encode("utf-8"))
+        assert upload.content_hash == hashlib.sha256(TEXT.encode("utf-8")).hexdigest()
+        # Large bodies go to disk instead of staying in memory
+        assert upload.file._rolled
+
+
+def test_short_body():
+    """Test a BOM split over several chunks is still recognized"""
+    with spool(codecs.BOM_UTF8 + b"hi", chunk_size=1) as upload:
+        assert upload.read_text() == "hi"
+        assert upload.source_encoding == "utf-8-sig"
+
+    with spool(b"hi") as upload:
+        assert upload.read_text() == "hi"
+        assert upload.source_encoding == "utf-8"
+
+
+def test_size_limit():
+    with pytest.raises(UploadTooLargeError):
+        spool(TEXT.encode("utf-8"), chunk_size=1024, max_bytes=10_000)
+
+
+def test_rejects_binary():
+    with pytest.raises(UploadEncodingError):
+        spool(b"\x89PNG\r\n\x1a\n\xff\xfe\x00" * 10)
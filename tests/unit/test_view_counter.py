@@ -0,0 +1,75 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.core.config import settings
+from app.core.paste_cache import paste_cache
+from app.services import view_counter as view_counter_module
+from app.services.view_counter import ViewCounter
+
+
+@asynccontextmanager
+async def fake_session():
+    yield None
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """Stand-in for the pastes table, keyed by id: [short_url, view_count]"""
+    rows = {1: ["abc", 10]}
+    state = {"fail": False}
+
+    async def write(db, counts):
+        if state["fail"]:
+            raise ConnectionError("database is down")
+        for paste_id, views in counts.items():
+            rows[paste_id][1] += views
+        return {rows[paste_id][0]: rows[paste_id][1] for paste_id in counts}
+
+    monkeypatch.setattr(view_counter_module, "AsyncSessionLocal", fake_session)
+    monkeypatch.setattr(ViewCounter, "write", staticmethod(write))
+    return rows, state
+
+
+def test_shown_count_never_goes_backwards(database):
+    """Test a flush moves views from pending into the cached count"""
+    counter = ViewCounter()
+    entry = {"short_url": "abc", "title": None, "content": "x", "view_count": 10}
+    paste_cache.local.set("abc", entry, ttl=60)
+
+    def shown() -> int:
+        return paste_cache.local.get("abc")["view_count"] + counter.pending(1)
+
+    async def main():
+        counter.record(1)
+        counter.record(1)
+        assert shown() == 12
+        await counter.flush()
+        assert shown() == 12
+        counter.record(1)
+        assert shown() == 13
+
+    asyncio.run(main())
+    paste_cache.local.delete("abc")
+
+
+def test_failed_flush_keeps_views_up_to_the_limit(database, monkeypatch):
+    """Test views are retried after a failed flush but memory stays bounded"""
+    monkeypatch.setattr(settings, "VIEW_COUNT_MAX_PENDING", 4)
+    rows, state = database
+    state["fail"] = True
+    counter = ViewCounter()
+
+    async def main():
+        for _ in range(6):
+            counter.record(1)
+            await asyncio.sleep(0)
+        assert counter.stats() == {"pending": 4, "dropped": 2, "flush_failed": True}
+
+        state["fail"] = False
+        await counter.flush()
+
+    asyncio.run(main())
+    assert rows[1][1] == 14
+    assert counter.stats() == {"pending": 0, "dropped": 2, "flush_failed": False}